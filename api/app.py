@@ -3,6 +3,9 @@ from pathlib import Path
 from dotenv import load_dotenv
 from flask import Flask, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from database import engine_options, pool_status
 
 # Load environment variables
 load_dotenv()
@@ -24,30 +27,81 @@ if use_sqlite or not database_url:
 
 app.config["SQLALCHEMY_DATABASE_URI"] = database_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Pool sizing / timeouts for Postgres, busy timeout for SQLite (see database.py)
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(database_url)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
 
+
+def trust_proxies(flask_app, hops):
+    """Take the client address and scheme from the last `hops` X-Forwarded-For / -Proto entries."""
+    if hops > 0:
+        flask_app.wsgi_app = ProxyFix(flask_app.wsgi_app, x_for=hops, x_proto=hops)
+
+
+# Behind nginx (docker/nginx.conf) remote_addr is the proxy's; per-IP login limits need the client's
+trust_proxies(app, int(os.getenv("TRUSTED_PROXY_COUNT") or "0"))
+
 # Enable CORS for development
-CORS(app, origins=["http://localhost:3000", "http://localhost:5000"])
+cors_origins = ["http://localhost:3000", "http://localhost:5000"]
+CORS(app, origins=cors_origins)
 
 # Initialize DB and auth blueprint
 from models import db
 from routes.auth import auth_bp
 from routes.debts import debts_bp
 from routes.debt_participants import debt_participants_bp
+from routes.balances import balances_bp
+from routes.imports import imports_bp
+from routes.payments import payments_bp
+from routes.dashboard import dashboard_bp
+from auth.executor import get_executor
+from auth.throttle import get_login_throttle
+from events import socketio
+from metrics import init_metrics
+from record_cache import records
 
 # Initialize extensions
 db.init_app(app)
+# Real-time change events; SOCKETIO_MESSAGE_QUEUE (e.g. redis://...) lets several workers fan out
+socketio.init_app(
+    app,
+    cors_allowed_origins=cors_origins,
+    message_queue=os.getenv("SOCKETIO_MESSAGE_QUEUE") or None,
+    async_mode=os.getenv("SOCKETIO_ASYNC_MODE") or None,
+)
 
 # Register blueprints
 app.register_blueprint(auth_bp)
 app.register_blueprint(debts_bp)
 app.register_blueprint(debt_participants_bp)
+app.register_blueprint(balances_bp)
+app.register_blueprint(imports_bp)
+app.register_blueprint(payments_bp)
+app.register_blueprint(dashboard_bp)
+
+# Opt-in latency / SQL / serialization histograms at /metrics (METRICS_ENABLED=1)
+init_metrics(app)
 
 # Health check endpoint
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok", "message": "Backend is running"}), 200
 
+# Password hashing pool: queue wait vs. hash time, plus logins rejected before hashing
+@app.route("/health/hashing", methods=["GET"])
+def health_hashing():
+    return jsonify({**get_executor().stats(), "throttle": get_login_throttle().stats()}), 200
+
+# Connection pool saturation (checked out vs. size + max_overflow)
+@app.route("/health/db", methods=["GET"])
+def health_db():
+    return jsonify(pool_status(db.engine)), 200
+
+# Record cache hit rates (debts, participants)
+@app.route("/health/cache", methods=["GET"])
+def health_cache():
+    return jsonify(records.stats()), 200
+
 # Index page
 @app.route("/", methods=["GET"])
 def index():
@@ -72,8 +126,6 @@ if __name__ == "__main__":
             print(f"Could not create tables: {e}")
             print("(Database connection will be established when needed)")
 
-    # For now: Run plain Flask without SocketIO (eventlet has compatibility issues with Python 3.10)
-    # SocketIO will be added later when we upgrade dependencies
-    print("Starting Flask on http://0.0.0.0:5000")
+    print("Starting Flask + SocketIO on http://0.0.0.0:5000")
     print("Backend is ready")
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    socketio.run(app, debug=True, host="0.0.0.0", port=5000)
@@ -1,61 +1,220 @@
-from __future__ import annotations
-
 """Password hashing utilities using Argon2.
 
-Provides: hash_password, verify_password, needs_rehash.
+Provides: hash_password, verify_password, verify_dummy, needs_rehash.
+
+All three go through one `PasswordHashingService`, which builds its
+`PasswordHasher` and reads the pepper once. Parameters are only re-read when
+`reload_hasher()` / `configure_hasher()` is called explicitly (e.g. after
+changing the env in tests or after running `python -m auth.calibrate`).
 
 Pepper support: an optional secret `PASSWORD_PEPPER` may be set in env and will
 be appended to the plaintext before hashing. Do NOT store the pepper in the
 repo. To rotate pepper, change the env and re-hash passwords (see comment below).
+
+Parameter profiles: new hashes always use the active profile (ARGON2_TIME_COST,
+ARGON2_MEMORY_COST, ARGON2_PARALLELISM). Older profiles listed in
+`ARGON2_LEGACY_PROFILES` ("time:memory:parallelism" entries separated by
+commas) are still accepted, and `ARGON2_REHASH_ROLLOUT` (0-100, default 100)
+sets the share of users whose legacy hashes get upgraded on their next login.
+Hashes matching no known profile are always rehashed.
 """
+from __future__ import annotations
 
+import hashlib
 import os
-from typing import Any
+import threading
+from typing import NamedTuple
 
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-
-
-def _get_hasher() -> PasswordHasher:
-    """Create a PasswordHasher from env-configured parameters.
-
-    Env vars (optional): ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
-    """
-    time_cost = int(os.getenv("ARGON2_TIME_COST", "2"))
-    memory_cost = int(os.getenv("ARGON2_MEMORY_COST", "102400"))
-    parallelism = int(os.getenv("ARGON2_PARALLELISM", "8"))
-    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
-
+from argon2.exceptions import InvalidHash, VerifyMismatchError
+
+
+class Argon2Params(NamedTuple):
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Argon2Params":
+        time_cost, memory_cost, parallelism = (int(part) for part in spec.split(":"))
+        return cls(time_cost, memory_cost, parallelism)
+
+    def hasher(self) -> PasswordHasher:
+        return PasswordHasher(
+            time_cost=self.time_cost, memory_cost=self.memory_cost, parallelism=self.parallelism
+        )
+
+
+def params_from_env() -> Argon2Params:
+    """Active profile from ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM."""
+    return Argon2Params(
+        time_cost=int(os.getenv("ARGON2_TIME_COST") or "2"),
+        memory_cost=int(os.getenv("ARGON2_MEMORY_COST") or "102400"),
+        parallelism=int(os.getenv("ARGON2_PARALLELISM") or "8"),
+    )
+
+
+def legacy_profiles_from_env() -> list[Argon2Params]:
+    specs = os.getenv("ARGON2_LEGACY_PROFILES") or ""
+    return [Argon2Params.parse(spec.strip()) for spec in specs.split(",") if spec.strip()]
+
+
+class PasswordHashingService:
+    def __init__(
+        self,
+        params: Argon2Params,
+        pepper: str = "",
+        legacy_profiles: list[Argon2Params] | tuple = (),
+        rollout_percent: int = 100,
+    ):
+        self._lock = threading.Lock()
+        self.configure(params, pepper, legacy_profiles, rollout_percent)
+
+    @classmethod
+    def from_env(cls) -> "PasswordHashingService":
+        return cls(
+            params=params_from_env(),
+            pepper=os.getenv("PASSWORD_PEPPER", ""),
+            legacy_profiles=legacy_profiles_from_env(),
+            rollout_percent=int(os.getenv("ARGON2_REHASH_ROLLOUT") or "100"),
+        )
+
+    def configure(
+        self,
+        params: Argon2Params,
+        pepper: str = "",
+        legacy_profiles: list[Argon2Params] | tuple = (),
+        rollout_percent: int = 100,
+    ) -> None:
+        """Swap in new parameters. Hashers are built here and nowhere else."""
+        active = params.hasher()
+        legacy = [(profile, profile.hasher()) for profile in legacy_profiles if profile != params]
+        with self._lock:
+            self.params = params
+            self.pepper = pepper
+            self.legacy_profiles = [profile for profile, _ in legacy]
+            self.rollout_percent = max(0, min(100, rollout_percent))
+            self._active = active
+            self._legacy = legacy
+            self._dummy_hash = None
+
+    def _apply_pepper(self, password: str) -> str:
+        return password + self.pepper if self.pepper else password
+
+    def hash(self, password: str) -> str:
+        return self._active.hash(self._apply_pepper(password))
+
+    def verify(self, hash: str, password: str) -> bool:
+        # Any PasswordHasher verifies any parameter set; the active one is fine.
+        try:
+            return self._active.verify(hash, self._apply_pepper(password))
+        except VerifyMismatchError:
+            return False
+        except Exception:
+            return False
+
+    def verify_dummy(self, password: str) -> bool:
+        """Spend one full verify on a throwaway hash; always False."""
+        # No lock: this may run on an eventlet tpool thread; a racing duplicate hash is harmless
+        dummy_hash = self._dummy_hash
+        if dummy_hash is None:
+            dummy_hash = self._dummy_hash = self._active.hash(os.urandom(16).hex())
+        self.verify(dummy_hash, password)
+        return False
 
-def _apply_pepper(password: str) -> str:
-    pepper = os.getenv("PASSWORD_PEPPER", "")
-    return password + pepper if pepper else password
+    def profile_of(self, hash: str) -> Argon2Params | None:
+        """Return the known profile `hash` was created with, if any."""
+        try:
+            if not self._active.check_needs_rehash(hash):
+                return self.params
+            for profile, hasher in self._legacy:
+                if not hasher.check_needs_rehash(hash):
+                    return profile
+        except (InvalidHash, ValueError):
+            pass
+        return None
+
+    def _in_rollout(self, key: str | None) -> bool:
+        if self.rollout_percent >= 100:
+            return True
+        if key is None or self.rollout_percent <= 0:
+            return False
+        bucket = int.from_bytes(hashlib.sha256(key.encode()).digest()[:2], "big") % 100
+        return bucket < self.rollout_percent
+
+    def needs_rehash(self, hash: str, key: str | None = None) -> bool:
+        profile = self.profile_of(hash)
+        if profile is None:
+            return True
+        if profile == self.params:
+            return False
+        return self._in_rollout(key)
+
+
+_service: PasswordHashingService | None = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> PasswordHashingService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PasswordHashingService.from_env()
+    return _service
+
+
+def reload_hasher() -> PasswordHashingService:
+    """Re-read Argon2 parameters and pepper from the environment."""
+    global _service
+    with _service_lock:
+        _service = PasswordHashingService.from_env()
+    return _service
+
+
+def configure_hasher(params: Argon2Params, **kwargs) -> PasswordHashingService:
+    """Explicitly set the active profile (and optionally pepper/legacy profiles)."""
+    service = get_service()
+    service.configure(
+        params,
+        pepper=kwargs.get("pepper", service.pepper),
+        legacy_profiles=kwargs.get("legacy_profiles", service.legacy_profiles),
+        rollout_percent=kwargs.get("rollout_percent", service.rollout_percent),
+    )
+    return service
 
 
 def hash_password(password: str) -> str:
     """Hash a plaintext password and return the encoded hash."""
-    ph = _get_hasher()
-    pwd = _apply_pepper(password)
-    return ph.hash(pwd)
+    return get_service().hash(password)
 
 
 def verify_password(hash: str, password: str) -> bool:
     """Verify a plaintext password against a stored Argon2 hash."""
-    ph = _get_hasher()
-    pwd = _apply_pepper(password)
-    try:
-        return ph.verify(hash, pwd)
-    except VerifyMismatchError:
-        return False
-    except Exception:
-        return False
+    return get_service().verify(hash, password)
+
+
+def verify_dummy(password: str) -> bool:
+    """Verify against a dummy hash with the active parameters (for unknown emails).
+
+    Costs the same as a real verify so response timing does not reveal whether
+    an account exists. Always returns False.
+    """
+    return get_service().verify_dummy(password)
+
+
+def needs_rehash(hash: str, key: str | None = None) -> bool:
+    """Return True if the given hash should be upgraded to the active profile.
+
+    `key` (usually the user id) places the user in a stable rollout bucket when
+    `ARGON2_REHASH_ROLLOUT` is below 100.
+    """
+    return get_service().needs_rehash(hash, key)
 
 
-def needs_rehash(hash: str) -> bool:
-    """Return True if the given hash needs rehash according to current Argon2 params."""
-    ph = _get_hasher()
-    try:
-        return ph.check_needs_rehash(hash)
-    except Exception:
-        # if the hash is malformed etc., prefer rehash (will fail on verify though)
-        return True
+# Pepper rotation note:
+# If you change `PASSWORD_PEPPER`, existing stored hashes will no longer verify
+# because the pepper is applied before hashing. To rotate pepper safely you can:
+# - Keep the old pepper available server-side and verify against both, or
+# - Force users to reset passwords on next login (recommended for limited rotation), or
+# - Maintain a pepper version field per-user and re-hash on next successful login.
@@ -0,0 +1,90 @@
+"""Pick Argon2 parameters that hit a target verify latency on this host.
+
+Memory cost is the main defence against GPU cracking, so the search keeps
+memory as high as allowed and only then raises time cost:
+
+1. start at `--max-memory-kib` with time_cost=1 and halve memory until a verify
+   fits the target,
+2. raise time_cost while the verify still fits.
+
+Usage (from `api/`):
+
+    python -m auth.calibrate --target-ms 250 --parallelism 8
+
+Prints the ARGON2_* env lines to paste into `.env`. The running service keeps
+its current parameters until it is restarted or `reload_hasher()` is called.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+
+from auth.argon2_hash import Argon2Params
+
+MIN_MEMORY_KIB = 8192
+
+
+def measure_verify_ms(params: Argon2Params, rounds: int = 3) -> float:
+    """Median wall time of one verify with `params`, in milliseconds."""
+    hasher = params.hasher()
+    encoded = hasher.hash("calibration-password")
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.verify(encoded, "calibration-password")
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(
+    target_ms: float,
+    parallelism: int = 8,
+    max_memory_kib: int = 102400,
+    max_time_cost: int = 10,
+    rounds: int = 3,
+) -> tuple[Argon2Params, float]:
+    """Return `(params, measured_ms)` with the strongest params under `target_ms`."""
+    memory = max_memory_kib
+    params = Argon2Params(1, memory, parallelism)
+    measured = measure_verify_ms(params, rounds)
+    while measured > target_ms and memory // 2 >= MIN_MEMORY_KIB:
+        memory //= 2
+        params = Argon2Params(1, memory, parallelism)
+        measured = measure_verify_ms(params, rounds)
+
+    for time_cost in range(2, max_time_cost + 1):
+        candidate = Argon2Params(time_cost, memory, parallelism)
+        candidate_ms = measure_verify_ms(candidate, rounds)
+        if candidate_ms > target_ms:
+            break
+        params, measured = candidate, candidate_ms
+    return params, measured
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate Argon2 parameters for this host.")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--parallelism", type=int, default=8)
+    parser.add_argument("--max-memory-kib", type=int, default=102400)
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    params, measured = calibrate(
+        args.target_ms,
+        parallelism=args.parallelism,
+        max_memory_kib=args.max_memory_kib,
+        max_time_cost=args.max_time_cost,
+        rounds=args.rounds,
+    )
+    print(f"# verify ~{measured:.1f} ms (target {args.target_ms:.0f} ms)")
+    print(f"ARGON2_TIME_COST={params.time_cost}")
+    print(f"ARGON2_MEMORY_COST={params.memory_cost}")
+    print(f"ARGON2_PARALLELISM={params.parallelism}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
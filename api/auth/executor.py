@@ -0,0 +1,148 @@
+"""Bounded worker pool for Argon2 hashing.
+
+Argon2 is deliberately slow and memory hungry. Running it on the request thread
+lets a burst of logins pin every server worker, so hashing is offloaded to a
+small thread pool instead (argon2-cffi releases the GIL while hashing).
+
+At most `HASH_MAX_WORKERS` hashes run at once and at most `HASH_MAX_QUEUE` more
+may wait. Anything beyond that fails fast with `HashingUnavailable`, which the
+routes turn into a 503 instead of queueing unbounded work.
+
+Under eventlet (the default gunicorn worker) `threading` is monkey-patched and
+a ThreadPoolExecutor only runs green threads, so a hash would still block the
+hub. In that case the hash is handed to `eventlet.tpool`, which runs it on a
+real OS thread while the calling green thread yields.
+
+Env vars (optional): HASH_MAX_WORKERS, HASH_MAX_QUEUE
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from metrics import timed
+
+
+def _eventlet_patched() -> bool:
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched("thread")
+
+
+class HashingUnavailable(RuntimeError):
+    """Raised when the hashing queue is full."""
+
+
+class _Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self):
+        avg = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "avg_ms": round(avg * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+        }
+
+
+class HashingExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+        self._green = _eventlet_patched()
+        # tpool has its own (larger) thread count; cap concurrent hashes at max_workers
+        self._running = threading.BoundedSemaphore(max_workers)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._queue_wait = _Timing()
+        self._run_time = _Timing()
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on the pool and block until it returns."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingUnavailable("password hashing queue is full")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._observe(submitted, started)
+
+        try:
+            if self._green:
+                from eventlet import tpool
+
+                with self._running:
+                    started = time.perf_counter()
+                    try:
+                        # Only the hash runs on the OS thread; green locks stay on the hub's side
+                        return tpool.execute(fn, *args)
+                    finally:
+                        self._observe(submitted, started)
+            return self._pool.submit(task).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _observe(self, submitted: float, started: float) -> None:
+        finished = time.perf_counter()
+        with self._lock:
+            self._queue_wait.observe(started - submitted)
+            self._run_time.observe(finished - started)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+                "queue_wait": self._queue_wait.to_dict(),
+                "hash_time": self._run_time.to_dict(),
+            }
+
+
+_executor: HashingExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> HashingExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.getenv("HASH_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+                max_queue = int(os.getenv("HASH_MAX_QUEUE", "32"))
+                _executor = HashingExecutor(max_workers=max_workers, max_queue=max_queue)
+    return _executor
+
+
+def offload(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a hashing call on the shared executor. Raises HashingUnavailable."""
+    with timed("hash"):
+        return get_executor().run(fn, *args)
@@ -0,0 +1,204 @@
+"""Login throttling that runs before any password hashing.
+
+Failed logins are counted per email and per client IP in sliding windows
+(two fixed-window counters, the previous one weighted by how much of it still
+overlaps the window). While either count is at its limit, `/auth/login`
+answers 429 with `Retry-After` without looking up the user or touching Argon2,
+so a credential-stuffing wave costs a dictionary lookup per request instead of
+a ~100 MB, tens-of-ms hash. Successful logins don't count and clear the
+email's counter.
+
+Counters live in a bounded in-process LRU by default (per worker). Set
+`LOGIN_THROTTLE_BACKEND=redis://...` (needs the `redis` package) to share them
+between workers.
+
+Env vars (optional): LOGIN_THROTTLE_EMAIL ("10/300" = 10 failures per 300 s),
+LOGIN_THROTTLE_IP ("50/60"), LOGIN_THROTTLE_BACKEND (memory),
+LOGIN_THROTTLE_MAX_KEYS (100000, memory backend only)
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    """Per-key `[window_index, current, previous]` counters in an LRU of `max_keys`."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._data: OrderedDict[str, list[int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def counts(self, key: str, index: int) -> tuple[int, int]:
+        """`(previous, current)` counts for window `index`."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return 0, 0
+        entry_index, current, previous = entry
+        if entry_index == index:
+            return previous, current
+        if entry_index == index - 1:
+            return current, 0
+        return 0, 0
+
+    def incr(self, key: str, index: int, ttl: int) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0]
+            elif entry[0] == index - 1:
+                entry = [index, 0, entry[1]]
+            entry[1] += 1
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+
+    def clear(self, key: str, index: int) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Counters as `<key>:<window_index>` Redis keys expiring after two windows."""
+
+    def __init__(self, url: str, prefix: str = "throttle:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("LOGIN_THROTTLE_BACKEND=redis://... needs the `redis` package") from exc
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def counts(self, key: str, index: int) -> tuple[int, int]:
+        previous, current = self._redis.mget(f"{self.prefix}{key}:{index - 1}", f"{self.prefix}{key}:{index}")
+        return int(previous or 0), int(current or 0)
+
+    def incr(self, key: str, index: int, ttl: int) -> None:
+        name = f"{self.prefix}{key}:{index}"
+        pipe = self._redis.pipeline()
+        pipe.incr(name)
+        pipe.expire(name, ttl)
+        pipe.execute()
+
+    def clear(self, key: str, index: int) -> None:
+        self._redis.delete(f"{self.prefix}{key}:{index - 1}", f"{self.prefix}{key}:{index}")
+
+    def __len__(self) -> int:
+        return 0
+
+
+class SlidingWindow:
+    """At most `limit` hits per `window` seconds for each key."""
+
+    def __init__(self, name: str, limit: int, window: int, backend):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+
+    @classmethod
+    def parse(cls, name: str, spec: str, backend) -> "SlidingWindow":
+        limit, window = (int(part) for part in spec.split("/"))
+        return cls(name, limit, window, backend)
+
+    def _position(self, now: float) -> tuple[int, float]:
+        index, offset = divmod(now, self.window)
+        return int(index), offset / self.window
+
+    def retry_after(self, key: str, now: float | None = None) -> float:
+        """Seconds until `key` may try again; 0 when it is under the limit."""
+        now = time.time() if now is None else now
+        index, elapsed = self._position(now)
+        previous, current = self.backend.counts(f"{self.name}:{key}", index)
+        if previous * (1 - elapsed) + current < self.limit:
+            return 0.0
+        if current >= self.limit:
+            # Wait for the window to roll over and enough of `current` to slide out
+            wait = (1 - elapsed) * self.window + (1 - self.limit / current) * self.window
+        else:
+            wait = ((1 - (self.limit - current) / previous) - elapsed) * self.window
+        return max(wait, 1.0)
+
+    def hit(self, key: str, now: float | None = None) -> None:
+        index, _ = self._position(time.time() if now is None else now)
+        self.backend.incr(f"{self.name}:{key}", index, self.window * 2)
+
+    def reset(self, key: str, now: float | None = None) -> None:
+        index, _ = self._position(time.time() if now is None else now)
+        self.backend.clear(f"{self.name}:{key}", index)
+
+
+class LoginThrottle:
+    def __init__(self, email_window: SlidingWindow, ip_window: SlidingWindow):
+        self.email_window = email_window
+        self.ip_window = ip_window
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "LoginThrottle":
+        spec = (os.getenv("LOGIN_THROTTLE_BACKEND") or "memory").strip()
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            backend = RedisBackend(spec)
+        else:
+            backend = MemoryBackend(int(os.getenv("LOGIN_THROTTLE_MAX_KEYS") or "100000"))
+        return cls(
+            SlidingWindow.parse("email", os.getenv("LOGIN_THROTTLE_EMAIL") or "10/300", backend),
+            SlidingWindow.parse("ip", os.getenv("LOGIN_THROTTLE_IP") or "50/60", backend),
+        )
+
+    def check(self, email: str, ip: str) -> int:
+        """Whole seconds to wait before `email` / `ip` may log in again; 0 if allowed."""
+        wait = max(self.email_window.retry_after(email), self.ip_window.retry_after(ip))
+        if not wait:
+            return 0
+        with self._lock:
+            self._rejected += 1
+        return math.ceil(wait)
+
+    def failure(self, email: str, ip: str) -> None:
+        self.email_window.hit(email)
+        self.ip_window.hit(ip)
+
+    def success(self, email: str) -> None:
+        self.email_window.reset(email)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rejected = self._rejected
+        return {
+            "rejected": rejected,
+            "email": f"{self.email_window.limit}/{self.email_window.window}",
+            "ip": f"{self.ip_window.limit}/{self.ip_window.window}",
+            "tracked_keys": len(self.email_window.backend),
+        }
+
+
+_throttle: LoginThrottle | None = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = LoginThrottle.from_env()
+    return _throttle
+
+
+def reset_login_throttle() -> LoginThrottle:
+    """Drop all counters and re-read the limits from the environment."""
+    global _throttle
+    with _throttle_lock:
+        _throttle = LoginThrottle.from_env()
+    return _throttle
@@ -0,0 +1,161 @@
+"""Signed, expiring bearer tokens.
+
+A token is `<payload>.<signature>`: the payload is URL-safe base64 JSON claims
+(`sub`, `email`, `iat`, `exp`, `jti`) and the signature is HMAC-SHA256 over it
+with the app's `SECRET_KEY`. Tokens are verified without touching the
+database; decoded claims are kept in a small LRU+TTL cache, and logged-out
+token ids (`jti`) go on a revocation list until they expire.
+
+The revocation list is in-process by default, so a logout only reaches the
+worker that served it. With more than one worker set
+`AUTH_REVOCATION_BACKEND=redis://...` (needs the `redis` package) so every
+worker sees it; gunicorn.conf.py refuses to start several workers without it.
+
+Env vars (optional): AUTH_TOKEN_TTL (seconds, default 86400),
+AUTH_REVOCATION_BACKEND (memory)
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from uuid import uuid4
+
+from flask import current_app, request
+
+from cache import TTLCache
+
+
+_claims_cache = TTLCache(maxsize=4096, ttl=300)
+SHARED_BACKENDS = ("redis://", "rediss://", "unix://")
+
+
+class MemoryRevocations:
+    """Revoked `jti`s of this process, dropped once their tokens have expired."""
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            for old in [old for old, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[old]
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            return jti in self._revoked
+
+
+class RedisRevocations:
+    """Revoked `jti`s as Redis keys expiring with their tokens, shared by all workers."""
+
+    def __init__(self, url: str, prefix: str = "revoked:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise RuntimeError("AUTH_REVOCATION_BACKEND=redis://... needs the `redis` package") from exc
+            client = redis.Redis.from_url(url)
+        self._redis = client
+        self.prefix = prefix
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = math.ceil(expires_at - time.time())
+        if ttl > 0:
+            self._redis.set(self.prefix + jti, 1, ex=ttl)
+
+    def is_revoked(self, jti: str) -> bool:
+        return bool(self._redis.exists(self.prefix + jti))
+
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+
+def get_revocations():
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                spec = (os.getenv("AUTH_REVOCATION_BACKEND") or "memory").strip()
+                _revocations = RedisRevocations(spec) if spec.startswith(SHARED_BACKENDS) else MemoryRevocations()
+    return _revocations
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    key = current_app.config["SECRET_KEY"].encode()
+    return _b64encode(hmac.new(key, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user, ttl: int | None = None) -> str:
+    """Return a signed token for `user` valid for `ttl` seconds."""
+    if ttl is None:
+        ttl = int(os.getenv("AUTH_TOKEN_TTL") or "86400")
+    now = int(time.time())
+    claims = {"sub": user.id, "email": user.email, "iat": now, "exp": now + ttl, "jti": uuid4().hex}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def decode_token(token: str) -> dict | None:
+    """Return the claims of a valid, unexpired, unrevoked token, else None."""
+    claims = _claims_cache.get(token)
+    if claims is None:
+        payload, _, signature = token.partition(".")
+        # Compare bytes: compare_digest raises TypeError for non-ASCII str
+        if not signature or not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        _claims_cache.set(token, claims, expires_at=claims.get("exp", 0))
+
+    if claims.get("exp", 0) <= time.time() or get_revocations().is_revoked(claims.get("jti", "")):
+        return None
+    return claims
+
+
+def revoke_token(token: str) -> bool:
+    """Revoke a valid token until its expiry. Returns False if it was not valid."""
+    claims = decode_token(token)
+    if claims is None:
+        return False
+    get_revocations().revoke(claims["jti"], claims["exp"])
+    _claims_cache.pop(token)
+    return True
+
+
+def bearer_token() -> str | None:
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        return auth.split(None, 1)[1]
+    return None
+
+
+def auth_claims() -> dict | None:
+    """Claims of the request's bearer token, or None if missing/invalid."""
+    token = bearer_token()
+    return decode_token(token) if token else None
+
+
+def auth_user_id() -> str | None:
+    """Id of the authenticated user, or None. Shared by every blueprint."""
+    claims = auth_claims()
+    return claims["sub"] if claims else None
@@ -0,0 +1,74 @@
+"""Micro-benchmarks for per-row hot paths (pytest-benchmark).
+
+    pytest benchmarks/bench_micro.py --benchmark-json results/micro.json
+    pytest benchmarks/bench_micro.py --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Hashing uses the active ARGON2_* profile from the environment, so run it with
+production parameters to see what a login really costs.
+"""
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from auth.argon2_hash import hash_password, verify_password  # noqa: E402
+from models import Debt, DebtParticipant  # noqa: E402
+from routes.debt_participants import parse_amount  # noqa: E402
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _debt():
+    return Debt(
+        id=str(uuid4()),
+        title="Groceries",
+        description="Weekly shopping",
+        created_by=str(uuid4()),
+        status="open",
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def _participant():
+    return DebtParticipant(
+        id=str(uuid4()),
+        debt_id=str(uuid4()),
+        from_user_id=str(uuid4()),
+        to_user_id=str(uuid4()),
+        amount=Decimal("123.45"),
+        remaining_amount=Decimal("23.45"),
+        description="Split",
+        status="open",
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def test_debt_to_dict(benchmark):
+    debts = [_debt() for _ in range(1000)]
+    benchmark(lambda: [debt.to_dict() for debt in debts])
+
+
+def test_participant_to_dict(benchmark):
+    participants = [_participant() for _ in range(1000)]
+    benchmark(lambda: [participant.to_dict() for participant in participants])
+
+
+def test_parse_amount(benchmark):
+    values = ["12.34", 99, 0.1, "1e3", "-5", "abc", None] * 100
+    benchmark(lambda: [parse_amount(value) for value in values])
+
+
+def test_hash_password(benchmark):
+    benchmark.pedantic(hash_password, args=("password123",), rounds=5, iterations=1)
+
+
+def test_verify_password(benchmark):
+    stored = hash_password("password123")
+    benchmark.pedantic(verify_password, args=(stored, "password123"), rounds=5, iterations=1)
@@ -0,0 +1,113 @@
+"""Compare list serialization paths on `--rows` participant rows.
+
+`orm`: load instances, `to_dict()` each, encode with Flask's `jsonify` (the old
+list path). `fast`: select column tuples and encode with `serialization`
+(orjson if installed). Uses an in-memory SQLite database and prints JSON.
+
+    python benchmarks/bench_serialization.py --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.pop("USE_SQLITE", None)
+
+from flask import jsonify  # noqa: E402
+
+from app import app  # noqa: E402
+from models import db, DebtParticipant  # noqa: E402
+import serialization  # noqa: E402
+from serialization import PARTICIPANT_COLUMNS, serialize_rows  # noqa: E402
+
+
+def _populate(rows: int) -> None:
+    now = datetime.utcnow()
+    users = [str(uuid4()) for _ in range(100)]
+    debts = [str(uuid4()) for _ in range(rows // 5 + 1)]
+    batch = []
+    for n in range(rows):
+        created_at = now - timedelta(seconds=n)
+        batch.append(
+            {
+                "id": str(uuid4()),
+                "debt_id": debts[n // 5],
+                "from_user_id": users[n % 100],
+                "to_user_id": users[(n + 1) % 100],
+                "amount": Decimal(n % 50000 + 1) / 100,
+                "remaining_amount": Decimal(n % 50000 + 1) / 100,
+                "description": "benchmark",
+                "status": "open",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+        if len(batch) == 10_000:
+            db.session.execute(DebtParticipant.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(DebtParticipant.__table__.insert(), batch)
+    db.session.commit()
+
+
+def _orm() -> int:
+    items = [item.to_dict() for item in DebtParticipant.query.order_by(DebtParticipant.created_at.desc()).all()]
+    return len(jsonify({"items": items}).get_data())
+
+
+def _fast(amount_format: str = "number") -> int:
+    rows = db.session.query(*PARTICIPANT_COLUMNS).order_by(DebtParticipant.created_at.desc()).all()
+    return len(serialize_rows(PARTICIPANT_COLUMNS, rows, amount_format).get_data())
+
+
+def _best_of(fn, repeat: int) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        size = fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best, 3), size
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with app.test_request_context():
+        db.create_all()
+        _populate(args.rows)
+        orm_seconds, orm_bytes = _best_of(_orm, args.repeat)
+        fast_seconds, fast_bytes = _best_of(_fast, args.repeat)
+        string_seconds, _ = _best_of(lambda: _fast("string"), args.repeat)
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "encoder": "orjson" if serialization.orjson is not None else "json",
+                "orm_to_dict_jsonify_s": orm_seconds,
+                "fast_tuples_s": fast_seconds,
+                "fast_tuples_amount_string_s": string_seconds,
+                "speedup": round(orm_seconds / fast_seconds, 2) if fast_seconds else None,
+                "bytes": {"orm": orm_bytes, "fast": fast_bytes},
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Benchmark the settlement planner on a large synthetic graph.
+
+Streams `--edges` random open edges between `--users` users through
+`net_balances` and `plan_settlement`, then reports wall time and peak RSS growth
+as JSON. Edges are generated lazily, so memory is bounded by the number of users,
+not edges. Exits non-zero if either budget is exceeded.
+
+    python benchmarks/bench_settlement.py --users 10000 --edges 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from settlement import net_balances, plan_settlement  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def generate_edges(users: int, edges: int, seed: int):
+    rng = random.Random(seed)
+    user_ids = [f"user-{i}" for i in range(users)]
+    for _ in range(edges):
+        from_index = rng.randrange(users)
+        to_index = (from_index + rng.randrange(1, users)) % users
+        yield user_ids[from_index], user_ids[to_index], Decimal(rng.randint(1, 50000)) / 100
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-seconds", type=float, default=30.0)
+    parser.add_argument("--max-mb", type=float, default=64.0)
+    args = parser.parse_args(argv)
+
+    baseline_mb = _peak_rss_mb()
+    started = time.perf_counter()
+    balances = net_balances(generate_edges(args.users, args.edges, args.seed))
+    netted = time.perf_counter()
+    transfers = plan_settlement(balances)
+    finished = time.perf_counter()
+    peak_mb = _peak_rss_mb()
+
+    result = {
+        "users": args.users,
+        "edges": args.edges,
+        "transfers": len(transfers),
+        "net_seconds": round(netted - started, 3),
+        "plan_seconds": round(finished - netted, 3),
+        "total_seconds": round(finished - started, 3),
+        "rss_growth_mb": round(peak_mb - baseline_mb, 2) if peak_mb is not None else None,
+    }
+    print(json.dumps(result))
+
+    over_memory = result["rss_growth_mb"] is not None and result["rss_growth_mb"] > args.max_mb
+    if result["total_seconds"] > args.max_seconds or over_memory:
+        print("budget exceeded", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Load test: connected Socket.IO clients one worker can keep up with.
+
+Connects clients to a running server in steps of `--step`, all joined to the
+same user room, then makes `--events` writes per step over HTTP and measures
+how many `change` events reach every client and how long they take
+(HTTP write -> push received). Stops at the first step that loses events,
+fails to connect or exceeds `--max-p99-ms`, and prints the steps as JSON with
+`max_clients` = the last step that passed.
+
+Run one worker, e.g. `gunicorn -k eventlet -w 1 app:app -b 127.0.0.1:5000`
+(SOCKETIO_ASYNC_MODE=eventlet), then:
+
+    python benchmarks/bench_socketio.py --url http://127.0.0.1:5000 --step 250 --max-clients 5000
+
+Install `websocket-client` to test the websocket transport; without it the
+clients fall back to long-polling.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from uuid import uuid4
+
+import requests
+import socketio
+
+
+def _user(base_url: str, email: str, password: str) -> tuple[str, str]:
+    """Register (if needed) and log in; returns `(user_id, token)`."""
+    requests.post(f"{base_url}/auth/register", json={"email": email, "password": password})
+    token = requests.post(f"{base_url}/auth/login", json={"email": email, "password": password}).json()["token"]
+    user_id = requests.get(f"{base_url}/auth/me", headers={"Authorization": f"Bearer {token}"}).json()["id"]
+    return user_id, token
+
+
+class Listener:
+    def __init__(self):
+        self.received: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def on_change(self, event):
+        now = time.perf_counter()
+        with self._lock:
+            self.received.setdefault(event.get("id"), []).append(now)
+
+    def count(self, event_id: str) -> int:
+        with self._lock:
+            return len(self.received.get(event_id, ()))
+
+
+def _connect(url: str, token: str, listener: Listener):
+    client = socketio.Client(reconnection=False)
+    client.on("change", listener.on_change)
+    client.connect(url, auth={"token": token}, wait_timeout=10)
+    return client
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_step(args, clients: int, listener: Listener, watcher_id: str, creator_id: str) -> dict:
+    latencies, delivered, expected = [], 0, 0
+    for _ in range(args.events):
+        sent = time.perf_counter()
+        debt = requests.post(
+            f"{args.url}/debts",
+            json={
+                "title": f"load {uuid4().hex[:8]}",
+                "created_by": creator_id,
+                "participants": [{"from_user_id": watcher_id, "to_user_id": creator_id, "amount": 1}],
+            },
+        ).json()
+        deadline = time.perf_counter() + args.timeout
+        while listener.count(debt["id"]) < clients and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        arrivals = listener.received.get(debt["id"], [])
+        latencies.extend((arrival - sent) * 1000 for arrival in arrivals)
+        delivered += len(arrivals)
+        expected += clients
+
+    return {
+        "clients": clients,
+        "delivered_ratio": round(delivered / expected, 4) if expected else None,
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99), 1) if latencies else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--step", type=int, default=250)
+    parser.add_argument("--max-clients", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=5, help="writes per step")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for each event")
+    parser.add_argument("--max-p99-ms", type=float, default=1000.0)
+    args = parser.parse_args(argv)
+
+    suffix = uuid4().hex[:8]
+    watcher_id, token = _user(args.url, f"load-watch-{suffix}@example.com", "password123")
+    creator_id, _ = _user(args.url, f"load-create-{suffix}@example.com", "password123")
+
+    listener = Listener()
+    connected, steps, max_clients = [], [], 0
+    try:
+        for target in range(args.step, args.max_clients + 1, args.step):
+            failures = 0
+            while len(connected) + failures < target:
+                try:
+                    connected.append(_connect(args.url, token, listener))
+                except socketio.exceptions.ConnectionError:
+                    failures += 1
+            step = run_step(args, len(connected), listener, watcher_id, creator_id)
+            step["connect_failures"] = failures
+            steps.append(step)
+            print(json.dumps(step), file=sys.stderr)
+            if failures or step["delivered_ratio"] != 1 or step["p99_ms"] > args.max_p99_ms:
+                break
+            max_clients = target
+    finally:
+        for client in connected:
+            client.disconnect()
+
+    print(json.dumps({"max_clients": max_clients, "max_p99_ms": args.max_p99_ms, "steps": steps}, indent=2))
+    return 0 if max_clients else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""HTTP load scenario against a running API: login, list debts, create split, balances.
+
+Seed accounts first (`python seed.py --users 1000 --debts 20000`), start the
+server (`gunicorn -c gunicorn.conf.py wsgi:app`), then:
+
+    python benchmarks/load_http.py --url http://127.0.0.1:5000 --duration 20 --concurrency 8
+
+Each scenario runs for `--duration` seconds on `--concurrency` threads, each
+thread logged in as its own seeded account. Results (requests, errors, rps,
+p50/p95/p99 latency, plus git commit and database dialect) are written as JSON
+to `--out`, by default `results/load-<dialect>-<commit>.json`. With
+`--compare <older.json>` the run fails if any scenario's p95 grew or its rps
+dropped by more than `--max-regression`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+SCENARIOS = ("login", "list_debts", "create_split", "balances")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 2)
+
+
+class Account:
+    def __init__(self, base_url: str, email: str, password: str):
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.session = requests.Session()
+        self.token = None
+        self.user_id = None
+        self.debt_id = None
+
+    def login(self) -> requests.Response:
+        resp = self.session.post(f"{self.base_url}/auth/login", json={"email": self.email, "password": self.password})
+        if resp.ok:
+            self.token = resp.json()["token"]
+            self.session.headers["Authorization"] = f"Bearer {self.token}"
+        return resp
+
+    def setup(self) -> None:
+        resp = self.login()
+        resp.raise_for_status()
+        self.user_id = self.session.get(f"{self.base_url}/auth/me").json()["id"]
+        self.debt_id = self.session.post(f"{self.base_url}/debts", json={"title": "load test"}).json()["id"]
+
+
+def _request(scenario: str, account: Account, others: list[str]) -> requests.Response:
+    base = account.base_url
+    if scenario == "login":
+        return account.login()
+    if scenario == "list_debts":
+        return account.session.get(f"{base}/debts", params={"created_by": account.user_id, "limit": 50})
+    if scenario == "create_split":
+        split = {"mode": "even", "total": "90.00", "to_user_id": account.user_id, "from_user_ids": others}
+        return account.session.post(f"{base}/debt-participants/bulk", json={"debt_id": account.debt_id, "split": split})
+    return account.session.get(f"{base}/balances")
+
+
+def run_scenario(scenario: str, accounts: list[Account], duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    user_ids = [account.user_id for account in accounts]
+
+    def worker(index: int):
+        nonlocal errors
+        account = accounts[index]
+        others = [user_id for user_id in user_ids if user_id != account.user_id][:3]
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = _request(scenario, account, others).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(len(accounts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else None,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+    }
+
+
+def regressions(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    found = []
+    for scenario, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before:
+            continue
+        if before.get("p95_ms") and result["p95_ms"] and result["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            found.append(f"{scenario}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if before.get("rps") and result["rps"] < before["rps"] * (1 - max_regression):
+            found.append(f"{scenario}: rps {before['rps']} -> {result['rps']}")
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--email-pattern", default="synthetic-42-{n}@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--out", help="result file (default results/load-<dialect>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    accounts = [Account(args.url, args.email_pattern.format(n=n), args.password) for n in range(args.concurrency)]
+    for account in accounts:
+        account.setup()
+
+    database = requests.get(f"{args.url}/health/db").json().get("dialect")
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "url": args.url,
+            "database": database,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "scenarios": {},
+    }
+    for scenario in args.scenarios.split(","):
+        result["scenarios"][scenario] = run_scenario(scenario, accounts, args.duration)
+        print(scenario, json.dumps(result["scenarios"][scenario]), file=sys.stderr)
+
+    out = Path(args.out or f"results/load-{database}-{result['meta']['git_commit'] or 'local'}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"results written to {out}")
+
+    if args.compare:
+        found = regressions(result, json.loads(Path(args.compare).read_text()), args.max_regression)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Load test: legitimate read throughput during a credential-stuffing wave.
+
+Seed accounts and start the server as for `load_http.py`, then:
+
+    python benchmarks/load_stuffing.py --url http://127.0.0.1:5000 --duration 20 --readers 4 --attackers 16
+
+Readers (logged-in seeded accounts) list their debts for `--duration` seconds,
+first alone (`baseline`), then while attackers post wrong passwords to
+`/auth/login` (`attack`): half against existing synthetic emails, half against
+random unknown ones. Prints JSON with reader rps/p50/p95/p99 for both phases,
+the attack's status-code mix (429 = shed before hashing) and the server's
+`/health/hashing` counters. Run once with default limits and once with e.g.
+`LOGIN_THROTTLE_IP=1000000/60 LOGIN_THROTTLE_EMAIL=1000000/60` to see the
+difference.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from uuid import uuid4
+
+import requests
+
+from load_http import Account, _percentile
+
+
+def _readers(accounts: list[Account], duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(account: Account):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = account.session.get(
+                    f"{account.base_url}/debts", params={"created_by": account.user_id, "limit": 50}
+                ).ok
+            except requests.RequestException:
+                ok = False
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += not ok
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(account,)) for account in accounts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else None,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+    }
+
+
+def _attack(base_url: str, email_pattern: str, attackers: int, stop: threading.Event) -> Counter:
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def worker(index: int):
+        session = requests.Session()
+        n = 0
+        while not stop.is_set():
+            n += 1
+            if n % 2:
+                email = email_pattern.format(n=(index * 7919 + n) % 1000)
+            else:
+                email = f"{uuid4().hex}@example.com"
+            try:
+                resp = session.post(f"{base_url}/auth/login", json={"email": email, "password": "wrong-guess"})
+                status = resp.status_code
+            except requests.RequestException:
+                status = "error"
+            with lock:
+                statuses[status] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(attackers)]
+    for thread in threads:
+        thread.start()
+    stop.wait()
+    for thread in threads:
+        thread.join(10)
+    return statuses
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--email-pattern", default="synthetic-42-{n}@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--attackers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = parser.parse_args(argv)
+
+    accounts = [Account(args.url, args.email_pattern.format(n=n), args.password) for n in range(args.readers)]
+    for account in accounts:
+        account.setup()
+
+    baseline = _readers(accounts, args.duration)
+
+    stop = threading.Event()
+    statuses: Counter = Counter()
+    attack = threading.Thread(
+        target=lambda: statuses.update(_attack(args.url, args.email_pattern, args.attackers, stop))
+    )
+    attack.start()
+    under_attack = _readers(accounts, args.duration)
+    stop.set()
+    attack.join()
+
+    result = {
+        "readers": args.readers,
+        "attackers": args.attackers,
+        "duration": args.duration,
+        "baseline": baseline,
+        "attack": under_attack,
+        "read_rps_retained": round(under_attack["rps"] / baseline["rps"], 3) if baseline["rps"] else None,
+        "login_statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "hashing": requests.get(f"{args.url}/health/hashing").json(),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Engine options, SQLite pragmas and connection-pool health.
+
+`engine_options(database_url)` builds `SQLALCHEMY_ENGINE_OPTIONS` from the
+environment. Pool settings only apply to server databases (Postgres); SQLite
+keeps Flask-SQLAlchemy's own pool choice and gets a busy timeout instead.
+
+Env vars (optional):
+    DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 s),
+    DB_POOL_RECYCLE (1800 s), DB_POOL_PRE_PING (1),
+    DB_STATEMENT_TIMEOUT_MS (Postgres, off when empty),
+    SQLITE_BUSY_TIMEOUT_MS (5000)
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.getenv(name) or default)
+
+
+def _flag_env(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in {"1", "true", "yes"}
+
+
+def engine_options(database_url: str) -> dict:
+    if database_url.startswith("sqlite"):
+        # sqlite3's own busy handler; the PRAGMA below covers raw connections too
+        return {"connect_args": {"timeout": _int_env("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000}}
+
+    options = {
+        "pool_size": _int_env("DB_POOL_SIZE", 5),
+        "max_overflow": _int_env("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _int_env("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _int_env("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _flag_env("DB_POOL_PRE_PING", True),
+    }
+    statement_timeout = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout and database_url.startswith(("postgres", "postgresql")):
+        options["connect_args"] = {"options": f"-c statement_timeout={int(statement_timeout)}"}
+    return options
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the single writer; writers wait instead of failing."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={_int_env('SQLITE_BUSY_TIMEOUT_MS', 5000)}")
+    cursor.close()
+
+
+def pool_status(engine) -> dict:
+    """Checked-out vs. available connections of `engine`'s pool."""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__, "dialect": engine.dialect.name}
+    if not isinstance(pool, QueuePool):
+        return status
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    status.update(
+        {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+        }
+    )
+    return status
@@ -0,0 +1,58 @@
+"""Strong ETags and conditional GETs for read endpoints.
+
+Single rows are versioned by `(id, updated_at)`, filtered lists by
+`(count, max(updated_at))` of the filtered query plus the query string. Both
+versions come from one narrow query that reads no row payloads, so a request
+whose `If-None-Match` still matches is answered with 304 before anything is
+loaded or serialized.
+
+Every write must bump `updated_at` (ORM `onupdate`, or set explicitly in
+Core/bulk UPDATEs) for the tags to change.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from flask import current_app, request
+from sqlalchemy import func
+
+from models import db
+
+
+def compute_etag(*parts) -> str:
+    return hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def args_key(args) -> str:
+    return "&".join(f"{key}={value}" for key, value in sorted(args.items(multi=True)))
+
+
+def row_version(model, row_id):
+    """`updated_at` of one row, or None if it does not exist. Reads only that column."""
+    row = db.session.query(model.updated_at).filter(model.id == row_id).first()
+    return None if row is None else row.updated_at
+
+
+def collection_version(*sources) -> tuple:
+    """`(count, max(updated_at))` for each `(query, model)` source, in one round trip."""
+    columns = []
+    for query, model in sources:
+        query = query.order_by(None)
+        columns.append(query.with_entities(func.count(model.id)).scalar_subquery())
+        columns.append(query.with_entities(func.max(model.updated_at)).scalar_subquery())
+    return tuple(db.session.query(*columns).one())
+
+
+def not_modified(etag: str):
+    """A 304 response if the request already holds `etag`, else None."""
+    if etag not in request.if_none_match:
+        return None
+    response = current_app.response_class(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag: str):
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate before reusing it
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
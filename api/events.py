@@ -0,0 +1,105 @@
+"""Change events pushed to clients over Socket.IO.
+
+Write paths call `publish()` after their commit with the ids of the users the
+change concerns. Each event goes to in-process subscribers (`bus.subscribe`)
+and is emitted as a `change` event to the `user:<id>` room of every affected
+user. Clients join their room on connect by passing their bearer token
+(`auth={"token": ...}` or `?token=`).
+
+Events are compact, e.g.
+`{"type": "debt_participant.updated", "id": ..., "debt_id": ..., "data": {...}}`;
+deletes carry no `data`. Clients patch their state from `data` or refetch
+(cheaply, with `If-None-Match`).
+
+With SOCKETIO_MESSAGE_QUEUE set (e.g. `redis://localhost:6379/0`, needs the
+`redis` package) emits go through the queue, so every worker fans events out
+to its own connected clients. Without it the backplane is in-process, which is
+enough for a single worker.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Iterable
+
+from flask import request
+from flask_socketio import SocketIO, join_room
+
+from auth.tokens import bearer_token, decode_token
+from models import db, Debt, DebtParticipant
+
+logger = logging.getLogger(__name__)
+
+socketio = SocketIO()
+
+
+def user_room(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class EventBus:
+    """Fan change events out to local subscribers and to Socket.IO rooms."""
+
+    def __init__(self):
+        self._subscribers: list[Callable[[dict, list[str]], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[dict, list[str]], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict, list[str]], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, event: dict, user_ids: Iterable[str | None]) -> None:
+        user_ids = sorted({user_id for user_id in user_ids if user_id})
+        with self._lock:
+            subscribers = list(self._subscribers)
+        # The change is already committed; a failing listener must not fail the request
+        for callback in subscribers:
+            try:
+                callback(event, user_ids)
+            except Exception:
+                logger.exception("event subscriber failed for %s", event.get("type"))
+        if socketio.server is None:
+            return
+        for user_id in user_ids:
+            try:
+                socketio.emit("change", event, to=user_room(user_id))
+            except Exception:
+                logger.exception("could not emit %s", event.get("type"))
+
+
+bus = EventBus()
+
+
+def change_event(entity: str, op: str, row_id: str | None = None, data: dict | None = None, **extra) -> dict:
+    event = {"type": f"{entity}.{op}", **extra}
+    if row_id is not None:
+        event["id"] = row_id
+    if data is not None:
+        event["data"] = data
+    return event
+
+
+def publish(event: dict, user_ids: Iterable[str | None]) -> None:
+    bus.publish(event, user_ids)
+
+
+def debt_audience(*debt_ids: str) -> set[str]:
+    """Creators of the debts and both ends of each of their participant rows (one query)."""
+    creators = db.session.query(Debt.created_by).filter(Debt.id.in_(debt_ids))
+    debtors = db.session.query(DebtParticipant.from_user_id).filter(DebtParticipant.debt_id.in_(debt_ids))
+    creditors = db.session.query(DebtParticipant.to_user_id).filter(DebtParticipant.debt_id.in_(debt_ids))
+    return {user_id for (user_id,) in creators.union(debtors, creditors)}
+
+
+@socketio.on("connect")
+def on_connect(auth=None):
+    token = (auth or {}).get("token") or request.args.get("token") or bearer_token()
+    claims = decode_token(token) if token else None
+    if claims is None:
+        return False
+    join_room(user_room(claims["sub"]))
@@ -0,0 +1,61 @@
+"""`?expand=` support for nested debt views.
+
+`participants` eager-loads each debt's edges with one `selectinload` query;
+`users` side-loads every referenced user (creators and both ends of each edge)
+into a top-level `users` map with one `IN` query. A page of debts therefore
+costs at most three queries regardless of fan-out.
+"""
+from __future__ import annotations
+
+from sqlalchemy.orm import selectinload
+
+from models import Debt, User
+
+EXPANDABLE = {"participants", "users"}
+
+
+class ExpandError(ValueError):
+    """Raised for an unknown `expand` value."""
+
+
+def parse_expand(args) -> set[str]:
+    expand = {part.strip() for part in (args.get("expand") or "").split(",") if part.strip()}
+    unknown = expand - EXPANDABLE
+    if unknown:
+        raise ExpandError(f"cannot expand: {', '.join(sorted(unknown))}")
+    return expand
+
+
+def apply_expand(query, expand: set[str]):
+    """Add eager-loading options for `expand` to a Debt query."""
+    if "participants" in expand:
+        query = query.options(selectinload(Debt.participants))
+    return query
+
+
+def _referenced_user_ids(debts, expand: set[str]) -> set[str]:
+    user_ids = set()
+    for debt in debts:
+        user_ids.add(debt.created_by)
+        if "participants" in expand:
+            for participant in debt.participants:
+                user_ids.add(participant.from_user_id)
+                user_ids.add(participant.to_user_id)
+    return user_ids
+
+
+def serialize_debts(debts, expand: set[str]) -> dict:
+    """Return `{"items": [...]}` plus a `users` map when requested."""
+    items = []
+    for debt in debts:
+        item = debt.to_dict()
+        if "participants" in expand:
+            item["participants"] = [participant.to_dict() for participant in debt.participants]
+        items.append(item)
+
+    result = {"items": items}
+    if "users" in expand:
+        user_ids = _referenced_user_ids(debts, expand)
+        users = User.query.filter(User.id.in_(user_ids)).all() if user_ids else []
+        result["users"] = {user.id: user.to_dict() for user in users}
+    return result
@@ -0,0 +1,36 @@
+"""Gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Env vars (optional):
+    PORT (5000), GUNICORN_WORKER_CLASS (eventlet), WEB_CONCURRENCY (1),
+    GUNICORN_THREADS (8, gthread only), GUNICORN_WORKER_CONNECTIONS (1000, eventlet only),
+    GUNICORN_TIMEOUT (30)
+
+`eventlet` serves Socket.IO websockets and many idle connections per worker.
+`gthread` is plain threads; Socket.IO then falls back to long-polling, so set
+SOCKETIO_ASYNC_MODE=threading with it. Socket.IO needs sticky sessions, so run
+more than one worker only behind a sticky load balancer with
+SOCKETIO_MESSAGE_QUEUE set; otherwise scale with more single-worker processes.
+
+Under eventlet, Argon2 hashes run on `eventlet.tpool` OS threads (see
+auth/executor.py), so a login does not stall the worker's other connections.
+
+More than one worker needs AUTH_REVOCATION_BACKEND=redis://... (see auth/tokens.py).
+
+Each worker has its own SQLAlchemy pool: keep
+WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres' max_connections.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT') or 5000}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or "eventlet"
+workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+# Logout revocations are per process unless shared; don't let a token outlive logout on other workers
+revocation_backend = (os.getenv("AUTH_REVOCATION_BACKEND") or "").strip()
+if workers > 1 and not revocation_backend.startswith(("redis://", "rediss://", "unix://")):
+    raise RuntimeError("WEB_CONCURRENCY > 1 needs AUTH_REVOCATION_BACKEND=redis://... so logout reaches every worker")
+threads = int(os.getenv("GUNICORN_THREADS") or 8)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS") or 1000)
+timeout = int(os.getenv("GUNICORN_TIMEOUT") or 30)
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
@@ -0,0 +1,40 @@
+"""Import historical debts from a CSV file (see `importer.py` for the format).
+
+    python import_csv.py history.csv --batch-size 5000 --rejects rejects.csv
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from app import app
+from importer import DEFAULT_BATCH_SIZE, CsvDecodeError, CsvImporter, decode_lines, reject_writer_for
+from models import db
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import historical debts from CSV.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--rejects", default="rejects.csv", help="where to write rejected lines")
+    args = parser.parse_args(argv)
+
+    with app.app_context(), open(args.path, "rb") as source, open(
+        args.rejects, "w", newline="", encoding="utf-8"
+    ) as rejects:
+        db.create_all()
+        try:
+            report = CsvImporter(args.batch_size, reject_writer_for(rejects)).run(decode_lines(source))
+        except CsvDecodeError as exc:
+            db.session.rollback()
+            sys.exit(f"{args.path}: {exc}; earlier batches were committed")
+
+    report.pop("errors")
+    print(json.dumps(report))
+    if report["rejected"]:
+        print(f"{report['rejected']} rejected lines written to {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
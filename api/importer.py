@@ -0,0 +1,225 @@
+"""Bulk import of historical debts from CSV.
+
+One CSV row is one participant edge; rows sharing a `debt_ref` belong to the
+same debt and the debt columns are taken from the first of them. A row with no
+`from_email`/`to_email`/`amount` creates a debt without edges.
+
+Columns: debt_ref, title, description, status, created_by, created_at,
+from_email, to_email, amount, participant_description, participant_status
+
+`created_by`, `from_email` and `to_email` are user emails, resolved once per
+batch with a single IN query and remembered in an in-memory map. Rows are
+validated with the same rules as the routes; bad lines are written to the
+reject writer (original columns + `line` + `error`) and skipped. Valid rows
+are inserted with one executemany per table per batch (psycopg2 turns that
+into multi-row INSERTs on Postgres), added to the balance ledger and committed
+per batch. After each commit a `debt.imported` change event names every user
+the batch touched, so per-user caches (e.g. the dashboard) drop their entries.
+"""
+from __future__ import annotations
+
+import csv
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from events import change_event, publish
+from ledger import apply_edges
+from models import db, Debt, DebtParticipant, User
+from routes.debt_participants import validate_participant
+from routes.debts import ALLOWED_STATUSES as DEBT_STATUSES
+
+COLUMNS = [
+    "debt_ref",
+    "title",
+    "description",
+    "status",
+    "created_by",
+    "created_at",
+    "from_email",
+    "to_email",
+    "amount",
+    "participant_description",
+    "participant_status",
+]
+DEFAULT_BATCH_SIZE = 1000
+
+
+class CsvDecodeError(ValueError):
+    """Raised when a line of the input is not valid UTF-8."""
+
+    def __init__(self, line: int):
+        super().__init__(f"line {line} is not valid UTF-8")
+        self.line = line
+
+
+def decode_lines(stream):
+    """Decode a binary CSV stream line by line (UTF-8, optional BOM).
+
+    Decoding per line (instead of a lazy TextIOWrapper) pins a bad byte to its
+    line number. Raises `CsvDecodeError`.
+    """
+    for line, raw in enumerate(stream, 1):
+        try:
+            yield raw.decode("utf-8-sig" if line == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise CsvDecodeError(line) from None
+
+
+class CsvImporter:
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, reject_writer=None):
+        self.batch_size = batch_size
+        self.reject_writer = reject_writer
+        self.user_ids: dict[str, str | None] = {}
+        self.debt_ids: dict[str, str] = {}
+        # debt id -> created_by / created_at, for rows of the debt in later batches
+        self.debt_creators: dict[str, str] = {}
+        self.debt_dates: dict[str, datetime] = {}
+        self.report = {"rows": 0, "debts": 0, "participants": 0, "rejected": 0, "errors": []}
+
+    def _reject(self, line: int, row: dict, error: str) -> None:
+        self.report["rejected"] += 1
+        if len(self.report["errors"]) < 100:
+            self.report["errors"].append({"line": line, "error": error})
+        if self.reject_writer is not None:
+            self.reject_writer.writerow({**{k: row.get(k) for k in COLUMNS}, "line": line, "error": error})
+
+    def _resolve_emails(self, rows) -> None:
+        wanted = set()
+        for _, row in rows:
+            for key in ("created_by", "from_email", "to_email"):
+                email = (row.get(key) or "").strip().lower()
+                if email and email not in self.user_ids:
+                    wanted.add(email)
+        if not wanted:
+            return
+        found = db.session.query(User.email, User.id).filter(User.email.in_(wanted)).all()
+        self.user_ids.update({email: None for email in wanted})
+        self.user_ids.update(dict(found))
+
+    def _user(self, row: dict, key: str) -> str | None:
+        return self.user_ids.get((row.get(key) or "").strip().lower())
+
+    def _debt_row(self, row: dict, now: datetime):
+        title = (row.get("title") or "").strip()
+        status = (row.get("status") or "open").strip().lower()
+        created_by = self._user(row, "created_by")
+        if not title:
+            return None, "title is required"
+        if status not in DEBT_STATUSES:
+            return None, "invalid status"
+        if not created_by:
+            return None, "unknown created_by user"
+        created_at = now
+        if (row.get("created_at") or "").strip():
+            try:
+                created_at = datetime.fromisoformat(row["created_at"].strip())
+            except ValueError:
+                return None, "invalid created_at"
+        return {
+            "id": str(uuid4()),
+            "title": title,
+            "description": (row.get("description") or "").strip() or None,
+            "created_by": created_by,
+            "status": status,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }, None
+
+    def _process_batch(self, rows) -> None:
+        self._resolve_emails(rows)
+        now = datetime.utcnow()
+        debts, participants = [], []
+
+        for line, row in rows:
+            ref = (row.get("debt_ref") or "").strip() or f"line:{line}"
+            has_edge = any((row.get(key) or "").strip() for key in ("from_email", "to_email", "amount"))
+
+            fields = None
+            if has_edge:
+                from_user_id = self._user(row, "from_email")
+                to_user_id = self._user(row, "to_email")
+                if not from_user_id or not to_user_id:
+                    self._reject(line, row, "unknown from_email/to_email user")
+                    continue
+                fields, error = validate_participant(
+                    {
+                        "from_user_id": from_user_id,
+                        "to_user_id": to_user_id,
+                        "amount": row.get("amount"),
+                        "description": row.get("participant_description"),
+                        "status": row.get("participant_status"),
+                    }
+                )
+                if error:
+                    self._reject(line, row, error)
+                    continue
+
+            debt_id = self.debt_ids.get(ref)
+            if debt_id is None:
+                debt, error = self._debt_row(row, now)
+                if error:
+                    self._reject(line, row, error)
+                    continue
+                debts.append(debt)
+                debt_id = self.debt_ids[ref] = debt["id"]
+                self.debt_creators[debt_id] = debt["created_by"]
+                self.debt_dates[debt_id] = debt["created_at"]
+
+            if fields is not None:
+                # Historical edges date from their debt, not from the import
+                created_at = self.debt_dates[debt_id]
+                participants.append(
+                    {
+                        "id": str(uuid4()),
+                        "debt_id": debt_id,
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                        **fields,
+                    }
+                )
+
+        if debts:
+            db.session.execute(Debt.__table__.insert(), debts)
+        if participants:
+            db.session.execute(DebtParticipant.__table__.insert(), participants)
+            apply_edges(
+                (row["from_user_id"], row["to_user_id"], row["remaining_amount"])
+                for row in participants
+                if row["status"] == "open"
+            )
+        db.session.commit()
+        self.report["debts"] += len(debts)
+        self.report["participants"] += len(participants)
+
+        if debts or participants:
+            audience = {debt["created_by"] for debt in debts}
+            for row in participants:
+                audience.update((row["from_user_id"], row["to_user_id"], self.debt_creators[row["debt_id"]]))
+            publish(change_event("debt", "imported", debts=len(debts), participants=len(participants)), audience)
+
+    def run(self, lines) -> dict:
+        """Import from an iterable of CSV text lines and return the report."""
+        started = time.perf_counter()
+        batch = []
+        reader = csv.DictReader(lines)
+        # Physical file line where the record ends, so quoted newlines don't shift it
+        for row in reader:
+            batch.append((reader.line_num, row))
+            self.report["rows"] += 1
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch)
+                batch = []
+        if batch:
+            self._process_batch(batch)
+
+        elapsed = time.perf_counter() - started
+        self.report["seconds"] = round(elapsed, 3)
+        self.report["rows_per_sec"] = round(self.report["rows"] / elapsed, 1) if elapsed else None
+        return self.report
+
+
+def reject_writer_for(handle):
+    writer = csv.DictWriter(handle, fieldnames=COLUMNS + ["line", "error"])
+    writer.writeheader()
+    return writer
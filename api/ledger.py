@@ -0,0 +1,166 @@
+"""Incrementally maintained `user_balances` ledger.
+
+Open edges count with their `remaining_amount`, so payments shrink balances.
+Every write path that creates, changes or removes open participant rows calls
+`apply_edges()` inside its own transaction, before committing, with the edges
+it adds (`sign=1`) or takes away (`sign=-1`). Balance reads are then a primary
+key lookup instead of an aggregate over the whole history.
+
+    python ledger.py rebuild   # recompute the table from debt_participants
+    python ledger.py check     # report pairs where the table disagrees
+"""
+from __future__ import annotations
+
+import sys
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, DebtParticipant, UserBalance
+
+CENT = Decimal("0.01")
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def contribution(participant) -> tuple[str, str, Decimal] | None:
+    """The `(from_user_id, to_user_id, remaining)` edge a participant adds, if open."""
+    if participant.status != "open":
+        return None
+    remaining = participant.remaining_amount
+    if remaining is None:
+        remaining = participant.amount
+    return participant.from_user_id, participant.to_user_id, Decimal(remaining)
+
+
+def _pair_deltas(edges: Iterable[tuple[str, str, Decimal] | None], sign: int) -> dict:
+    deltas: dict[tuple[str, str], Decimal] = defaultdict(Decimal)
+    for edge in edges:
+        if edge is None:
+            continue
+        from_user_id, to_user_id, amount = edge
+        if from_user_id == to_user_id:
+            continue
+        deltas[(to_user_id, from_user_id)] += sign * Decimal(amount)
+        deltas[(from_user_id, to_user_id)] -= sign * Decimal(amount)
+    return {pair: delta for pair, delta in deltas.items() if delta}
+
+
+def apply_edges(edges: Iterable[tuple[str, str, Decimal] | None], sign: int = 1) -> None:
+    """Add (or with `sign=-1` remove) open edges to the ledger in the current session."""
+    deltas = _pair_deltas(edges, sign)
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "counterparty_id": counterparty_id, "amount": delta, "updated_at": now}
+        for (user_id, counterparty_id), delta in deltas.items()
+    ]
+    table = UserBalance.__table__
+    insert = _UPSERT_DIALECTS.get(db.engine.dialect.name)
+    if insert is not None:
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.counterparty_id],
+            set_={"amount": table.c.amount + stmt.excluded.amount, "updated_at": stmt.excluded.updated_at},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = db.session.execute(
+            table.update()
+            .where(table.c.user_id == row["user_id"], table.c.counterparty_id == row["counterparty_id"])
+            .values(amount=table.c.amount + row["amount"], updated_at=now)
+        )
+        if not updated.rowcount:
+            db.session.execute(table.insert(), row)
+
+
+def open_edges(*criteria) -> list[tuple[str, str, Decimal]]:
+    """Open edges matching `criteria`, pre-summed per (from, to) pair."""
+    return (
+        db.session.query(
+            DebtParticipant.from_user_id, DebtParticipant.to_user_id, func.sum(DebtParticipant.remaining_amount)
+        )
+        .filter(DebtParticipant.status == "open", *criteria)
+        .group_by(DebtParticipant.from_user_id, DebtParticipant.to_user_id)
+        .all()
+    )
+
+
+def balances_for(user_id: str) -> dict[str, Decimal]:
+    """`{counterparty_id: net}` for `user_id`, read from the ledger."""
+    rows = (
+        db.session.query(UserBalance.counterparty_id, UserBalance.amount)
+        .filter(UserBalance.user_id == user_id, UserBalance.amount != 0)
+        .all()
+    )
+    return {counterparty_id: Decimal(amount).quantize(CENT) for counterparty_id, amount in rows}
+
+
+def expected_balances() -> dict[tuple[str, str], Decimal]:
+    """Recompute every non-zero pair from `debt_participants`."""
+    return {pair: delta.quantize(CENT) for pair, delta in _pair_deltas(open_edges(), 1).items()}
+
+
+def rebuild() -> int:
+    """Replace the ledger with a fresh aggregate. Returns the number of rows written."""
+    db.session.query(UserBalance).delete()
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "counterparty_id": counterparty_id, "amount": amount, "updated_at": now}
+        for (user_id, counterparty_id), amount in expected_balances().items()
+    ]
+    if rows:
+        db.session.execute(UserBalance.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def check() -> list[dict]:
+    """Return the pairs whose stored balance differs from a full recompute."""
+    expected = expected_balances()
+    stored = {
+        (user_id, counterparty_id): Decimal(amount).quantize(CENT)
+        for user_id, counterparty_id, amount in db.session.query(
+            UserBalance.user_id, UserBalance.counterparty_id, UserBalance.amount
+        )
+        if amount
+    }
+    mismatches = []
+    for user_id, counterparty_id in sorted(expected.keys() | stored.keys()):
+        want = expected.get((user_id, counterparty_id), Decimal(0))
+        have = stored.get((user_id, counterparty_id), Decimal(0))
+        if want != have:
+            mismatches.append(
+                {"user_id": user_id, "counterparty_id": counterparty_id, "expected": str(want), "stored": str(have)}
+            )
+    return mismatches
+
+
+def main(argv=None) -> int:
+    from app import app
+
+    command = (argv or sys.argv[1:] or ["check"])[0]
+    with app.app_context():
+        db.create_all()
+        if command == "rebuild":
+            print(f"user_balances rebuilt: {rebuild()} rows")
+            return 0
+        if command == "check":
+            mismatches = check()
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatched pairs")
+            return 1 if mismatches else 0
+    print("usage: python ledger.py [rebuild|check]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
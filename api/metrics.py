@@ -0,0 +1,210 @@
+"""Opt-in per-request instrumentation (METRICS_ENABLED=1).
+
+For every request the middleware records wall time, the number and total time
+of SQL statements (SQLAlchemy cursor events), JSON serialization time and time
+spent waiting on Argon2 (`timed("hash")` in `auth.executor`). They are
+aggregated per endpoint into Prometheus histograms served at `GET /metrics`
+and echoed in a `Server-Timing` header. Metrics are per process: scrape every
+worker.
+
+Profiling: with PROFILE_SAMPLE_RATE > 0 that share of requests runs under
+cProfile, and those slower than PROFILE_SLOW_MS are dumped to PROFILE_DIR as
+`.prof` files (open with `python -m pstats` or snakeviz).
+
+Env vars (optional): METRICS_ENABLED, PROFILE_SAMPLE_RATE (0), PROFILE_SLOW_MS (500),
+PROFILE_DIR (profiles)
+"""
+from __future__ import annotations
+
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from flask import Response, g, has_request_context, request
+from flask.json import JSONEncoder
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+TIMED_KINDS = ("sql", "serialize", "hash")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def exposition(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+_LABELS = ("endpoint", "method")
+HISTOGRAMS = {
+    "wall": Histogram("http_request_duration_seconds", "Request wall time.", _LABELS, SECONDS_BUCKETS),
+    "sql_count": Histogram("http_request_sql_queries", "SQL statements per request.", _LABELS, COUNT_BUCKETS),
+    "sql": Histogram("http_request_sql_seconds", "Time in SQL statements per request.", _LABELS, SECONDS_BUCKETS),
+    "serialize": Histogram(
+        "http_request_serialize_seconds", "Time serializing response bodies.", _LABELS, SECONDS_BUCKETS
+    ),
+    "hash": Histogram("http_request_hash_seconds", "Time waiting on password hashing.", _LABELS, SECONDS_BUCKETS),
+}
+
+
+class RequestStats:
+    __slots__ = ("started", "sql_count", "seconds", "profiler")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.seconds = dict.fromkeys(TIMED_KINDS, 0.0)
+        self.profiler = None
+
+
+def current_stats() -> RequestStats | None:
+    """Stats of the request being measured on this thread, if any."""
+    if not has_request_context():
+        return None
+    return g.get("_request_stats")
+
+
+@contextmanager
+def timed(kind: str):
+    """Add the block's duration to the current request's `kind` time (no-op when off)."""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.seconds[kind] += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    started = conn.info.get("_query_started")
+    if stats is None or not started:
+        return
+    stats.sql_count += 1
+    stats.seconds["sql"] += time.perf_counter() - started.pop()
+
+
+class TimedJSONEncoder(JSONEncoder):
+    def encode(self, o):
+        with timed("serialize"):
+            return super().encode(o)
+
+
+def _float_env(name: str, default: float) -> float:
+    return float(os.getenv(name) or default)
+
+
+def _dump_profile(profiler: cProfile.Profile, elapsed: float) -> None:
+    directory = Path(os.getenv("PROFILE_DIR") or "profiles")
+    directory.mkdir(parents=True, exist_ok=True)
+    endpoint = re.sub(r"[^A-Za-z0-9_.-]", "_", request.endpoint or "unmatched")
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    profiler.dump_stats(directory / f"{stamp}-{endpoint}-{int(elapsed * 1000)}ms.prof")
+
+
+def _before_request():
+    stats = g._request_stats = RequestStats()
+    if random.random() < _float_env("PROFILE_SAMPLE_RATE", 0):
+        stats.profiler = cProfile.Profile()
+        stats.profiler.enable()
+
+
+def _after_request(response):
+    stats = g.pop("_request_stats", None)
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats.started
+    if stats.profiler is not None:
+        stats.profiler.disable()
+        if elapsed * 1000 >= _float_env("PROFILE_SLOW_MS", 500):
+            _dump_profile(stats.profiler, elapsed)
+
+    labels = (request.endpoint or "unmatched", request.method)
+    HISTOGRAMS["wall"].observe(labels, elapsed)
+    HISTOGRAMS["sql_count"].observe(labels, stats.sql_count)
+    for kind in TIMED_KINDS:
+        HISTOGRAMS[kind].observe(labels, stats.seconds[kind])
+
+    timings = [f'sql;dur={stats.seconds["sql"] * 1000:.2f};desc="{stats.sql_count} queries"']
+    timings += [f"{kind};dur={stats.seconds[kind] * 1000:.2f}" for kind in ("serialize", "hash")]
+    timings.append(f"total;dur={elapsed * 1000:.2f}")
+    response.headers["Server-Timing"] = ", ".join(timings)
+    return response
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS.values():
+        lines.extend(histogram.exposition())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_enabled() -> bool:
+    return (os.getenv("METRICS_ENABLED") or "").strip().lower() in {"1", "true", "yes"}
+
+
+def init_metrics(app, enabled: bool | None = None) -> bool:
+    """Install the middleware and `GET /metrics` on `app` if enabled."""
+    if enabled is None:
+        enabled = metrics_enabled()
+    if not enabled:
+        return False
+    app.json_encoder = TimedJSONEncoder
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", "metrics", lambda: Response(render_metrics(), mimetype="text/plain; version=0.0.4"))
+    return True
@@ -34,6 +34,23 @@ class Debt(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Same names as the Supabase migrations so both deployments share one index set
+    __table_args__ = (
+        db.Index("idx_debts_created_by", created_by),
+        db.Index("idx_debts_status", status),
+        db.Index("idx_debts_created_by_status_created_at", created_by, status, created_at.desc()),
+    )
+
+    creator = db.relationship("User")
+    # Rows are removed by the FK's ON DELETE CASCADE; don't load them just to delete
+    participants = db.relationship(
+        "DebtParticipant",
+        back_populates="debt",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="DebtParticipant.created_at",
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -54,11 +71,28 @@ class DebtParticipant(db.Model):
     from_user_id = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     to_user_id = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     amount = db.Column(db.Numeric(12, 2), nullable=False)
+    # What is still owed after payments; starts equal to `amount`
+    remaining_amount = db.Column(
+        db.Numeric(12, 2), nullable=False, default=lambda ctx: ctx.get_current_parameters()["amount"]
+    )
     description = db.Column(db.Text)
     status = db.Column(db.String(50), default="open")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("idx_debt_participants_debt_id", debt_id),
+        db.Index("idx_debt_participants_from_user", from_user_id),
+        db.Index("idx_debt_participants_to_user", to_user_id),
+        db.Index("idx_debt_participants_status", status),
+        db.Index("idx_debt_participants_from_user_status", from_user_id, status),
+        db.Index("idx_debt_participants_to_user_status", to_user_id, status),
+    )
+
+    debt = db.relationship("Debt", back_populates="participants")
+    from_user = db.relationship("User", foreign_keys=[from_user_id])
+    to_user = db.relationship("User", foreign_keys=[to_user_id])
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -66,8 +100,57 @@ class DebtParticipant(db.Model):
             "from_user_id": self.from_user_id,
             "to_user_id": self.to_user_id,
             "amount": float(self.amount) if self.amount is not None else None,
+            "remaining_amount": float(self.remaining_amount) if self.remaining_amount is not None else None,
             "description": self.description,
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class Payment(db.Model):
+    __tablename__ = "payments"
+
+    id = db.Column(db.String, primary_key=True, default=lambda: str(uuid4()))
+    debt_participant_id = db.Column(
+        db.String, db.ForeignKey("debt_participants.id", ondelete="CASCADE"), nullable=False
+    )
+    paid_by = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    paid_at = db.Column(db.DateTime, default=datetime.utcnow)
+    note = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("idx_payments_debt_participant_id", debt_participant_id),
+        db.Index("idx_payments_paid_by", paid_by),
+        db.Index("idx_payments_paid_at", paid_at),
+        db.Index("idx_payments_debt_participant_paid_at", debt_participant_id, paid_at.desc()),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "debt_participant_id": self.debt_participant_id,
+            "paid_by": self.paid_by,
+            "amount": float(self.amount) if self.amount is not None else None,
+            "paid_at": self.paid_at.isoformat() if self.paid_at else None,
+            "note": self.note,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class UserBalance(db.Model):
+    """Running net balance between two users, maintained on every participant write.
+
+    `amount` is what `counterparty_id` owes `user_id` over open participant rows
+    (negative when the user owes the counterparty). Each pair is stored in both
+    directions so a user's balances are one primary-key range lookup.
+    """
+
+    __tablename__ = "user_balances"
+
+    user_id = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    counterparty_id = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,100 @@
+"""Keyset (cursor) pagination helpers for list endpoints.
+
+Lists are ordered by `(created_at DESC, id DESC)` unless another timestamp
+column is given (e.g. `paid_at` for payments). The cursor handed back to the
+client is an opaque, URL-safe encoding of the last row's sort key; the next page
+continues strictly after it, so the cost of a page does not depend on how deep
+into the history the client is.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class PaginationError(ValueError):
+    """Raised for a malformed `limit` or `cursor` query parameter."""
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, str):
+            raise TypeError(row_id)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError):
+        raise PaginationError("invalid cursor")
+
+
+def encode_score_cursor(score: float, row_id: str) -> str:
+    """Cursor for lists ordered by a relevance score instead of a timestamp."""
+    payload = json.dumps([score, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, str) or not isinstance(score, (int, float)):
+            raise TypeError(row_id)
+        return float(score), row_id
+    except (ValueError, TypeError):
+        raise PaginationError("invalid cursor")
+
+
+def parse_limit(value: str | None) -> int:
+    if value is None or value == "":
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be >= 1")
+    return min(limit, MAX_LIMIT)
+
+
+def wants_page(args) -> bool:
+    """Return True if the request opted into pagination (`limit` or `cursor`)."""
+    return "limit" in args or "cursor" in args
+
+
+def paginate(query, model, args, sort_column=None) -> tuple[list, str | None]:
+    """Apply keyset pagination to `query` and return `(rows, next_cursor)`.
+
+    `model` must have an `id` column and `sort_column` (default
+    `model.created_at`) must be a non-null timestamp. Raises `PaginationError`
+    for malformed parameters.
+    """
+    sort_column = sort_column if sort_column is not None else model.created_at
+    limit = parse_limit(args.get("limit"))
+    cursor = args.get("cursor")
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, model.id < row_id),
+            )
+        )
+
+    rows = query.order_by(sort_column.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), last.id)
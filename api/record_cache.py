@@ -0,0 +1,187 @@
+"""Read-through cache of serialized debt and participant records.
+
+`debt_record(id)` / `participant_record(id)` return the row's `to_dict()`,
+loading it from the database only on a miss. Every commit path that changes
+or deletes a cached row calls `records.invalidate(kind, *ids)` right after
+committing (or `records.invalidate_kind(kind)` after a filtered bulk UPDATE).
+A miss that raced with an invalidation is not served afterwards, so a reader
+never puts back a record older than the write. The guard lives in the backend:
+a generation counter in process memory, or version keys in Redis, so it holds
+across workers too. Missing rows are not cached.
+
+Backends: an in-process LRU with TTL (default, per worker), or any
+Redis-protocol server via `RECORD_CACHE_BACKEND=redis://...` (needs the `redis`
+package) so all workers share entries and invalidations; size it with the
+server's `maxmemory` + `volatile-lru` (entries and version keys expire, the
+per-kind epoch keys must not be evicted). Hit/miss counters are per process, at
+`GET /health/cache`.
+
+Env vars (optional): RECORD_CACHE_BACKEND (memory), RECORD_CACHE_SIZE (10000,
+memory only), RECORD_CACHE_TTL (60 s)
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Callable
+
+from cache import TTLCache
+from models import Debt, DebtParticipant
+
+KINDS = ("debt", "debt_participant")
+
+
+class MemoryBackend:
+    """Per-process LRU; one generation counter guards every key."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, kind: str, row_id: str) -> tuple[dict | None, int]:
+        with self._lock:
+            generation = self._generation
+        value = self._cache.get(f"{kind}:{row_id}")
+        # Callers may add keys to the response dict; keep the cached one intact
+        return (dict(value) if value is not None else None), generation
+
+    def set(self, kind: str, row_id: str, value: dict, token: int) -> None:
+        with self._lock:
+            if token == self._generation:
+                self._cache.set(f"{kind}:{row_id}", dict(value))
+
+    def delete(self, kind: str, *row_ids: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for row_id in row_ids:
+                self._cache.pop(f"{kind}:{row_id}")
+
+    def delete_kind(self, kind: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.pop_where(lambda key: key.startswith(f"{kind}:"))
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class RedisBackend:
+    """Entries shared by all workers, guarded by versions held in Redis itself.
+
+    Each row has a version key (`v:<kind>:<id>`) and each kind an epoch key
+    (`epoch:<kind>`); invalidations INCR them. An entry stores the
+    `"<epoch>:<version>"` its load started under and only counts as a hit while
+    both still match, so a record read before another worker's write is never
+    served after that write's invalidation, whenever it lands.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "record:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise RuntimeError("RECORD_CACHE_BACKEND=redis://... needs the `redis` package") from exc
+            client = redis.Redis.from_url(url)
+        self._redis = client
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+
+    def get(self, kind: str, row_id: str) -> tuple[dict | None, str]:
+        raw, version, epoch = self._redis.mget(
+            f"{self.prefix}{kind}:{row_id}", f"{self.prefix}v:{kind}:{row_id}", f"{self.prefix}epoch:{kind}"
+        )
+        token = f"{int(epoch or 0)}:{int(version or 0)}"
+        if raw is None:
+            return None, token
+        entry = json.loads(raw)
+        return (entry["d"] if entry["v"] == token else None), token
+
+    def set(self, kind: str, row_id: str, value: dict, token: str) -> None:
+        entry = json.dumps({"v": token, "d": value}, separators=(",", ":"))
+        self._redis.set(f"{self.prefix}{kind}:{row_id}", entry, ex=self.ttl)
+
+    def delete(self, kind: str, *row_ids: str) -> None:
+        pipe = self._redis.pipeline()
+        for row_id in row_ids:
+            # Outlive any entry stored under the old version
+            pipe.incr(f"{self.prefix}v:{kind}:{row_id}")
+            pipe.expire(f"{self.prefix}v:{kind}:{row_id}", self.ttl * 2)
+        pipe.delete(*(f"{self.prefix}{kind}:{row_id}" for row_id in row_ids))
+        pipe.execute()
+
+    def delete_kind(self, kind: str) -> None:
+        # Old entries stop matching and age out with their TTL
+        self._redis.incr(f"{self.prefix}epoch:{kind}")
+
+    def __len__(self) -> int:
+        return 0
+
+
+class RecordCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._counts = {kind: {"hits": 0, "misses": 0, "invalidations": 0} for kind in KINDS}
+
+    @classmethod
+    def from_env(cls) -> "RecordCache":
+        spec = (os.getenv("RECORD_CACHE_BACKEND") or "memory").strip()
+        ttl = float(os.getenv("RECORD_CACHE_TTL") or "60")
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            return cls(RedisBackend(spec, ttl))
+        return cls(MemoryBackend(int(os.getenv("RECORD_CACHE_SIZE") or "10000"), ttl))
+
+    def _count(self, kind: str, counter: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[kind][counter] += n
+
+    def get(self, kind: str, row_id: str, load: Callable[[], dict | None]) -> dict | None:
+        value, token = self.backend.get(kind, row_id)
+        if value is not None:
+            self._count(kind, "hits")
+            return value
+
+        self._count(kind, "misses")
+        value = load()
+        if value is not None:
+            # Dropped by the backend if an invalidation happened since `token` was read
+            self.backend.set(kind, row_id, value, token)
+        return value
+
+    def invalidate(self, kind: str, *row_ids: str) -> None:
+        row_ids = [row_id for row_id in row_ids if row_id]
+        if not row_ids:
+            return
+        self._count(kind, "invalidations", len(row_ids))
+        self.backend.delete(kind, *row_ids)
+
+    def invalidate_kind(self, kind: str) -> None:
+        """Drop every cached record of `kind`, for writes that change rows without loading their ids."""
+        self._count(kind, "invalidations")
+        self.backend.delete_kind(kind)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {kind: dict(values) for kind, values in self._counts.items()}
+        for values in counts.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / lookups, 4) if lookups else None
+        return {"backend": type(self.backend).__name__, "entries": len(self.backend), **counts}
+
+
+records = RecordCache.from_env()
+
+
+def _load(model, row_id: str) -> dict | None:
+    row = model.query.get(row_id)
+    return row.to_dict() if row is not None else None
+
+
+def debt_record(debt_id: str) -> dict | None:
+    return records.get("debt", debt_id, lambda: _load(Debt, debt_id))
+
+
+def participant_record(participant_id: str) -> dict | None:
+    return records.get("debt_participant", participant_id, lambda: _load(DebtParticipant, participant_id))
@@ -1,7 +1,8 @@
 """Authentication routes: register, login, me.
 
-Simple token auth: for tests and local usage we return a token equal to the user's id. For production
-replace with JWT/session logic.
+Login returns a signed, expiring token (see `auth.tokens`); authenticated requests are checked
+without a database round trip. Repeated failed logins per email / client IP get 429 before any
+hashing (see `auth.throttle`).
 """
 from __future__ import annotations
 
@@ -9,12 +10,24 @@ from flask import Blueprint, current_app, jsonify, request
 from sqlalchemy.exc import IntegrityError
 
 from models import db, User
-from auth.argon2_hash import hash_password, needs_rehash, verify_password
+from auth.argon2_hash import hash_password, needs_rehash, verify_dummy, verify_password
+from auth.executor import HashingUnavailable, offload
+from auth.throttle import get_login_throttle
+from auth.tokens import auth_claims, bearer_token, issue_token, revoke_token
+from etag import compute_etag, not_modified, with_etag
 
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
+def _busy():
+    return jsonify({"error": "server busy, try again"}), 503, {"Retry-After": "1"}
+
+
+def _throttled(retry_after: int):
+    return jsonify({"error": "too many login attempts"}), 429, {"Retry-After": str(retry_after)}
+
+
 @auth_bp.route("/register", methods=["POST"])
 def register():
     data = request.get_json() or {}
@@ -26,7 +39,10 @@ def register():
     if len(password) < 8:
         return jsonify({"error": "password too short (min 8)"}), 400
 
-    pw_hash = hash_password(password)
+    try:
+        pw_hash = offload(hash_password, password)
+    except HashingUnavailable:
+        return _busy()
 
     user = User(email=email, password_hash=pw_hash)
     db.session.add(user)
@@ -45,34 +61,64 @@ def login():
     email = (data.get("email") or "").strip().lower()
     password = data.get("password") or ""
 
+    ip = request.remote_addr or ""
+    throttle = get_login_throttle()
+    retry_after = throttle.check(email, ip)
+    if retry_after:
+        return _throttled(retry_after)
+
     user = User.query.filter_by(email=email).first()
-    if not user:
-        return jsonify({"error": "invalid credentials"}), 401
 
-    if not verify_password(user.password_hash, password):
-        return jsonify({"error": "invalid credentials"}), 401
+    try:
+        # Unknown emails still pay for one verify so timing doesn't reveal which accounts exist
+        if user is None:
+            offload(verify_dummy, password)
+            throttle.failure(email, ip)
+            return jsonify({"error": "invalid credentials"}), 401
+        if not offload(verify_password, user.password_hash, password):
+            throttle.failure(email, ip)
+            return jsonify({"error": "invalid credentials"}), 401
+        throttle.success(email)
+    except HashingUnavailable:
+        return _busy()
 
     # If hash needs rehash (e.g. parameters changed), re-hash with current params and save
-    if needs_rehash(user.password_hash):
-        current_app.logger.info("Rehashing password for user %s", user.id)
-        user.password_hash = hash_password(password)
-        db.session.add(user)
-        db.session.commit()
+    if needs_rehash(user.password_hash, user.id):
+        try:
+            new_hash = offload(hash_password, password)
+        except HashingUnavailable:
+            # The password checked out; don't fail the login, the next one retries the rehash
+            current_app.logger.info("Hashing pool busy, rehash for user %s deferred", user.id)
+        else:
+            current_app.logger.info("Rehashing password for user %s", user.id)
+            user.password_hash = new_hash
+            db.session.add(user)
+            db.session.commit()
 
-    # Simple token: return user's id as token for tests. Replace with JWT in production.
-    return jsonify({"ok": True, "token": user.id}), 200
+    return jsonify({"ok": True, "token": issue_token(user)}), 200
 
 
 @auth_bp.route("/me", methods=["GET"])
 def me():
-    auth = request.headers.get("Authorization", "")
-    if auth.startswith("Bearer "):
-        token = auth.split(None, 1)[1]
-    else:
+    if not bearer_token():
         return jsonify({"error": "missing auth"}), 401
 
-    user = User.query.get(token)
-    if not user:
+    claims = auth_claims()
+    if not claims:
         return jsonify({"error": "invalid token"}), 401
 
-    return jsonify(user.to_dict()), 200
+    etag = compute_etag("me", claims["sub"], claims["email"])
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(jsonify({"id": claims["sub"], "email": claims["email"]}), etag), 200
+
+
+@auth_bp.route("/logout", methods=["POST"])
+def logout():
+    token = bearer_token()
+    if not token:
+        return jsonify({"error": "missing auth"}), 401
+    if not revoke_token(token):
+        return jsonify({"error": "invalid token"}), 401
+    return jsonify({"ok": True}), 200
@@ -0,0 +1,62 @@
+"""Per-user net balances, read from the `user_balances` ledger.
+
+`from_user_id` owes `to_user_id` the participant amount. From the point of view
+of a user, a positive `net` means the counterparty owes them money, a negative
+one means they owe the counterparty.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+
+from flask import Blueprint, jsonify, request
+
+from auth.tokens import auth_user_id
+from ledger import balances_for
+from models import DebtParticipant
+from settlement import open_net_balances, plan_settlement
+
+
+balances_bp = Blueprint("balances", __name__, url_prefix="/balances")
+
+
+@balances_bp.route("", methods=["GET"])
+def list_balances():
+    user_id = (request.args.get("user_id") or "").strip() or auth_user_id()
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    balances = balances_for(user_id)
+    items = [
+        {"user_id": counterparty, "net": float(net)}
+        for counterparty, net in sorted(balances.items(), key=lambda item: item[1])
+        if net != 0
+    ]
+    owed_to_user = sum((net for net in balances.values() if net > 0), Decimal(0))
+    owed_by_user = -sum((net for net in balances.values() if net < 0), Decimal(0))
+    return (
+        jsonify(
+            {
+                "user_id": user_id,
+                "items": items,
+                "owed_to_user": float(owed_to_user),
+                "owed_by_user": float(owed_by_user),
+                "net": float(owed_to_user - owed_by_user),
+            }
+        ),
+        200,
+    )
+
+
+@balances_bp.route("/settlement", methods=["GET"])
+def group_settlement():
+    """Settlement plan for open edges whose both ends are inside the group."""
+    user_ids = sorted({u.strip() for u in (request.args.get("user_ids") or "").split(",") if u.strip()})
+    if len(user_ids) < 2:
+        return jsonify({"error": "user_ids must list at least two users"}), 400
+
+    balances = open_net_balances(
+        DebtParticipant.from_user_id.in_(user_ids),
+        DebtParticipant.to_user_id.in_(user_ids),
+    )
+    transfers = plan_settlement(balances)
+    return jsonify({"user_ids": user_ids, "transfers": [t.to_dict() for t in transfers]}), 200
@@ -0,0 +1,120 @@
+"""Dashboard summary: everything the start page needs in one response.
+
+The user comes from the token, the rest from three aggregate queries (debt
+status counts, totals from the `user_balances` ledger, latest debts) over the
+debts the user created or takes part in. The encoded body is cached per user
+for DASHBOARD_CACHE_TTL seconds (default 30) and dropped as soon as a change
+event (`events.bus`) names the user, so repeat loads skip the database. The
+cache is per process: other workers catch up within the TTL.
+
+Env vars (optional): DASHBOARD_CACHE_TTL
+"""
+from __future__ import annotations
+
+import os
+from decimal import Decimal
+
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import case, func, or_, select
+
+from auth.tokens import auth_claims
+from cache import TTLCache
+from events import bus
+from metrics import timed
+from models import db, Debt, DebtParticipant, UserBalance
+from routes.debts import ALLOWED_STATUSES
+from serialization import DEBT_COLUMNS, dumps, rows_to_dicts
+
+
+dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
+
+DEFAULT_LATEST = 5
+MAX_LATEST = 50
+
+# user_id -> {latest: encoded body}
+_cache = TTLCache(maxsize=4096, ttl=float(os.getenv("DASHBOARD_CACHE_TTL") or "30"))
+# Bumped on every invalidation; a body built across one is not cached (it may predate the write)
+_generation = 0
+
+
+def _invalidate(event: dict, user_ids: list[str]) -> None:
+    global _generation
+    _generation += 1
+    for user_id in user_ids:
+        _cache.pop(user_id)
+
+
+bus.subscribe(_invalidate)
+
+
+def _involving(user_id: str):
+    """Condition for debts `user_id` created or appears in as a participant."""
+    participant_debts = select(DebtParticipant.debt_id).where(
+        or_(DebtParticipant.from_user_id == user_id, DebtParticipant.to_user_id == user_id)
+    )
+    return or_(Debt.created_by == user_id, Debt.id.in_(participant_debts))
+
+
+def build_dashboard(claims: dict, latest: int) -> dict:
+    user_id = claims["sub"]
+    involving = _involving(user_id)
+
+    status_counts = dict.fromkeys(sorted(ALLOWED_STATUSES), 0)
+    for status, count in db.session.query(Debt.status, func.count()).filter(involving).group_by(Debt.status):
+        key = status or "open"
+        status_counts[key] = status_counts.get(key, 0) + count
+
+    owed_to_user, owed_by_user = (
+        db.session.query(
+            func.coalesce(func.sum(case((UserBalance.amount > 0, UserBalance.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((UserBalance.amount < 0, -UserBalance.amount), else_=0)), 0),
+        )
+        .filter(UserBalance.user_id == user_id)
+        .one()
+    )
+    owed_to_user, owed_by_user = Decimal(str(owed_to_user)), Decimal(str(owed_by_user))
+
+    latest_rows = (
+        db.session.query(*DEBT_COLUMNS)
+        .filter(involving)
+        .order_by(Debt.created_at.desc(), Debt.id.desc())
+        .limit(latest)
+        .all()
+    )
+    return {
+        "user": {"id": user_id, "email": claims["email"]},
+        "status_counts": status_counts,
+        "totals": {
+            "owed_to_user": float(owed_to_user),
+            "owed_by_user": float(owed_by_user),
+            "net": float(owed_to_user - owed_by_user),
+        },
+        "latest_debts": rows_to_dicts(DEBT_COLUMNS, latest_rows),
+    }
+
+
+@dashboard_bp.route("", methods=["GET"])
+def get_dashboard():
+    claims = auth_claims()
+    if not claims:
+        return jsonify({"error": "missing or invalid auth"}), 401
+
+    try:
+        latest = int(request.args.get("latest") or DEFAULT_LATEST)
+    except ValueError:
+        return jsonify({"error": "latest must be an integer"}), 400
+    if latest < 0:
+        return jsonify({"error": "latest must be >= 0"}), 400
+    latest = min(latest, MAX_LATEST)
+
+    user_id = claims["sub"]
+    cached = _cache.get(user_id) or {}
+    body = cached.get(latest)
+    if body is None:
+        generation = _generation
+        payload = build_dashboard(claims, latest)
+        with timed("serialize"):
+            body = dumps(payload)
+        if generation == _generation:
+            _cache.set(user_id, {**(_cache.get(user_id) or {}), latest: body})
+    return Response(body, mimetype="application/json", headers={"Cache-Control": "private, no-cache"}), 200
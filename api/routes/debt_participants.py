@@ -1,107 +1,417 @@
 """CRUD routes for debt participants."""
 from __future__ import annotations
 
-from decimal import Decimal, InvalidOperation
+from datetime import datetime
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal, InvalidOperation
+from uuid import uuid4
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func, or_, select, update
 
-from models import db, Debt, DebtParticipant
+from auth.tokens import auth_user_id
+from etag import args_key, collection_version, compute_etag, not_modified, with_etag
+from events import change_event, debt_audience, publish
+from export import EXPORT_FORMATS, stream_export
+from ledger import apply_edges, contribution
+from models import db, DebtParticipant, Payment
+from pagination import PaginationError, paginate, wants_page
+from record_cache import debt_record, participant_record, records
+from serialization import (
+    PARTICIPANT_COLUMNS,
+    PAYMENT_COLUMNS,
+    SerializationError,
+    parse_amount_format,
+    serialize_rows,
+)
 
 
 debt_participants_bp = Blueprint("debt_participants", __name__, url_prefix="/debt-participants")
 
 ALLOWED_STATUSES = {"open", "settled"}
+FILTER_KEYS = ("debt_id", "from_user_id", "to_user_id", "status")
+# A PATCH filter must name at least one of these, so `status` alone can't match the whole table
+SCOPE_KEYS = ("debt_id", "from_user_id", "to_user_id")
+MAX_BULK_ITEMS = 1000
+CENT = Decimal("0.01")
+# Largest value a Numeric(12, 2) column holds
+MAX_AMOUNT = Decimal("9999999999.99")
 
 
-def _auth_user_id() -> str | None:
-    auth = request.headers.get("Authorization", "")
-    if auth.startswith("Bearer "):
-        return auth.split(None, 1)[1]
-    return None
-
-
-def _parse_amount(value):
+def parse_amount(value):
+    """`value` as a positive Decimal rounded to whole cents, or None if it isn't one."""
     try:
         amount = Decimal(str(value))
+        if not amount.is_finite():
+            return None
+        amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
     except (InvalidOperation, TypeError, ValueError):
         return None
-    if amount <= 0:
+    if amount <= 0 or amount > MAX_AMOUNT:
         return None
     return amount
 
 
+def validate_participant(data: dict, default_from_user_id: str | None = None):
+    """Validate one participant payload (without debt_id).
+
+    Returns `(fields, None)` on success or `(None, error_message)`.
+    """
+    for key in ("from_user_id", "to_user_id", "description", "status"):
+        if not isinstance(data.get(key) or "", str):
+            return None, f"invalid {key}"
+    from_user_id = (data.get("from_user_id") or "").strip() or default_from_user_id
+    to_user_id = (data.get("to_user_id") or "").strip()
+    description = (data.get("description") or "").strip() or None
+    status = (data.get("status") or "open").strip().lower()
+    amount = parse_amount(data.get("amount"))
+
+    if not from_user_id:
+        return None, "from_user_id is required"
+    if not to_user_id:
+        return None, "to_user_id is required"
+    if amount is None:
+        return None, "amount must be > 0"
+    if status not in ALLOWED_STATUSES:
+        return None, "invalid status"
+
+    return {
+        "from_user_id": from_user_id,
+        "to_user_id": to_user_id,
+        "amount": amount,
+        "remaining_amount": amount,
+        "description": description,
+        "status": status,
+    }, None
+
+
+def _move(criteria: list, status: str, now: datetime) -> list:
+    """UPDATE the participants matching `criteria` to `status`.
+
+    Returns what moved, grouped per edge: `(debt_id, from_user_id, to_user_id,
+    remaining, count)`. On Postgres the UPDATE runs inside the grouping query
+    (`WITH moved AS (UPDATE ... RETURNING ...)`), so the sums cover exactly the
+    rows it changed; elsewhere (SQLite, one writer at a time) the same criteria
+    are aggregated just before the UPDATE.
+    """
+    keys = (DebtParticipant.debt_id, DebtParticipant.from_user_id, DebtParticipant.to_user_id)
+    statement = (
+        update(DebtParticipant)
+        .where(*criteria)
+        .values(status=status, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if db.engine.dialect.name == "postgresql":
+        moved = statement.returning(*keys, DebtParticipant.remaining_amount).cte("moved")
+        grouped = select(
+            moved.c.debt_id, moved.c.from_user_id, moved.c.to_user_id,
+            func.sum(moved.c.remaining_amount), func.count(),
+        ).group_by(moved.c.debt_id, moved.c.from_user_id, moved.c.to_user_id)
+        return db.session.execute(grouped).all()
+
+    groups = (
+        db.session.query(*keys, func.sum(DebtParticipant.remaining_amount), func.count())
+        .filter(*criteria)
+        .group_by(*keys)
+        .all()
+    )
+    if groups:
+        db.session.execute(statement)
+    return groups
+
+
+def transition_participants(criteria: list, status: str) -> list:
+    """Move every participant matching `criteria` to `status` with set-based UPDATEs.
+
+    Rows entering "open" put their edge (back) on the ledger and rows leaving
+    it take it off; the delta is applied from per-edge sums, never row by row.
+    Fully paid rows have no edge to restore, so they stay settled.
+    Rows that are neither open nor already at `status` move in a second UPDATE
+    without touching the ledger. Bumps `updated_at`; the caller commits.
+    Returns the `_move()` groups of both UPDATEs.
+    """
+    now = datetime.utcnow()
+    not_open = or_(DebtParticipant.status != "open", DebtParticipant.status.is_(None))
+    if status == "open":
+        groups = _move([*criteria, not_open, DebtParticipant.remaining_amount > 0], status, now)
+        apply_edges((from_user_id, to_user_id, remaining) for _, from_user_id, to_user_id, remaining, _ in groups)
+        return groups
+
+    groups = _move([*criteria, DebtParticipant.status == "open"], status, now)
+    apply_edges(((from_user_id, to_user_id, remaining) for _, from_user_id, to_user_id, remaining, _ in groups), sign=-1)
+    other = or_(DebtParticipant.status.notin_(("open", status)), DebtParticipant.status.is_(None))
+    return groups + _move([*criteria, other], status, now)
+
+
+def _split_entries(split: dict):
+    """Expand an even/shares split spec into participant payloads.
+
+    The total is divided in whole cents across every listed user (leftover cents
+    go to the first users); the payer's own share produces no edge.
+    Returns `(entries, None)` or `(None, error_message)`.
+    """
+    for key in ("mode", "to_user_id", "description", "status"):
+        if not isinstance(split.get(key) or "", str):
+            return None, f"invalid split.{key}"
+    mode = (split.get("mode") or "even").strip().lower()
+    total = parse_amount(split.get("total"))
+    payer = (split.get("to_user_id") or "").strip()
+    if total is None:
+        return None, "split.total must be > 0"
+    if not payer:
+        return None, "split.to_user_id is required"
+
+    if mode == "even":
+        from_user_ids = split.get("from_user_ids") or []
+        if not isinstance(from_user_ids, list) or not all(isinstance(u, str) for u in from_user_ids):
+            return None, "split.from_user_ids must be a list of strings"
+        user_ids = [u.strip() for u in from_user_ids if u.strip()]
+        weights = [Decimal(1)] * len(user_ids)
+    elif mode == "shares":
+        shares = split.get("shares") or {}
+        if not isinstance(shares, dict):
+            return None, "split.shares must be an object"
+        user_ids = [u.strip() for u in shares if u.strip()]
+        weights = [parse_amount(shares[u]) for u in shares if u.strip()]
+        if any(weight is None for weight in weights):
+            return None, "split.shares values must be > 0"
+    else:
+        return None, "split.mode must be 'even' or 'shares'"
+    if not user_ids:
+        return None, "split needs at least one user"
+
+    total_cents = int(total / CENT)
+    total_weight = sum(weights)
+    cents = [int((total_cents * w / total_weight).to_integral_value(ROUND_DOWN)) for w in weights]
+    for i in range(total_cents - sum(cents)):
+        cents[i % len(cents)] += 1
+
+    entries = [
+        {
+            "from_user_id": user_id,
+            "to_user_id": payer,
+            "amount": str(Decimal(share) * CENT),
+            "description": split.get("description"),
+            "status": split.get("status"),
+        }
+        for user_id, share in zip(user_ids, cents)
+        if user_id != payer and share > 0
+    ]
+    if not entries:
+        return None, "split leaves no non-zero share to owe"
+    return entries, None
+
+
+def _filter_criteria(args) -> list:
+    return [getattr(DebtParticipant, key) == args[key] for key in FILTER_KEYS if args.get(key)]
+
+
+def _filtered_query(args):
+    return DebtParticipant.query.filter(*_filter_criteria(args))
+
+
 @debt_participants_bp.route("", methods=["GET"])
 def list_participants():
-    debt_id = request.args.get("debt_id")
-    from_user_id = request.args.get("from_user_id")
-    to_user_id = request.args.get("to_user_id")
-    status = request.args.get("status")
+    query = _filtered_query(request.args)
+    try:
+        amount_format = parse_amount_format(request.args)
+    except SerializationError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    etag = compute_etag(
+        "debt-participants", *collection_version((query, DebtParticipant)), args_key(request.args)
+    )
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    query = query.with_entities(*PARTICIPANT_COLUMNS)
+
+    if not wants_page(request.args):
+        rows = query.order_by(DebtParticipant.created_at.desc()).all()
+        return with_etag(serialize_rows(PARTICIPANT_COLUMNS, rows, amount_format), etag), 200
 
-    query = DebtParticipant.query
-    if debt_id:
-        query = query.filter_by(debt_id=debt_id)
-    if from_user_id:
-        query = query.filter_by(from_user_id=from_user_id)
-    if to_user_id:
-        query = query.filter_by(to_user_id=to_user_id)
-    if status:
-        query = query.filter_by(status=status)
+    try:
+        page, next_cursor = paginate(query, DebtParticipant, request.args)
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    response = serialize_rows(PARTICIPANT_COLUMNS, page, amount_format, next_cursor=next_cursor)
+    return with_etag(response, etag), 200
 
-    participants = [item.to_dict() for item in query.order_by(DebtParticipant.created_at.desc()).all()]
-    return jsonify({"items": participants}), 200
+
+@debt_participants_bp.route("/export", methods=["GET"])
+def export_participants():
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    query = _filtered_query(request.args).order_by(DebtParticipant.created_at.desc(), DebtParticipant.id.desc())
+    columns = [
+        DebtParticipant.id,
+        DebtParticipant.debt_id,
+        DebtParticipant.from_user_id,
+        DebtParticipant.to_user_id,
+        DebtParticipant.amount,
+        DebtParticipant.remaining_amount,
+        DebtParticipant.description,
+        DebtParticipant.status,
+        DebtParticipant.created_at,
+        DebtParticipant.updated_at,
+    ]
+    return stream_export(query, columns, fmt, "debt-participants")
 
 
 @debt_participants_bp.route("", methods=["POST"])
 def create_participant():
     data = request.get_json() or {}
     debt_id = (data.get("debt_id") or "").strip()
-    from_user_id = (data.get("from_user_id") or "").strip() or _auth_user_id()
-    to_user_id = (data.get("to_user_id") or "").strip()
-    description = (data.get("description") or "").strip() or None
-    status = (data.get("status") or "open").strip().lower()
-    amount = _parse_amount(data.get("amount"))
-
     if not debt_id:
         return jsonify({"error": "debt_id is required"}), 400
-    if not from_user_id:
-        return jsonify({"error": "from_user_id is required"}), 400
-    if not to_user_id:
-        return jsonify({"error": "to_user_id is required"}), 400
-    if amount is None:
-        return jsonify({"error": "amount must be > 0"}), 400
+
+    fields, error = validate_participant(data, default_from_user_id=auth_user_id())
+    if error:
+        return jsonify({"error": error}), 400
+
+    if not debt_record(debt_id):
+        return jsonify({"error": "debt not found"}), 404
+
+    participant = DebtParticipant(debt_id=debt_id, **fields)
+    db.session.add(participant)
+    apply_edges([contribution(participant)])
+    db.session.commit()
+
+    result = participant.to_dict()
+    event = change_event("debt_participant", "created", participant.id, result, debt_id=debt_id)
+    publish(event, debt_audience(debt_id))
+    return jsonify(result), 201
+
+
+@debt_participants_bp.route("", methods=["PATCH"])
+def update_participants_status():
+    """Set `status` on many participants in one statement.
+
+    Payload: `{"status": "settled", "ids": [...]}` or
+    `{"status": ..., "filter": {"debt_id": ..., "from_user_id": ..., "to_user_id": ..., "status": ...}}`.
+    Returns the number of rows whose status changed.
+    """
+    data = request.get_json() or {}
+    status = (data.get("status") or "").strip().lower()
     if status not in ALLOWED_STATUSES:
         return jsonify({"error": "invalid status"}), 400
 
-    if not Debt.query.get(debt_id):
+    ids = data.get("ids")
+    filters = data.get("filter")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(item, str) for item in ids):
+            return jsonify({"error": "ids must be a non-empty list of strings"}), 400
+        if len(ids) > MAX_BULK_ITEMS:
+            return jsonify({"error": f"at most {MAX_BULK_ITEMS} ids per request"}), 400
+        criteria = [DebtParticipant.id.in_(ids)]
+        scope = {"ids": ids}
+    elif filters is not None:
+        if not isinstance(filters, dict) or not all(isinstance(filters.get(key) or "", str) for key in FILTER_KEYS):
+            return jsonify({"error": "filter must be an object of strings"}), 400
+        # Never update the whole table by accident
+        if not any(filters.get(key) for key in SCOPE_KEYS):
+            return jsonify({"error": f"filter needs one of {', '.join(SCOPE_KEYS)}"}), 400
+        criteria = _filter_criteria(filters)
+        scope = {"filter": {key: filters[key] for key in FILTER_KEYS if filters.get(key)}}
+    else:
+        return jsonify({"error": "ids or filter is required"}), 400
+
+    groups = transition_participants(criteria, status)
+    db.session.commit()
+    updated = sum(count for *_, count in groups)
+    if not updated:
+        return jsonify({"updated": 0}), 200
+
+    if "ids" in scope:
+        records.invalidate("debt_participant", *ids)
+    else:
+        # The changed ids are never loaded; drop the kind rather than read them back
+        records.invalidate_kind("debt_participant")
+    debt_ids = sorted({group[0] for group in groups})
+    event = change_event("debt_participant", "bulk_updated", debt_ids=debt_ids, status=status, **scope)
+    publish(event, debt_audience(*debt_ids))
+    return jsonify({"updated": updated}), 200
+
+
+@debt_participants_bp.route("/bulk", methods=["POST"])
+def bulk_create_participants():
+    """Create many participants of one debt in a single INSERT and commit.
+
+    Payload: `{"debt_id": ..., "participants": [...]}` or
+    `{"debt_id": ..., "split": {"mode": "even"|"shares", "total": ..., "to_user_id": ...,
+    "from_user_ids": [...] | "shares": {user_id: weight}}}`.
+    """
+    data = request.get_json() or {}
+    debt_id = (data.get("debt_id") or "").strip()
+    if not debt_id:
+        return jsonify({"error": "debt_id is required"}), 400
+
+    if data.get("split") is not None:
+        if not isinstance(data["split"], dict):
+            return jsonify({"error": "split must be an object"}), 400
+        entries, error = _split_entries(data["split"])
+        if error:
+            return jsonify({"error": error}), 400
+    else:
+        entries = data.get("participants")
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "participants must be a non-empty list"}), 400
+    if len(entries) > MAX_BULK_ITEMS:
+        return jsonify({"error": f"at most {MAX_BULK_ITEMS} participants per request"}), 400
+
+    default_from_user_id = auth_user_id()
+    rows = []
+    now = datetime.utcnow()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return jsonify({"error": "participant must be an object", "index": index}), 400
+        fields, error = validate_participant(entry, default_from_user_id=default_from_user_id)
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        rows.append({"id": str(uuid4()), "debt_id": debt_id, "created_at": now, "updated_at": now, **fields})
+
+    if not debt_record(debt_id):
         return jsonify({"error": "debt not found"}), 404
 
-    participant = DebtParticipant(
-        debt_id=debt_id,
-        from_user_id=from_user_id,
-        to_user_id=to_user_id,
-        amount=amount,
-        description=description,
-        status=status,
-    )
-    db.session.add(participant)
+    participants = [DebtParticipant(**row) for row in rows]
+    db.session.bulk_insert_mappings(DebtParticipant, rows)
+    apply_edges(contribution(participant) for participant in participants)
     db.session.commit()
 
-    return jsonify(participant.to_dict()), 201
+    ids = [participant.id for participant in participants]
+    publish(change_event("debt_participant", "bulk_created", debt_id=debt_id, ids=ids), debt_audience(debt_id))
+    return jsonify({"items": [participant.to_dict() for participant in participants]}), 201
 
 
 @debt_participants_bp.route("/<participant_id>", methods=["GET"])
 def get_participant(participant_id: str):
-    participant = DebtParticipant.query.get(participant_id)
-    if not participant:
+    record = participant_record(participant_id)
+    if record is None:
         return jsonify({"error": "not found"}), 404
-    return jsonify(participant.to_dict()), 200
+    etag = compute_etag("debt-participant", participant_id, record["updated_at"])
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    return with_etag(jsonify(record), etag), 200
 
 
 @debt_participants_bp.route("/<participant_id>", methods=["PUT"])
 def update_participant(participant_id: str):
-    participant = DebtParticipant.query.get(participant_id)
-    if not participant:
+    # Claim the row before reading it: the UPDATE takes its row lock (SQLite: the write lock), so a
+    # payment committing meanwhile waits instead of being overwritten by values read before it
+    claimed = db.session.execute(
+        update(DebtParticipant)
+        .where(DebtParticipant.id == participant_id)
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if not claimed.rowcount:
+        db.session.rollback()
         return jsonify({"error": "not found"}), 404
+    participant = DebtParticipant.query.populate_existing().filter_by(id=participant_id).one()
+    previous = contribution(participant)
+    previous_users = {participant.from_user_id, participant.to_user_id}
 
     data = request.get_json() or {}
     if "from_user_id" in data:
@@ -115,10 +425,14 @@ def update_participant(participant_id: str):
             return jsonify({"error": "to_user_id cannot be empty"}), 400
         participant.to_user_id = to_user_id
     if "amount" in data:
-        amount = _parse_amount(data.get("amount"))
+        amount = parse_amount(data.get("amount"))
         if amount is None:
             return jsonify({"error": "amount must be > 0"}), 400
+        paid = Decimal(participant.amount) - Decimal(participant.remaining_amount)
+        if amount < paid:
+            return jsonify({"error": "amount is less than already paid"}), 400
         participant.amount = amount
+        participant.remaining_amount = amount - paid
     if "description" in data:
         description = (data.get("description") or "").strip()
         participant.description = description or None
@@ -126,11 +440,20 @@ def update_participant(participant_id: str):
         status = (data.get("status") or "").strip().lower()
         if status not in ALLOWED_STATUSES:
             return jsonify({"error": "invalid status"}), 400
+        if status == "open" and not Decimal(participant.remaining_amount) > 0:
+            return jsonify({"error": "participant is fully paid"}), 400
         participant.status = status
 
     db.session.add(participant)
+    apply_edges([previous], sign=-1)
+    apply_edges([contribution(participant)])
     db.session.commit()
-    return jsonify(participant.to_dict()), 200
+    records.invalidate("debt_participant", participant.id)
+
+    result = participant.to_dict()
+    event = change_event("debt_participant", "updated", participant.id, result, debt_id=participant.debt_id)
+    publish(event, debt_audience(participant.debt_id) | previous_users)
+    return jsonify(result), 200
 
 
 @debt_participants_bp.route("/<participant_id>", methods=["DELETE"])
@@ -139,6 +462,31 @@ def delete_participant(participant_id: str):
     if not participant:
         return jsonify({"error": "not found"}), 404
 
+    debt_id = participant.debt_id
+    audience = debt_audience(debt_id)
+    apply_edges([contribution(participant)], sign=-1)
+    Payment.query.filter_by(debt_participant_id=participant_id).delete(synchronize_session=False)
     db.session.delete(participant)
     db.session.commit()
+    records.invalidate("debt_participant", participant_id)
+
+    publish(change_event("debt_participant", "deleted", participant_id, debt_id=debt_id), audience)
     return jsonify({"ok": True}), 200
+
+
+@debt_participants_bp.route("/<participant_id>/payments", methods=["GET"])
+def list_participant_payments(participant_id: str):
+    """Payment history, newest first, paginated on `(paid_at, id)`."""
+    try:
+        amount_format = parse_amount_format(request.args)
+    except SerializationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if not db.session.query(DebtParticipant.id).filter_by(id=participant_id).first():
+        return jsonify({"error": "not found"}), 404
+
+    query = Payment.query.filter_by(debt_participant_id=participant_id).with_entities(*PAYMENT_COLUMNS)
+    try:
+        page, next_cursor = paginate(query, Payment, request.args, sort_column=Payment.paid_at)
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return serialize_rows(PAYMENT_COLUMNS, page, amount_format, next_cursor=next_cursor), 200
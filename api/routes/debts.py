@@ -1,9 +1,25 @@
 """CRUD routes for debts."""
 from __future__ import annotations
 
+from datetime import datetime
+from uuid import uuid4
+
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select, update
 
-from models import db, Debt
+from auth.tokens import auth_user_id
+from etag import args_key, collection_version, compute_etag, not_modified, with_etag
+from events import change_event, debt_audience, publish
+from expand import ExpandError, apply_expand, parse_expand, serialize_debts
+from export import EXPORT_FORMATS, stream_export
+from ledger import apply_edges, contribution, open_edges
+from models import db, Debt, DebtParticipant, Payment
+from pagination import PaginationError, paginate, wants_page
+from record_cache import debt_record, records
+from routes.debt_participants import MAX_BULK_ITEMS, transition_participants, validate_participant
+from search import SearchError, search_debts
+from serialization import DEBT_COLUMNS, SEARCH_COLUMNS, serialize_rows
+from settlement import open_net_balances, plan_settlement
 
 
 debts_bp = Blueprint("debts", __name__, url_prefix="/debts")
@@ -11,26 +27,87 @@ debts_bp = Blueprint("debts", __name__, url_prefix="/debts")
 ALLOWED_STATUSES = {"open", "settled", "cancelled"}
 
 
-def _auth_user_id() -> str | None:
-    auth = request.headers.get("Authorization", "")
-    if auth.startswith("Bearer "):
-        return auth.split(None, 1)[1]
-    return None
-
-
-@debts_bp.route("", methods=["GET"])
-def list_debts():
-    created_by = request.args.get("created_by")
-    status = request.args.get("status")
+def _filtered_query(args):
+    created_by = args.get("created_by")
+    status = args.get("status")
 
     query = Debt.query
     if created_by:
         query = query.filter_by(created_by=created_by)
     if status:
         query = query.filter_by(status=status)
+    return query
+
+
+def _version_sources(query, expand: set[str]) -> list:
+    """Sources for `collection_version()`: the debts, plus their participants if nested."""
+    sources = [(query, Debt)]
+    if "participants" in expand:
+        debt_ids = query.with_entities(Debt.id).order_by(None).statement
+        sources.append((DebtParticipant.query.filter(DebtParticipant.debt_id.in_(debt_ids)), DebtParticipant))
+    return sources
+
+
+@debts_bp.route("", methods=["GET"])
+def list_debts():
+    query = _filtered_query(request.args)
+
+    try:
+        expand = parse_expand(request.args)
+    except ExpandError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    etag = compute_etag("debts", *collection_version(*_version_sources(query, expand)), args_key(request.args))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    # Plain lists skip the ORM: column tuples straight to JSON
+    query = apply_expand(query, expand) if expand else query.with_entities(*DEBT_COLUMNS)
+
+    extra = {}
+    if not wants_page(request.args):
+        rows = query.order_by(Debt.created_at.desc()).all()
+    else:
+        try:
+            rows, extra["next_cursor"] = paginate(query, Debt, request.args)
+        except PaginationError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+    if not expand:
+        return with_etag(serialize_rows(DEBT_COLUMNS, rows, **extra), etag), 200
+    result = serialize_debts(rows, expand)
+    result.update(extra)
+    return with_etag(jsonify(result), etag), 200
+
+
+@debts_bp.route("/search", methods=["GET"])
+def search():
+    if request.args.get("status") and request.args["status"] not in ALLOWED_STATUSES:
+        return jsonify({"error": "invalid status"}), 400
+    try:
+        rows, next_cursor = search_debts(request.args)
+    except (SearchError, PaginationError) as exc:
+        return jsonify({"error": str(exc)}), 400
+    return serialize_rows(SEARCH_COLUMNS, rows, next_cursor=next_cursor), 200
+
+
+@debts_bp.route("/export", methods=["GET"])
+def export_debts():
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
 
-    debts = [debt.to_dict() for debt in query.order_by(Debt.created_at.desc()).all()]
-    return jsonify({"items": debts}), 200
+    query = _filtered_query(request.args).order_by(Debt.created_at.desc(), Debt.id.desc())
+    columns = [
+        Debt.id,
+        Debt.title,
+        Debt.description,
+        Debt.created_by,
+        Debt.status,
+        Debt.created_at,
+        Debt.updated_at,
+    ]
+    return stream_export(query, columns, fmt, "debts")
 
 
 @debts_bp.route("", methods=["POST"])
@@ -40,7 +117,7 @@ def create_debt():
     description = (data.get("description") or "").strip() or None
     status = (data.get("status") or "open").strip().lower()
 
-    created_by = (data.get("created_by") or "").strip() or _auth_user_id()
+    created_by = (data.get("created_by") or "").strip() or auth_user_id()
 
     if not title:
         return jsonify({"error": "title is required"}), 400
@@ -49,24 +126,116 @@ def create_debt():
     if status not in ALLOWED_STATUSES:
         return jsonify({"error": "invalid status"}), 400
 
+    entries = data.get("participants")
+    if entries is not None:
+        if not isinstance(entries, list):
+            return jsonify({"error": "participants must be a list"}), 400
+        if len(entries) > MAX_BULK_ITEMS:
+            return jsonify({"error": f"at most {MAX_BULK_ITEMS} participants per request"}), 400
+
     debt = Debt(
+        id=str(uuid4()),
         title=title,
         description=description,
         created_by=created_by,
         status=status,
     )
+
+    participants = []
+    for index, entry in enumerate(entries or []):
+        if not isinstance(entry, dict):
+            return jsonify({"error": "participant must be an object", "index": index}), 400
+        fields, error = validate_participant(entry, default_from_user_id=auth_user_id())
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        participants.append(DebtParticipant(debt_id=debt.id, **fields))
+
+    # Header and edges go out in one flush/commit: no half-built debts
     db.session.add(debt)
+    db.session.add_all(participants)
+    apply_edges(contribution(participant) for participant in participants)
     db.session.commit()
 
-    return jsonify(debt.to_dict()), 201
+    result = debt.to_dict()
+    if entries is not None:
+        result["participants"] = [participant.to_dict() for participant in participants]
+    audience = {created_by}
+    audience.update(user_id for item in participants for user_id in (item.from_user_id, item.to_user_id))
+    publish(change_event("debt", "created", debt.id, result, debt_id=debt.id), audience)
+    return jsonify(result), 201
 
 
 @debts_bp.route("/<debt_id>", methods=["GET"])
 def get_debt(debt_id: str):
-    debt = Debt.query.get(debt_id)
+    try:
+        expand = parse_expand(request.args)
+    except ExpandError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if not expand:
+        # Served from the record cache: a hit needs no query at all
+        record = debt_record(debt_id)
+        if record is None:
+            return jsonify({"error": "not found"}), 404
+        etag = compute_etag("debt", debt_id, record["updated_at"], args_key(request.args))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        return with_etag(jsonify(record), etag), 200
+
+    count, *version = collection_version(*_version_sources(Debt.query.filter_by(id=debt_id), expand))
+    if not count:
+        return jsonify({"error": "not found"}), 404
+    etag = compute_etag("debt", debt_id, version, args_key(request.args))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    debt = apply_expand(Debt.query, expand).filter_by(id=debt_id).first()
     if not debt:
         return jsonify({"error": "not found"}), 404
-    return jsonify(debt.to_dict()), 200
+    result = serialize_debts([debt], expand)
+    item = result["items"][0]
+    if "users" in result:
+        item["users"] = result["users"]
+    return with_etag(jsonify(item), etag), 200
+
+
+@debts_bp.route("/<debt_id>/settlement", methods=["GET"])
+def get_debt_settlement(debt_id: str):
+    if not debt_record(debt_id):
+        return jsonify({"error": "not found"}), 404
+
+    transfers = plan_settlement(open_net_balances(DebtParticipant.debt_id == debt_id))
+    return jsonify({"debt_id": debt_id, "transfers": [t.to_dict() for t in transfers]}), 200
+
+
+@debts_bp.route("/<debt_id>/settle", methods=["POST"])
+def settle_debt(debt_id: str):
+    """Settle the debt and all of its open participants in one transaction.
+
+    Participants change with a fixed number of UPDATEs whatever their number;
+    returns the debt and how many participant rows changed.
+    """
+    if not debt_record(debt_id):
+        return jsonify({"error": "not found"}), 404
+
+    groups = transition_participants([DebtParticipant.debt_id == debt_id], "settled")
+    db.session.execute(
+        update(Debt)
+        .where(Debt.id == debt_id)
+        .values(status="settled", updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    participant_ids = [row.id for row in db.session.query(DebtParticipant.id).filter_by(debt_id=debt_id)]
+    records.invalidate("debt", debt_id)
+    records.invalidate("debt_participant", *participant_ids)
+    result = debt_record(debt_id)
+    event = change_event("debt", "settled", debt_id, result, debt_id=debt_id, participant_ids=participant_ids)
+    publish(event, debt_audience(debt_id))
+    return jsonify({"debt": result, "updated": sum(count for *_, count in groups)}), 200
 
 
 @debts_bp.route("/<debt_id>", methods=["PUT"])
@@ -92,7 +261,10 @@ def update_debt(debt_id: str):
 
     db.session.add(debt)
     db.session.commit()
-    return jsonify(debt.to_dict()), 200
+    records.invalidate("debt", debt.id)
+    result = debt.to_dict()
+    publish(change_event("debt", "updated", debt.id, result, debt_id=debt.id), debt_audience(debt.id))
+    return jsonify(result), 200
 
 
 @debts_bp.route("/<debt_id>", methods=["DELETE"])
@@ -101,6 +273,17 @@ def delete_debt(debt_id: str):
     if not debt:
         return jsonify({"error": "not found"}), 404
 
+    audience = debt_audience(debt_id)
+    # Take the debt's edges off the ledger, then delete them with one statement
+    # (SQLite does not enforce the ON DELETE CASCADE foreign key)
+    apply_edges(open_edges(DebtParticipant.debt_id == debt_id), sign=-1)
+    participant_ids = [row.id for row in db.session.query(DebtParticipant.id).filter_by(debt_id=debt_id)]
+    participants = select(DebtParticipant.id).where(DebtParticipant.debt_id == debt_id)
+    Payment.query.filter(Payment.debt_participant_id.in_(participants)).delete(synchronize_session=False)
+    DebtParticipant.query.filter_by(debt_id=debt_id).delete(synchronize_session=False)
     db.session.delete(debt)
     db.session.commit()
+    records.invalidate("debt", debt_id)
+    records.invalidate("debt_participant", *participant_ids)
+    publish(change_event("debt", "deleted", debt_id, debt_id=debt_id), audience)
     return jsonify({"ok": True}), 200
@@ -0,0 +1,40 @@
+"""Upload endpoint for bulk CSV imports."""
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+
+from importer import DEFAULT_BATCH_SIZE, CsvDecodeError, CsvImporter, decode_lines
+from models import db
+
+
+imports_bp = Blueprint("imports", __name__, url_prefix="/imports")
+
+MAX_BATCH_SIZE = 10000
+
+
+@imports_bp.route("/debts", methods=["POST"])
+def import_debts():
+    """Stream-parse an uploaded CSV (multipart field `file`).
+
+    Returns the import report; the first 100 rejected lines are listed under
+    `errors`. A line that is not valid UTF-8 stops the import with 400; batches
+    before it stay committed and are counted in the response.
+    """
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"error": "file is required"}), 400
+    try:
+        batch_size = int(request.form.get("batch_size") or DEFAULT_BATCH_SIZE)
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        return jsonify({"error": f"batch_size must be between 1 and {MAX_BATCH_SIZE}"}), 400
+
+    importer = CsvImporter(batch_size)
+    try:
+        report = importer.run(decode_lines(upload.stream))
+    except CsvDecodeError as exc:
+        db.session.rollback()
+        committed = {key: importer.report[key] for key in ("debts", "participants")}
+        return jsonify({"error": str(exc), "line": exc.line, **committed}), 400
+    return jsonify(report), 200
@@ -0,0 +1,157 @@
+"""Payments against debt participants.
+
+A payment lowers the participant's `remaining_amount` with one conditional
+UPDATE that only matches while the row is open and the payment still fits, so
+concurrent payments can never push it below zero. The same statement flips the
+row to `settled` when nothing is left; the payment row and the ledger change
+are committed in the same transaction.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case, func, update
+
+from auth.tokens import auth_user_id
+from events import change_event, debt_audience, publish
+from ledger import apply_edges
+from models import db, DebtParticipant, Payment
+from record_cache import participant_record, records
+from routes.debt_participants import MAX_BULK_ITEMS, parse_amount
+
+
+payments_bp = Blueprint("payments", __name__, url_prefix="/payments")
+
+
+class PaymentError(Exception):
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def validate_payment(data: dict, default_paid_by: str | None = None):
+    """Validate one payment payload. Returns `(fields, None)` or `(None, error_message)`."""
+    for key in ("debt_participant_id", "paid_by", "note", "paid_at"):
+        if not isinstance(data.get(key) or "", str):
+            return None, f"invalid {key}"
+    debt_participant_id = (data.get("debt_participant_id") or "").strip()
+    amount = parse_amount(data.get("amount"))
+    paid_by = (data.get("paid_by") or "").strip() or default_paid_by
+    note = (data.get("note") or "").strip() or None
+
+    if not debt_participant_id:
+        return None, "debt_participant_id is required"
+    if amount is None:
+        return None, "amount must be > 0"
+
+    fields = {"debt_participant_id": debt_participant_id, "amount": amount, "paid_by": paid_by, "note": note}
+    if (data.get("paid_at") or "").strip():
+        try:
+            fields["paid_at"] = datetime.fromisoformat(data["paid_at"].strip())
+        except ValueError:
+            return None, "invalid paid_at"
+    return fields, None
+
+
+def apply_payment(fields: dict) -> tuple[Payment, str]:
+    """Take `fields["amount"]` off the participant and stage the payment row.
+
+    Returns `(payment, debt_id)`. Raises `PaymentError` (404 / 409); the caller
+    commits or rolls back.
+    """
+    participant_id = fields["debt_participant_id"]
+    edge = (
+        db.session.query(DebtParticipant.debt_id, DebtParticipant.from_user_id, DebtParticipant.to_user_id)
+        .filter(DebtParticipant.id == participant_id)
+        .first()
+    )
+    if edge is None:
+        raise PaymentError("debt participant not found", 404)
+
+    amount = fields["amount"]
+    # Rounded in SQL so SQLite's float storage cannot drift below a cent
+    remaining = func.round(DebtParticipant.remaining_amount - amount, 2)
+    result = db.session.execute(
+        update(DebtParticipant)
+        .where(DebtParticipant.id == participant_id, DebtParticipant.status == "open", remaining >= 0)
+        .values(
+            remaining_amount=remaining,
+            status=case((remaining == 0, "settled"), else_=DebtParticipant.status),
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise PaymentError("participant is not open or amount exceeds remaining_amount", 409)
+
+    apply_edges([(edge.from_user_id, edge.to_user_id, amount)], sign=-1)
+    payment = Payment(**{**fields, "paid_by": fields["paid_by"] or edge.from_user_id})
+    db.session.add(payment)
+    return payment, edge.debt_id
+
+
+@payments_bp.route("", methods=["POST"])
+def create_payment():
+    data = request.get_json() or {}
+    fields, error = validate_payment(data, default_paid_by=auth_user_id())
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        payment, debt_id = apply_payment(fields)
+    except PaymentError as exc:
+        db.session.rollback()
+        return jsonify({"error": exc.message}), exc.status
+    db.session.commit()
+    records.invalidate("debt_participant", payment.debt_participant_id)
+
+    result = {"payment": payment.to_dict(), "participant": participant_record(payment.debt_participant_id)}
+    publish(change_event("payment", "created", payment.id, result, debt_id=debt_id), debt_audience(debt_id))
+    return jsonify(result), 201
+
+
+@payments_bp.route("/batch", methods=["POST"])
+def create_payments_batch():
+    """Post many payments in one transaction; any failure rolls back all of them.
+
+    Payload: `{"payments": [{"debt_participant_id": ..., "amount": ...}, ...]}`.
+    """
+    data = request.get_json() or {}
+    entries = data.get("payments")
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "payments must be a non-empty list"}), 400
+    if len(entries) > MAX_BULK_ITEMS:
+        return jsonify({"error": f"at most {MAX_BULK_ITEMS} payments per request"}), 400
+
+    default_paid_by = auth_user_id()
+    validated = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return jsonify({"error": "payment must be an object", "index": index}), 400
+        fields, error = validate_payment(entry, default_paid_by=default_paid_by)
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        validated.append(fields)
+
+    payments, debt_ids = [], set()
+    for index, fields in enumerate(validated):
+        try:
+            payment, debt_id = apply_payment(fields)
+        except PaymentError as exc:
+            db.session.rollback()
+            return jsonify({"error": exc.message, "index": index}), exc.status
+        payments.append(payment)
+        debt_ids.add(debt_id)
+    db.session.commit()
+    records.invalidate("debt_participant", *{payment.debt_participant_id for payment in payments})
+
+    event = change_event(
+        "payment",
+        "bulk_created",
+        ids=[payment.id for payment in payments],
+        debt_participant_ids=sorted({payment.debt_participant_id for payment in payments}),
+    )
+    publish(event, debt_audience(*debt_ids))
+    return jsonify({"items": [payment.to_dict() for payment in payments]}), 201
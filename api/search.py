@@ -0,0 +1,190 @@
+"""Full-text search over debt titles and descriptions.
+
+Diacritics are folded on both backends, so "spozywcze" finds "spożywcze" and
+"zolc" finds "żółć". SQLite: an external-content FTS5 table `debts_fts`
+(unicode61 `remove_diacritics`, plus "ł" -> "l" in SQL since it does not
+decompose) kept in sync by triggers on `debts`, ranked with bm25 (title
+weighted 10x). Postgres: a generated `search_vector` tsvector column over
+`unaccent`ed text (title weight A, description B) with a GIN index, ranked
+with `ts_rank_cd`. Either way the index is maintained by the database itself
+on every insert, update and delete, and a search only visits matching rows.
+
+Every word of `q` must match, as a prefix ("zak" finds "zakupy"). Results are
+ordered by `(score DESC, id DESC)` and paged with a keyset cursor over that pair.
+
+`create_all()` installs the index for new databases; for an existing one:
+
+    python search.py rebuild   # (re)create FTS table/triggers/column and reindex
+
+(SQLite's FTS rows point at `debts.rowid`, which `VACUUM` may renumber: rebuild after a VACUUM.)
+"""
+from __future__ import annotations
+
+import re
+import sys
+
+from sqlalchemy import Table, and_, column, event, func, literal_column, or_, select, table
+
+from models import db, Debt
+from pagination import decode_score_cursor, encode_score_cursor, parse_limit
+from serialization import DEBT_COLUMNS
+
+MAX_TERMS = 8
+
+
+def _fold_sql(expr: str) -> str:
+    # unicode61 strips combining marks, but "ł" has no decomposition; fold it by hand
+    return f"replace(replace({expr}, 'ł', 'l'), 'Ł', 'L')"
+
+
+_SQLITE_DDL = (
+    # The FTS table reads (e.g. on 'rebuild') from this view, so indexed text is always folded
+    "CREATE VIEW IF NOT EXISTS debts_fts_source AS SELECT rowid AS debt_rowid, "
+    f"{_fold_sql('title')} AS title, {_fold_sql('description')} AS description FROM debts",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS debts_fts USING fts5("
+    "title, description, content='debts_fts_source', content_rowid='debt_rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS debts_fts_insert AFTER INSERT ON debts BEGIN "
+    "INSERT INTO debts_fts(rowid, title, description) "
+    f"VALUES (new.rowid, {_fold_sql('new.title')}, {_fold_sql('new.description')}); END",
+    "CREATE TRIGGER IF NOT EXISTS debts_fts_delete AFTER DELETE ON debts BEGIN "
+    "INSERT INTO debts_fts(debts_fts, rowid, title, description) "
+    f"VALUES ('delete', old.rowid, {_fold_sql('old.title')}, {_fold_sql('old.description')}); END",
+    "CREATE TRIGGER IF NOT EXISTS debts_fts_update AFTER UPDATE OF title, description ON debts BEGIN "
+    "INSERT INTO debts_fts(debts_fts, rowid, title, description) "
+    f"VALUES ('delete', old.rowid, {_fold_sql('old.title')}, {_fold_sql('old.description')}); "
+    "INSERT INTO debts_fts(rowid, title, description) "
+    f"VALUES (new.rowid, {_fold_sql('new.title')}, {_fold_sql('new.description')}); END",
+)
+_SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS debts_fts_insert",
+    "DROP TRIGGER IF EXISTS debts_fts_delete",
+    "DROP TRIGGER IF EXISTS debts_fts_update",
+    "DROP TABLE IF EXISTS debts_fts",
+    "DROP VIEW IF EXISTS debts_fts_source",
+)
+_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() is only STABLE; a generated column needs an IMMUTABLE expression
+    "CREATE OR REPLACE FUNCTION debts_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT SET search_path = public, extensions, pg_catalog "
+    "AS $$ SELECT unaccent('unaccent', $1) $$",
+    "ALTER TABLE debts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', debts_unaccent(coalesce(title, ''))), 'A') || "
+    "setweight(to_tsvector('simple', debts_unaccent(coalesce(description, ''))), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_debts_search_vector ON debts USING gin (search_vector)",
+)
+# Dropping the column drops its index too
+_POSTGRES_DROP = ("ALTER TABLE debts DROP COLUMN IF EXISTS search_vector",)
+
+
+def _install(connection) -> None:
+    statements = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(connection.dialect.name, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Table, "after_create")
+def _install_after_create(target, connection, **kw):
+    if target.name == "debts":
+        _install(connection)
+
+
+@event.listens_for(Table, "before_drop")
+def _drop_before_drop(target, connection, **kw):
+    # The FTS table is not in the metadata; drop it with `debts` so a re-created table starts empty
+    if target.name == "debts" and connection.dialect.name == "sqlite":
+        for statement in _SQLITE_DROP:
+            connection.exec_driver_sql(statement)
+
+
+class SearchError(ValueError):
+    """Raised for an empty or unusable `q`."""
+
+
+def parse_terms(q: str | None) -> list[str]:
+    # Same "ł" folding as the SQLite index; the tokenizer / unaccent handle the other diacritics
+    terms = re.findall(r"\w+", (q or "").lower().replace("ł", "l"))[:MAX_TERMS]
+    if not terms:
+        raise SearchError("q is required")
+    return terms
+
+
+def _scored_statement(dialect: str, terms: list[str]):
+    """`SELECT <debt columns>, score` over matching debts for `dialect`."""
+    if dialect == "sqlite":
+        fts = table("debts_fts", column("rowid"))
+        fts_ref = literal_column("debts_fts")
+        match = " ".join(f'"{term}"*' for term in terms)
+        # bm25() is "lower is better"; negate it so both backends sort by score DESC
+        score = -func.bm25(fts_ref, 10.0, 1.0)
+        return (
+            select(*DEBT_COLUMNS, score.label("score"))
+            .select_from(Debt.__table__.join(fts, fts.c.rowid == literal_column("debts.rowid")))
+            .where(fts_ref.op("MATCH")(match))
+        )
+
+    query = func.to_tsquery("simple", func.debts_unaccent(" & ".join(f"{term}:*" for term in terms)))
+    vector = literal_column("debts.search_vector")
+    return select(*DEBT_COLUMNS, func.ts_rank_cd(vector, query).label("score")).where(vector.op("@@")(query))
+
+
+def search_debts(args) -> tuple[list, str | None]:
+    """Rank debts matching `args["q"]` (plus `status` / `created_by` filters); one page.
+
+    Returns `(rows, next_cursor)`; rows are `DEBT_COLUMNS` values followed by the
+    score. Raises `SearchError` / `PaginationError` for bad parameters.
+    """
+    terms = parse_terms(args.get("q"))
+    limit = parse_limit(args.get("limit"))
+
+    statement = _scored_statement(db.engine.dialect.name, terms)
+    if args.get("status"):
+        statement = statement.where(Debt.status == args["status"])
+    if args.get("created_by"):
+        statement = statement.where(Debt.created_by == args["created_by"])
+
+    # Page from outside so the keyset filter compares the labelled score, not a second ranking call
+    scored = statement.subquery()
+    paged = select(scored)
+    if args.get("cursor"):
+        score, row_id = decode_score_cursor(args["cursor"])
+        paged = paged.where(
+            or_(scored.c.score < score, and_(scored.c.score == score, scored.c.id < row_id))
+        )
+    paged = paged.order_by(scored.c.score.desc(), scored.c.id.desc()).limit(limit + 1)
+
+    rows = db.session.execute(paged).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_score_cursor(rows[-1].score, rows[-1].id)
+
+
+def rebuild() -> str:
+    """(Re)install the search index on an existing database and reindex it. Returns the dialect."""
+    with db.engine.begin() as conn:
+        drops = {"sqlite": _SQLITE_DROP, "postgresql": _POSTGRES_DROP}.get(conn.dialect.name, ())
+        for statement in drops:
+            conn.exec_driver_sql(statement)
+        _install(conn)
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("INSERT INTO debts_fts(debts_fts) VALUES ('rebuild')")
+    return db.engine.dialect.name
+
+
+def main(argv=None) -> int:
+    from app import app
+
+    command = (argv or sys.argv[1:] or ["rebuild"])[0]
+    if command != "rebuild":
+        print("usage: python search.py rebuild")
+        return 2
+    with app.app_context():
+        db.create_all()
+        print(f"search index rebuilt ({rebuild()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,32 @@
-"""Seed mock data for local development."""
+"""Seed mock data for local development.
+
+    python seed.py                                  # demo users and one debt
+    python seed.py --users 1000 --debts 20000      # plus a synthetic data set
+
+The synthetic set is deterministic for a given `--seed`: users are picked
+with a skewed (Zipf-like) popularity so a few people appear in many debts,
+most debts have 1-3 participants with a long tail up to `--max-fan-out`, and
+about a fifth of the edges are settled. Synthetic users are
+`synthetic-<seed>-<n>@example.com` with password `password123`.
+"""
 from __future__ import annotations
 
-from datetime import datetime
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
 
 from app import app
 from auth.argon2_hash import hash_password
+from ledger import apply_edges, contribution
 from models import db, User, Debt, DebtParticipant
 
+SYNTHETIC_PASSWORD = "password123"
+TITLES = ["Rent", "Groceries", "Dinner", "Utilities", "Trip", "Cinema", "Internet", "Taxi", "Concert", "Gift"]
+
 
 def seed():
     with app.app_context():
@@ -44,14 +64,117 @@ def seed():
                 from_user_id=demo.id,
                 to_user_id=roommate.id,
                 amount=500,
+                remaining_amount=500,
                 description="Rent split",
                 status="open",
             )
             db.session.add(participant)
+            apply_edges([contribution(participant)])
             db.session.commit()
 
         print("Mock data ready.")
 
 
-if __name__ == "__main__":
+def _fan_out(rng: random.Random, max_fan_out: int) -> int:
+    # Geometric-ish: most debts are between two or three people, a few are big groups
+    size = 1
+    while size < max_fan_out and rng.random() < 0.45:
+        size += 1
+    return size
+
+
+def seed_synthetic(users: int, debts: int, max_fan_out: int = 8, seed: int = 42, batch_size: int = 1000) -> dict:
+    """Insert `users` users and `debts` debts with participants. Returns counts and timing."""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    # One Argon2 hash shared by every synthetic user: hashing thousands would dominate the run
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        user_rows = [
+            {
+                "id": str(uuid4()),
+                "email": f"synthetic-{seed}-{n}@example.com",
+                "password_hash": password_hash,
+                "created_at": now,
+            }
+            for n in range(users)
+        ]
+        for start in range(0, users, batch_size):
+            db.session.execute(User.__table__.insert(), user_rows[start:start + batch_size])
+        db.session.commit()
+
+        user_ids = [row["id"] for row in user_rows]
+        # Cumulative once: passing raw weights makes every draw rebuild an O(users) table
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(users)))
+        participant_count = 0
+        for start in range(0, debts, batch_size):
+            debt_rows, participant_rows = [], []
+            for _ in range(min(batch_size, debts - start)):
+                created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                creditor = rng.choices(user_ids, cum_weights=cum_weights)[0]
+                debt_id = str(uuid4())
+                debt_rows.append(
+                    {
+                        "id": debt_id,
+                        "title": rng.choice(TITLES),
+                        "description": None,
+                        "created_by": creditor,
+                        "status": "open",
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    }
+                )
+                debtors = set(rng.choices(user_ids, cum_weights=cum_weights, k=_fan_out(rng, max_fan_out)))
+                for debtor in debtors - {creditor}:
+                    amount = Decimal(rng.randint(100, 50000)) / 100
+                    participant_rows.append(
+                        {
+                            "id": str(uuid4()),
+                            "debt_id": debt_id,
+                            "from_user_id": debtor,
+                            "to_user_id": creditor,
+                            "amount": amount,
+                            "remaining_amount": amount,
+                            "description": None,
+                            "status": "settled" if rng.random() < 0.2 else "open",
+                            "created_at": created_at,
+                            "updated_at": created_at,
+                        }
+                    )
+            db.session.execute(Debt.__table__.insert(), debt_rows)
+            if participant_rows:
+                db.session.execute(DebtParticipant.__table__.insert(), participant_rows)
+                apply_edges(
+                    (row["from_user_id"], row["to_user_id"], row["amount"])
+                    for row in participant_rows
+                    if row["status"] == "open"
+                )
+            db.session.commit()
+            participant_count += len(participant_rows)
+
+    return {
+        "users": users,
+        "debts": debts,
+        "participants": participant_count,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed demo data, optionally plus a synthetic data set.")
+    parser.add_argument("--users", type=int, default=0, help="synthetic users to add")
+    parser.add_argument("--debts", type=int, default=0, help="synthetic debts to add")
+    parser.add_argument("--max-fan-out", type=int, default=8, help="max participants per debt")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
     seed()
+    if args.users:
+        print(seed_synthetic(args.users, args.debts, args.max_fan_out, args.seed))
+
+
+if __name__ == "__main__":
+    main()
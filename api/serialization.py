@@ -0,0 +1,117 @@
+"""Fast JSON for list endpoints.
+
+Instead of loading ORM instances and calling `to_dict()` on each, list routes
+select just the columns below as plain tuples (no identity map, no attribute
+instrumentation) and encode them in one go with orjson when it is installed
+(stdlib `json` otherwise). The output has the same keys and values as
+`to_dict()`.
+
+`?amount_format=string` emits money columns as exact decimal strings
+(`"12.50"`) instead of JSON numbers.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from flask import Response
+from sqlalchemy import Float, Numeric, literal_column
+
+from metrics import timed
+from models import Debt, DebtParticipant, Payment
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+AMOUNT_FORMATS = {"number", "string"}
+
+DEBT_COLUMNS = (
+    Debt.id,
+    Debt.title,
+    Debt.description,
+    Debt.created_by,
+    Debt.status,
+    Debt.created_at,
+    Debt.updated_at,
+)
+# Search results: the debt plus its relevance `score`
+SEARCH_COLUMNS = (*DEBT_COLUMNS, literal_column("score", Float))
+PARTICIPANT_COLUMNS = (
+    DebtParticipant.id,
+    DebtParticipant.debt_id,
+    DebtParticipant.from_user_id,
+    DebtParticipant.to_user_id,
+    DebtParticipant.amount,
+    DebtParticipant.remaining_amount,
+    DebtParticipant.description,
+    DebtParticipant.status,
+    DebtParticipant.created_at,
+    DebtParticipant.updated_at,
+)
+PAYMENT_COLUMNS = (
+    Payment.id,
+    Payment.debt_participant_id,
+    Payment.paid_by,
+    Payment.amount,
+    Payment.paid_at,
+    Payment.note,
+    Payment.created_at,
+)
+
+
+class SerializationError(ValueError):
+    """Raised for an unknown `amount_format`."""
+
+
+def parse_amount_format(args) -> str:
+    amount_format = (args.get("amount_format") or "number").strip().lower()
+    if amount_format not in AMOUNT_FORMATS:
+        raise SerializationError("amount_format must be number or string")
+    return amount_format
+
+
+def _amount_string(value: Decimal) -> str:
+    return f"{value:.2f}"
+
+
+def rows_to_dicts(columns, rows, amount_format: str = "number") -> list[dict]:
+    """Turn column tuples into `to_dict()`-shaped dicts (datetimes left to the encoder)."""
+    names = [column.key for column in columns]
+    convert = _amount_string if amount_format == "string" else float
+    money = [index for index, column in enumerate(columns) if isinstance(column.type, Numeric)]
+    if not money:
+        return [dict(zip(names, row)) for row in rows]
+
+    items = []
+    for row in rows:
+        values = list(row)
+        for index in money:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        items.append(dict(zip(names, values)))
+    return items
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode()
+
+
+def serialize_rows(columns, rows, amount_format: str = "number", **extra) -> Response:
+    """`{"items": [...], **extra}` as a JSON response, built from column tuples."""
+    with timed("serialize"):
+        payload = {"items": rows_to_dicts(columns, rows, amount_format), **extra}
+        body = dumps(payload)
+    return Response(body, mimetype="application/json")
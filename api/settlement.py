@@ -0,0 +1,93 @@
+"""Minimum-transfer settlement planning over open participant edges.
+
+Every open `DebtParticipant` row is an edge "from_user_id owes to_user_id
+remaining_amount". Settling does not need to replay every edge: only each user's net
+position matters. The planner collapses edges into net balances and then
+repeatedly matches the largest debtor with the largest creditor (two heaps),
+which settles everyone with at most `n - 1` transfers in O(n log n).
+
+Amounts are handled as integer cents internally so the heap work stays exact.
+"""
+from __future__ import annotations
+
+import heapq
+from decimal import Decimal
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import func
+
+from models import db, DebtParticipant
+
+
+CENT = Decimal("0.01")
+
+
+class Transfer(NamedTuple):
+    from_user_id: str
+    to_user_id: str
+    amount: Decimal
+
+    def to_dict(self):
+        return {"from_user_id": self.from_user_id, "to_user_id": self.to_user_id, "amount": float(self.amount)}
+
+
+def _to_cents(amount) -> int:
+    return int((Decimal(amount) / CENT).to_integral_value())
+
+
+def net_balances(edges: Iterable[tuple[str, str, Decimal]]) -> dict[str, int]:
+    """Collapse `(from_user_id, to_user_id, amount)` edges into net cents per user.
+
+    Positive means the user is owed money, negative means the user owes money.
+    """
+    balances: dict[str, int] = {}
+    for from_user_id, to_user_id, amount in edges:
+        cents = _to_cents(amount)
+        balances[from_user_id] = balances.get(from_user_id, 0) - cents
+        balances[to_user_id] = balances.get(to_user_id, 0) + cents
+    return balances
+
+
+def plan_settlement(balances: dict[str, int]) -> list[Transfer]:
+    """Return transfers that bring every balance (in cents) to zero.
+
+    Raises ValueError if the balances do not sum to zero.
+    """
+    if sum(balances.values()) != 0:
+        raise ValueError("balances do not sum to zero")
+
+    creditors = [(-cents, user_id) for user_id, cents in balances.items() if cents > 0]
+    debtors = [(cents, user_id) for user_id, cents in balances.items() if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers: list[Transfer] = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debit, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debit)
+        transfers.append(Transfer(debtor, creditor, Decimal(amount) * CENT))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debit > amount:
+            heapq.heappush(debtors, (debit + amount, debtor))
+    return transfers
+
+
+def open_net_balances(*criteria) -> dict[str, int]:
+    """Net cents per user over open participant rows matching `criteria`.
+
+    Aggregates in SQL (one grouped query per direction) so only one row per user
+    is transferred, however many edges there are.
+    """
+    balances: dict[str, int] = {}
+    for column, sign in ((DebtParticipant.to_user_id, 1), (DebtParticipant.from_user_id, -1)):
+        rows = (
+            db.session.query(column, func.sum(DebtParticipant.remaining_amount))
+            .filter(DebtParticipant.status == "open", *criteria)
+            .group_by(column)
+            .all()
+        )
+        for user_id, total in rows:
+            balances[user_id] = balances.get(user_id, 0) + sign * _to_cents(total or 0)
+    return balances
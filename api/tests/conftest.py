@@ -1,8 +1,10 @@
 import os
+import sys
 
 import pytest
 
 from api.app import app as _app
+from api.database import engine_options
 from api.models import db
 
 
@@ -11,6 +13,7 @@ def app():
     os.environ["USE_SQLITE"] = "1"
     _app.config["TESTING"] = True
     _app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    _app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options("sqlite:///:memory:")
     with _app.app_context():
         db.create_all()
         yield _app
@@ -21,3 +24,24 @@ def app():
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def reset_password_hasher():
+    """Hashing params are cached per process; re-read env after each test."""
+    yield
+    # The app imports `auth.argon2_hash`, tests import `api.auth.argon2_hash`
+    for name in ("auth.argon2_hash", "api.auth.argon2_hash"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.reload_hasher()
+
+
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    """Failed-login counters are per process; start every test from zero."""
+    for name in ("auth.throttle", "api.auth.throttle"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.reset_login_throttle()
+    yield
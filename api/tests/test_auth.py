@@ -1,5 +1,11 @@
+import os
+import runpy
+import time
+
+import pytest
+
 from api.models import db, User
-from api.auth.argon2_hash import hash_password
+from api.auth.argon2_hash import hash_password, reload_hasher
 
 
 def test_register_stores_hash_not_plain(client):
@@ -40,6 +46,7 @@ def test_login_rehashes_when_needed(client, monkeypatch):
     monkeypatch.setenv("ARGON2_TIME_COST", "1")
     monkeypatch.setenv("ARGON2_MEMORY_COST", "1024")
     monkeypatch.setenv("ARGON2_PARALLELISM", "1")
+    reload_hasher()
 
     weak_hash = hash_password("rehashme")
 
@@ -52,6 +59,11 @@ def test_login_rehashes_when_needed(client, monkeypatch):
     monkeypatch.setenv("ARGON2_TIME_COST", "3")
     monkeypatch.setenv("ARGON2_MEMORY_COST", "65536")
     monkeypatch.setenv("ARGON2_PARALLELISM", "2")
+    reload_hasher()
+    # Hash params are cached: reload the instance the app imported as well
+    import auth.argon2_hash as app_hashing
+
+    app_hashing.reload_hasher()
 
     # Login should succeed and trigger rehash
     resp = client.post("/auth/login", json={"email": "rehash@example.com", "password": "rehashme"})
@@ -66,6 +78,116 @@ def test_login_rehashes_when_needed(client, monkeypatch):
     assert verify_password(user_after.password_hash, "rehashme")
 
 
+def test_login_succeeds_when_pool_is_busy_for_the_rehash(client, monkeypatch):
+    # Patch the modules the app itself imported (top-level `routes`, not `api.routes`)
+    import routes.auth as auth_routes
+
+    client.post("/auth/register", json={"email": "busy-rehash@example.com", "password": "password123"})
+    stored = User.query.filter_by(email="busy-rehash@example.com").one().password_hash
+    real_offload = auth_routes.offload
+
+    def verify_only(fn, *args):
+        if fn is auth_routes.hash_password:
+            raise auth_routes.HashingUnavailable("full")
+        return real_offload(fn, *args)
+
+    monkeypatch.setattr(auth_routes, "offload", verify_only)
+    monkeypatch.setattr(auth_routes, "needs_rehash", lambda *args: True)
+    resp = client.post("/auth/login", json={"email": "busy-rehash@example.com", "password": "password123"})
+    assert resp.status_code == 200
+    assert resp.get_json()["token"]
+    db.session.expire_all()
+    assert User.query.filter_by(email="busy-rehash@example.com").one().password_hash == stored
+
+
 def test_password_hash_not_equal_plaintext_unit():
     h = hash_password("somepass")
     assert h != "somepass"
+
+
+def _login(client, email, password="password123"):
+    client.post("/auth/register", json={"email": email, "password": password})
+    resp = client.post("/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200
+    return resp.get_json()["token"]
+
+
+def test_me_with_signed_token(client):
+    token = _login(client, "me@example.com")
+    resp = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.get_json()["email"] == "me@example.com"
+
+
+def test_me_rejects_tampered_and_raw_id_tokens(client):
+    token = _login(client, "tamper@example.com")
+    user = User.query.filter_by(email="tamper@example.com").first()
+
+    payload, signature = token.split(".")
+    forged = f"{payload}.{signature[:-2]}xx"
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {user.id}"}).status_code == 401
+    assert client.get("/auth/me").status_code == 401
+
+
+def test_me_rejects_non_ascii_token(client):
+    token = _login(client, "latin@example.com")
+    payload, signature = token.split(".")
+    for forged in (f"{payload}.{signature[:-1]}é", f"{payload}é.{signature}", "é"):
+        assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+    assert client.get("/dashboard", headers={"Authorization": f"Bearer {payload}.é"}).status_code == 401
+
+
+def test_logout_revokes_token(client):
+    token = _login(client, "logout@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_expired_token_rejected(client, monkeypatch):
+    monkeypatch.setenv("AUTH_TOKEN_TTL", "-1")
+    token = _login(client, "expired@example.com")
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_token_identifies_creator_for_debts(client):
+    token = _login(client, "creator@example.com")
+    user = User.query.filter_by(email="creator@example.com").first()
+    resp = client.post("/debts", json={"title": "Groceries"}, headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 201
+    assert resp.get_json()["created_by"] == user.id
+
+
+def test_redis_revocations_are_shared_between_workers():
+    from api.auth.tokens import RedisRevocations
+
+    class SharedRedis:
+        def __init__(self):
+            self.keys = {}
+
+        def set(self, name, value, ex=None):
+            self.keys[name] = ex
+
+        def exists(self, name):
+            return int(name in self.keys)
+
+    server = SharedRedis()
+    worker_a = RedisRevocations("redis://unused", client=server)
+    worker_b = RedisRevocations("redis://unused", client=server)
+    worker_a.revoke("jti-1", time.time() + 60)
+    assert worker_b.is_revoked("jti-1")
+    assert not worker_b.is_revoked("jti-2")
+    assert 0 < server.keys["revoked:jti-1"] <= 60
+
+
+def test_gunicorn_refuses_several_workers_without_shared_revocations(monkeypatch):
+    config = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.delenv("AUTH_REVOCATION_BACKEND", raising=False)
+    with pytest.raises(RuntimeError):
+        runpy.run_path(config)
+    monkeypatch.setenv("AUTH_REVOCATION_BACKEND", "redis://localhost:6379/0")
+    assert runpy.run_path(config)["workers"] == 2
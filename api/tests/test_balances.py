@@ -0,0 +1,50 @@
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def _create_debt(client, created_by):
+    resp = client.post("/debts", json={"title": "Trip", "created_by": created_by})
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def _add_participant(client, debt_id, from_user, to_user, amount, status="open"):
+    resp = client.post(
+        "/debt-participants",
+        json={
+            "debt_id": debt_id,
+            "from_user_id": from_user,
+            "to_user_id": to_user,
+            "amount": amount,
+            "status": status,
+        },
+    )
+    assert resp.status_code == 201
+
+
+def test_balances_net_per_counterparty(client):
+    alice = _register_user(client, "alice@example.com")
+    bob = _register_user(client, "bob@example.com")
+    carol = _register_user(client, "carol@example.com")
+    debt_id = _create_debt(client, alice)
+
+    _add_participant(client, debt_id, bob, alice, "10.10")
+    _add_participant(client, debt_id, bob, alice, "20.20")
+    _add_participant(client, debt_id, alice, bob, "5.05")
+    _add_participant(client, debt_id, alice, carol, "7.00")
+    _add_participant(client, debt_id, carol, alice, "100", status="settled")
+
+    resp = client.get(f"/balances?user_id={alice}")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    nets = {item["user_id"]: item["net"] for item in data["items"]}
+    assert nets == {bob: 25.25, carol: -7.0}
+    assert data["owed_to_user"] == 25.25
+    assert data["owed_by_user"] == 7.0
+    assert data["net"] == 18.25
+
+
+def test_balances_requires_user(client):
+    assert client.get("/balances").status_code == 400
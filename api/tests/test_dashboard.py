@@ -0,0 +1,101 @@
+from sqlalchemy import event
+
+from api.models import db
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _auth(client, email):
+    token = client.post("/auth/login", json={"email": email, "password": "password123"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _count_queries(client, url, headers):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        resp = client.get(url, headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return resp, len(statements)
+
+
+def test_dashboard_summary_in_fixed_queries(client):
+    a = _register_user(client, "dash-a@example.com")
+    b = _register_user(client, "dash-b@example.com")
+    headers = _auth(client, "dash-a@example.com")
+    client.post("/debts", json={"title": "Own", "created_by": a})
+    client.post(
+        "/debts",
+        json={"title": "Dinner", "created_by": b, "participants": [{"from_user_id": a, "to_user_id": b, "amount": 12}]},
+    )
+    client.post(
+        "/debts",
+        json={
+            "title": "Taxi",
+            "created_by": a,
+            "status": "settled",
+            "participants": [{"from_user_id": b, "to_user_id": a, "amount": 5}],
+        },
+    )
+    client.post("/debts", json={"title": "Not mine", "created_by": b})
+
+    resp, queries = _count_queries(client, "/dashboard?latest=2", headers)
+    assert resp.status_code == 200
+    assert queries <= 3
+    body = resp.get_json()
+    assert body["user"] == {"id": a, "email": "dash-a@example.com"}
+    assert body["status_counts"] == {"cancelled": 0, "open": 2, "settled": 1}
+    # The ledger nets each pair: a owes b 12, b owes a 5
+    assert body["totals"] == {"owed_to_user": 0.0, "owed_by_user": 7.0, "net": -7.0}
+    assert [debt["title"] for debt in body["latest_debts"]] == ["Taxi", "Dinner"]
+
+    assert client.get("/dashboard").status_code == 401
+    assert client.get("/dashboard?latest=x", headers=headers).status_code == 400
+
+
+def test_dashboard_cache_hit_skips_database_until_a_write(client):
+    a = _register_user(client, "cached@example.com")
+    headers = _auth(client, "cached@example.com")
+    client.get("/dashboard", headers=headers)
+
+    resp, queries = _count_queries(client, "/dashboard", headers)
+    assert queries == 0
+    assert resp.get_json()["latest_debts"] == []
+
+    client.post("/debts", json={"title": "Fresh", "created_by": a})
+    resp, queries = _count_queries(client, "/dashboard", headers)
+    assert queries > 0
+    assert [debt["title"] for debt in resp.get_json()["latest_debts"]] == ["Fresh"]
+
+
+def test_dashboard_reflects_csv_import(client):
+    import io
+
+    _register_user(client, "importer@example.com")
+    _register_user(client, "imported-friend@example.com")
+    headers = _auth(client, "imported-friend@example.com")
+    before = client.get("/dashboard", headers=headers).get_json()
+    assert before["totals"]["owed_by_user"] == 0
+
+    body = (
+        "debt_ref,title,created_by,from_email,to_email,amount\n"
+        "r1,Old rent,importer@example.com,imported-friend@example.com,importer@example.com,40\n"
+    )
+    resp = client.post(
+        "/imports/debts",
+        data={"file": (io.BytesIO(body.encode()), "history.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.get_json()["participants"] == 1
+
+    after = client.get("/dashboard", headers=headers).get_json()
+    assert after["totals"]["owed_by_user"] == 40.0
+    assert [debt["title"] for debt in after["latest_debts"]] == ["Old rent"]
@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from api.database import engine_options, pool_status
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "15000")
+    options = engine_options("postgresql://user:pass@db/app")
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 10
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"options": "-c statement_timeout=15000"}
+
+    assert "pool_size" not in engine_options("sqlite:///dev.db")
+
+
+def test_sqlite_wal_busy_timeout_and_pool_saturation(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "7000")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=1)
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 7000
+            status = pool_status(engine)
+            assert status["checked_out"] == 1
+            assert status["saturation"] == round(1 / 3, 3)
+        assert pool_status(engine)["checked_out"] == 0
+    finally:
+        engine.dispose()
+
+
+def test_health_db(client):
+    resp = client.get("/health/db")
+    assert resp.status_code == 200
+    assert resp.get_json()["dialect"] == "sqlite"
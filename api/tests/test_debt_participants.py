@@ -48,3 +48,152 @@ def test_debt_participants_crud(client):
 
     delete_resp = client.delete(f"/debt-participants/{participant_id}")
     assert delete_resp.status_code == 200
+
+
+def test_list_participants_paginated(client):
+    from_user = _register_user(client, "pfrom@example.com")
+    to_user = _register_user(client, "pto@example.com")
+    debt_id = _create_debt(client, from_user)
+    for amount in (10, 20, 30):
+        client.post(
+            "/debt-participants",
+            json={"debt_id": debt_id, "from_user_id": from_user, "to_user_id": to_user, "amount": amount},
+        )
+
+    first = client.get(f"/debt-participants?debt_id={debt_id}&limit=2").get_json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+
+    second = client.get(f"/debt-participants?debt_id={debt_id}&limit=2&cursor={first['next_cursor']}").get_json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+
+def test_bulk_create_participants(client):
+    payer = _register_user(client, "bulkpayer@example.com")
+    a = _register_user(client, "bulka@example.com")
+    b = _register_user(client, "bulkb@example.com")
+    debt_id = _create_debt(client, payer)
+
+    resp = client.post(
+        "/debt-participants/bulk",
+        json={
+            "debt_id": debt_id,
+            "participants": [
+                {"from_user_id": a, "to_user_id": payer, "amount": "12.50"},
+                {"from_user_id": b, "to_user_id": payer, "amount": 7, "description": "Drinks"},
+            ],
+        },
+    )
+    assert resp.status_code == 201
+    items = resp.get_json()["items"]
+    assert [item["amount"] for item in items] == [12.5, 7.0]
+
+    listed = client.get(f"/debt-participants?debt_id={debt_id}").get_json()["items"]
+    assert len(listed) == 2
+
+
+def test_bulk_even_split_distributes_cents(client):
+    payer = _register_user(client, "splitpayer@example.com")
+    others = [_register_user(client, f"split{i}@example.com") for i in range(2)]
+    debt_id = _create_debt(client, payer)
+
+    resp = client.post(
+        "/debt-participants/bulk",
+        json={
+            "debt_id": debt_id,
+            "split": {"mode": "even", "total": "100.00", "to_user_id": payer, "from_user_ids": others + [payer]},
+        },
+    )
+    assert resp.status_code == 201
+    items = resp.get_json()["items"]
+    assert sorted(item["amount"] for item in items) == [33.33, 33.34]
+    assert all(item["to_user_id"] == payer for item in items)
+
+
+def test_bulk_create_is_all_or_nothing(client):
+    payer = _register_user(client, "atomic@example.com")
+    debt_id = _create_debt(client, payer)
+
+    resp = client.post(
+        "/debt-participants/bulk",
+        json={
+            "debt_id": debt_id,
+            "participants": [
+                {"from_user_id": "x", "to_user_id": payer, "amount": 5},
+                {"from_user_id": "y", "to_user_id": payer, "amount": -1},
+            ],
+        },
+    )
+    assert resp.status_code == 400
+    assert resp.get_json()["index"] == 1
+    assert client.get(f"/debt-participants?debt_id={debt_id}").get_json()["items"] == []
+
+
+def test_non_finite_and_oversized_amounts_are_rejected(client):
+    payer = _register_user(client, "finite@example.com")
+    debt_id = _create_debt(client, payer)
+
+    for amount in ("Infinity", "-Infinity", "NaN", "sNaN", "1e20", "10000000000", "0.004"):
+        resp = client.post(
+            "/debt-participants",
+            json={"debt_id": debt_id, "from_user_id": "x", "to_user_id": payer, "amount": amount},
+        )
+        assert resp.status_code == 400, amount
+    split = client.post(
+        "/debt-participants/bulk",
+        json={"debt_id": debt_id, "split": {"mode": "shares", "total": 10, "to_user_id": payer, "shares": {"x": "Infinity"}}},
+    )
+    assert split.status_code == 400
+    assert client.get(f"/balances?user_id={payer}").get_json()["items"] == []
+
+    resp = client.post(
+        "/debt-participants",
+        json={"debt_id": debt_id, "from_user_id": "x", "to_user_id": payer, "amount": "9999999999.99"},
+    )
+    assert resp.status_code == 201
+    patched = client.put(f"/debt-participants/{resp.get_json()['id']}", json={"amount": "NaN"})
+    assert patched.status_code == 400
+
+
+def test_amounts_are_rounded_to_cents(client):
+    payer = _register_user(client, "cents@example.com")
+    debt_id = _create_debt(client, payer)
+    resp = client.post(
+        "/debt-participants",
+        json={"debt_id": debt_id, "from_user_id": "x", "to_user_id": payer, "amount": "10.005"},
+    )
+    assert resp.get_json()["amount"] == 10.01
+    assert client.get("/balances?user_id=x").get_json()["items"] == [{"user_id": payer, "net": -10.01}]
+
+
+def test_bulk_split_rejects_string_user_list_and_empty_result(client):
+    payer = _register_user(client, "badsplit@example.com")
+    debt_id = _create_debt(client, payer)
+
+    def split(**spec):
+        return client.post("/debt-participants/bulk", json={"debt_id": debt_id, "split": {"to_user_id": payer, **spec}})
+
+    assert split(mode="even", total=10, from_user_ids="abc").status_code == 400
+    assert split(mode="even", total=10, from_user_ids=["a", 5]).status_code == 400
+    assert split(mode="even", total="0.001", from_user_ids=["a"]).status_code == 400
+    # The only non-zero share is the payer's own
+    assert split(mode="even", total="0.01", from_user_ids=[payer, "a"]).status_code == 400
+    assert client.get(f"/debt-participants?debt_id={debt_id}").get_json()["items"] == []
+
+
+def test_non_string_split_and_participant_fields_return_400(client):
+    payer = _register_user(client, "typed@example.com")
+    debt_id = _create_debt(client, payer)
+    base = {"mode": "even", "total": 10, "to_user_id": payer, "from_user_ids": ["a"]}
+
+    for key, value in (("mode", 5), ("to_user_id", 5), ("description", 5), ("status", True)):
+        resp = client.post("/debt-participants/bulk", json={"debt_id": debt_id, "split": {**base, key: value}})
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == f"invalid split.{key}"
+    resp = client.post(
+        "/debt-participants",
+        json={"debt_id": debt_id, "from_user_id": "a", "to_user_id": payer, "amount": 1, "description": 5},
+    )
+    assert resp.status_code == 400
+    assert client.get(f"/debt-participants?debt_id={debt_id}").get_json()["items"] == []
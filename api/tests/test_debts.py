@@ -32,3 +32,132 @@ def test_debts_crud(client):
 
     delete_resp = client.delete(f"/debts/{debt_id}")
     assert delete_resp.status_code == 200
+
+
+def test_list_debts_keyset_pagination(client):
+    user_id = _register_user(client, "pages@example.com")
+    created = []
+    for i in range(5):
+        resp = client.post("/debts", json={"title": f"Debt {i}", "created_by": user_id})
+        created.append(resp.get_json()["id"])
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/debts?created_by={user_id}&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        resp = client.get(url)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data["items"]) <= 2
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
+
+    legacy = client.get(f"/debts?created_by={user_id}").get_json()
+    assert set(legacy) == {"items"}
+    assert len(legacy["items"]) == 5
+
+
+def test_list_debts_rejects_bad_cursor(client):
+    assert client.get("/debts?cursor=not-a-cursor").status_code == 400
+    assert client.get("/debts?limit=0").status_code == 400
+
+
+def test_create_debt_with_participants(client):
+    owner = _register_user(client, "nested@example.com")
+    friend = _register_user(client, "friend@example.com")
+
+    resp = client.post(
+        "/debts",
+        json={
+            "title": "Concert",
+            "created_by": owner,
+            "participants": [
+                {"from_user_id": friend, "to_user_id": owner, "amount": "45.00"},
+                {"from_user_id": owner, "to_user_id": friend, "amount": 5},
+            ],
+        },
+    )
+    assert resp.status_code == 201
+    debt = resp.get_json()
+    assert [p["amount"] for p in debt["participants"]] == [45.0, 5.0]
+    assert all(p["debt_id"] == debt["id"] for p in debt["participants"])
+
+    listed = client.get(f"/debt-participants?debt_id={debt['id']}").get_json()["items"]
+    assert len(listed) == 2
+
+
+def test_create_debt_with_invalid_participant_writes_nothing(client):
+    owner = _register_user(client, "halfbuilt@example.com")
+    resp = client.post(
+        "/debts",
+        json={"title": "Broken", "created_by": owner, "participants": [{"to_user_id": owner, "amount": 0}]},
+    )
+    assert resp.status_code == 400
+    assert resp.get_json()["index"] == 0
+    assert client.get(f"/debts?created_by={owner}").get_json()["items"] == []
+
+
+def test_expanded_debt_page_uses_constant_queries(app, client):
+    from sqlalchemy import event
+
+    from api.models import db
+
+    users = [_register_user(client, f"fan{i}@example.com") for i in range(4)]
+    for d in range(6):
+        client.post(
+            "/debts",
+            json={
+                "title": f"Expand {d}",
+                "created_by": users[0],
+                "participants": [
+                    {"from_user_id": users[i], "to_user_id": users[0], "amount": d + i} for i in range(1, 4)
+                ],
+            },
+        )
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        resp = client.get(f"/debts?created_by={users[0]}&limit=50&expand=participants,users")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert len(data["items"]) == 6
+    assert all(len(item["participants"]) == 3 for item in data["items"])
+    assert set(data["users"]) == set(users)
+    # The conditional path adds exactly one ETag version query on top of the page
+    version = [statement for statement in statements if "max(" in statement]
+    assert len(version) == 1
+    # debts + participants + users
+    assert len(statements) - len(version) <= 3
+
+
+def test_get_debt_expanded_and_bad_expand(client):
+    owner = _register_user(client, "detail@example.com")
+    friend = _register_user(client, "detailfriend@example.com")
+    debt = client.post(
+        "/debts",
+        json={"title": "Detail", "created_by": owner, "participants": [{"from_user_id": friend, "to_user_id": owner, "amount": 3}]},
+    ).get_json()
+
+    resp = client.get(f"/debts/{debt['id']}?expand=participants,users")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["participants"][0]["from_user_id"] == friend
+    assert data["users"][friend]["email"] == "detailfriend@example.com"
+
+    assert client.get(f"/debts/{debt['id']}?expand=everything").status_code == 400
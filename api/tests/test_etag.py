@@ -0,0 +1,66 @@
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def test_debt_etag_changes_on_update(client):
+    user_id = _register_user(client, "etag@example.com")
+    debt_id = client.post("/debts", json={"title": "Rent", "created_by": user_id}).get_json()["id"]
+
+    first = client.get(f"/debts/{debt_id}")
+    etag = first.headers["ETag"]
+    assert etag
+    again = client.get(f"/debts/{debt_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    client.put(f"/debts/{debt_id}", json={"title": "Rent (March)"})
+    changed = client.get(f"/debts/{debt_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert client.get("/debts/missing", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_list_etag_tracks_filters_and_nested_participants(app, client):
+    from sqlalchemy import event
+
+    from api.models import db
+
+    a = _register_user(client, "la@example.com")
+    b = _register_user(client, "lb@example.com")
+    debt = client.post(
+        "/debts",
+        json={"title": "Trip", "created_by": a, "participants": [{"from_user_id": b, "to_user_id": a, "amount": 5}]},
+    ).get_json()
+    url = f"/debts?created_by={a}&expand=participants"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(f"/debts?created_by={b}").headers["ETag"] != etag
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        resp = client.get(url, headers={"If-None-Match": etag})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert resp.status_code == 304
+    assert len(statements) == 1
+
+    participant_id = debt["participants"][0]["id"]
+    client.post("/payments", json={"debt_participant_id": participant_id, "amount": 1})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    participants_etag = client.get(f"/debt-participants?debt_id={debt['id']}").headers["ETag"]
+    resp = client.get(f"/debt-participants?debt_id={debt['id']}", headers={"If-None-Match": participants_etag})
+    assert resp.status_code == 304
+
+
+def test_me_etag(client):
+    _register_user(client, "me@example.com")
+    token = client.post("/auth/login", json={"email": "me@example.com", "password": "password123"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.get("/auth/me", headers=headers).headers["ETag"]
+    assert client.get("/auth/me", headers={**headers, "If-None-Match": etag}).status_code == 304
@@ -0,0 +1,64 @@
+# The app registers the top-level `events` module; use the same objects here
+from events import bus, socketio
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _token(client, email):
+    return client.post("/auth/login", json={"email": email, "password": "password123"}).get_json()["token"]
+
+
+def test_changes_are_pushed_to_affected_user_rooms(app, client):
+    a = _register_user(client, "sa@example.com")
+    b = _register_user(client, "sb@example.com")
+    _register_user(client, "outsider@example.com")
+    socket_b = socketio.test_client(app, auth={"token": _token(client, "sb@example.com")})
+    outsider = socketio.test_client(app, auth={"token": _token(client, "outsider@example.com")})
+    assert socket_b.is_connected()
+
+    debt = client.post(
+        "/debts",
+        json={"title": "Pizza", "created_by": a, "participants": [{"from_user_id": b, "to_user_id": a, "amount": 8}]},
+    ).get_json()
+    client.post("/payments", json={"debt_participant_id": debt["participants"][0]["id"], "amount": 3})
+    client.delete(f"/debts/{debt['id']}")
+
+    received = socket_b.get_received()
+    assert [message["name"] for message in received] == ["change"] * 3
+    events = [message["args"][0] for message in received]
+    assert [event["type"] for event in events] == ["debt.created", "payment.created", "debt.deleted"]
+    assert events[1]["data"]["participant"]["remaining_amount"] == 5.0
+    assert "data" not in events[2]
+    assert outsider.get_received() == []
+
+
+def test_connect_requires_valid_token(app):
+    assert not socketio.test_client(app).is_connected()
+    assert not socketio.test_client(app, auth={"token": "bogus"}).is_connected()
+
+
+def test_local_subscribers_see_participant_changes(client):
+    a = _register_user(client, "la@example.com")
+    b = _register_user(client, "lb@example.com")
+    debt_id = client.post("/debts", json={"title": "Cinema", "created_by": a}).get_json()["id"]
+
+    seen = []
+
+    def listener(event, user_ids):
+        seen.append((event["type"], user_ids))
+
+    bus.subscribe(listener)
+    try:
+        created = client.post(
+            "/debt-participants", json={"debt_id": debt_id, "from_user_id": b, "to_user_id": a, "amount": 6}
+        ).get_json()
+        client.put(f"/debt-participants/{created['id']}", json={"status": "settled"})
+    finally:
+        bus.unsubscribe(listener)
+    assert seen == [
+        ("debt_participant.created", sorted([a, b])),
+        ("debt_participant.updated", sorted([a, b])),
+    ]
@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _seed(client):
+    owner = _register_user(client, "export@example.com")
+    friend = _register_user(client, "exportfriend@example.com")
+    debt = client.post(
+        "/debts",
+        json={
+            "title": "Ledger, 2025",
+            "created_by": owner,
+            "participants": [
+                {"from_user_id": friend, "to_user_id": owner, "amount": "10.50"},
+                {"from_user_id": friend, "to_user_id": owner, "amount": 4, "status": "settled"},
+            ],
+        },
+    ).get_json()
+    client.post("/debts", json={"title": "Other", "created_by": friend})
+    return owner, friend, debt["id"]
+
+
+def test_export_participants_csv_streams_filtered_rows(client):
+    owner, friend, debt_id = _seed(client)
+
+    resp = client.get(f"/debt-participants/export?format=csv&debt_id={debt_id}&status=open")
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert len(rows) == 1
+    assert rows[0]["from_user_id"] == friend
+    assert rows[0]["amount"] == "10.50"
+
+
+def test_export_debts_ndjson(client):
+    owner, friend, debt_id = _seed(client)
+
+    resp = client.get(f"/debts/export?format=ndjson&created_by={owner}")
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [line["title"] for line in lines] == ["Ledger, 2025"]
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/debts/export?format=xml").status_code == 400
@@ -1,6 +1,13 @@
 import os
 
-from api.auth.argon2_hash import hash_password, verify_password, needs_rehash
+from api.auth.argon2_hash import (
+    Argon2Params,
+    PasswordHashingService,
+    hash_password,
+    needs_rehash,
+    reload_hasher,
+    verify_password,
+)
 
 
 def test_argon_hash_verify_and_needs_rehash(monkeypatch):
@@ -8,6 +15,7 @@ def test_argon_hash_verify_and_needs_rehash(monkeypatch):
     monkeypatch.setenv("ARGON2_TIME_COST", "1")
     monkeypatch.setenv("ARGON2_MEMORY_COST", "1024")
     monkeypatch.setenv("ARGON2_PARALLELISM", "1")
+    reload_hasher()
 
     pw = "testpassword"
     weak_hash = hash_password(pw)
@@ -19,6 +27,7 @@ def test_argon_hash_verify_and_needs_rehash(monkeypatch):
     monkeypatch.setenv("ARGON2_TIME_COST", "3")
     monkeypatch.setenv("ARGON2_MEMORY_COST", "65536")
     monkeypatch.setenv("ARGON2_PARALLELISM", "2")
+    reload_hasher()
 
     # The existing weak hash should be considered for rehash
     assert needs_rehash(weak_hash)
@@ -27,3 +36,35 @@ def test_argon_hash_verify_and_needs_rehash(monkeypatch):
     new_hash = hash_password(pw)
     assert new_hash != weak_hash
     assert verify_password(new_hash, pw)
+
+
+def test_hasher_is_cached_until_reloaded(monkeypatch):
+    monkeypatch.setenv("ARGON2_TIME_COST", "1")
+    monkeypatch.setenv("ARGON2_MEMORY_COST", "1024")
+    monkeypatch.setenv("ARGON2_PARALLELISM", "1")
+    service = reload_hasher()
+
+    monkeypatch.setenv("ARGON2_MEMORY_COST", "2048")
+    h = hash_password("cachedpass")
+    assert "m=1024," in h
+    assert service.params == Argon2Params(1, 1024, 1)
+
+
+def test_legacy_profile_rollout():
+    legacy = Argon2Params(1, 1024, 1)
+    active = Argon2Params(1, 2048, 1)
+    old_hash = PasswordHashingService(legacy).hash("rolloutpass")
+
+    paused = PasswordHashingService(active, legacy_profiles=[legacy], rollout_percent=0)
+    assert paused.verify(old_hash, "rolloutpass")
+    assert not paused.needs_rehash(old_hash, key="user-1")
+
+    full = PasswordHashingService(active, legacy_profiles=[legacy], rollout_percent=100)
+    assert full.needs_rehash(old_hash, key="user-1")
+
+    partial = PasswordHashingService(active, legacy_profiles=[legacy], rollout_percent=50)
+    upgraded = [partial.needs_rehash(old_hash, key=f"user-{i}") for i in range(200)]
+    assert 0 < sum(upgraded) < 200
+
+    unknown = PasswordHashingService(Argon2Params(1, 4096, 1)).hash("rolloutpass")
+    assert paused.needs_rehash(unknown, key="user-1")
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from api.auth.executor import HashingExecutor, HashingUnavailable
+
+
+def test_executor_rejects_when_queue_full():
+    executor = HashingExecutor(max_workers=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(executor.run(slow)))
+    worker.start()
+    assert started.wait(5)
+
+    with pytest.raises(HashingUnavailable):
+        executor.run(lambda: "never")
+
+    release.set()
+    worker.join(5)
+    assert results == ["done"]
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["hash_time"]["count"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_register_returns_503_when_hashing_busy(client, monkeypatch):
+    # Patch the module the app itself imported (top-level `routes`, not `api.routes`)
+    import routes.auth as auth_routes
+
+    def busy(*args):
+        raise auth_routes.HashingUnavailable("full")
+
+    monkeypatch.setattr(auth_routes, "offload", busy)
+    resp = client.post("/auth/register", json={"email": "busy@example.com", "password": "password123"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_hashing_health_reports_timings(client):
+    client.post("/auth/register", json={"email": "timed@example.com", "password": "password123"})
+    stats = client.get("/health/hashing").get_json()
+    assert stats["hash_time"]["count"] >= 1
+    assert "avg_ms" in stats["queue_wait"]
+
+
+_GREEN_PROGRESS_SCRIPT = """
+import eventlet
+eventlet.monkey_patch()
+
+import time
+from argon2.low_level import Type, hash_secret_raw
+from auth.executor import HashingExecutor
+
+executor = HashingExecutor(max_workers=1, max_queue=0)
+gaps = []
+
+def ticker(done):
+    last = time.perf_counter()
+    while not done:
+        eventlet.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+def slow_hash():
+    started = time.perf_counter()
+    while time.perf_counter() - started < 0.5:
+        hash_secret_raw(b"password", b"somesaltsomesalt", 2, 64 * 1024, 1, 32, Type.ID)
+
+done = []
+tick = eventlet.spawn(ticker, done)
+eventlet.sleep(0.05)
+executor.run(slow_hash)
+done.append(True)
+tick.wait()
+print(max(gaps))
+"""
+
+
+def test_other_green_threads_progress_during_hash_under_eventlet():
+    pytest.importorskip("eventlet")
+    import os
+    import subprocess
+    import sys
+
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", _GREEN_PROGRESS_SCRIPT], cwd=api_dir, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    # A hash on the hub would stall the 10 ms ticker for the whole 0.5 s
+    assert float(result.stdout.strip()) < 0.2
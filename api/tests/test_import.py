@@ -0,0 +1,87 @@
+import io
+
+from api.models import Debt, DebtParticipant
+
+CSV_HEADER = "debt_ref,title,description,status,created_by,created_at,from_email,to_email,amount,participant_description,participant_status\n"
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def test_import_csv_batches_and_rejects(client):
+    owner = _register_user(client, "owner@example.com")
+    friend = _register_user(client, "friend@example.com")
+    body = CSV_HEADER + "".join(
+        [
+            "r1,Rent 2023,,open,owner@example.com,2023-01-01T00:00:00,friend@example.com,owner@example.com,500,Jan,\n",
+            "r1,ignored,,open,owner@example.com,,friend@example.com,owner@example.com,450.25,Feb,settled\n",
+            "r2,Trip,,open,owner@example.com,,,,,,\n",
+            "r3,Bad amount,,open,owner@example.com,,friend@example.com,owner@example.com,-5,,\n",
+            "r4,Unknown user,,open,ghost@example.com,,,,,,\n",
+            "r5,Bad status,,archived,owner@example.com,,,,,,\n",
+        ]
+    )
+
+    resp = client.post(
+        "/imports/debts",
+        data={"file": (io.BytesIO(body.encode()), "history.csv"), "batch_size": "2"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    report = resp.get_json()
+    assert report["rows"] == 6
+    assert report["debts"] == 2
+    assert report["participants"] == 2
+    assert report["rejected"] == 3
+    assert [error["line"] for error in report["errors"]] == [5, 6, 7]
+
+    rent = Debt.query.filter_by(title="Rent 2023").one()
+    assert rent.created_by == owner
+    assert rent.created_at.year == 2023
+    edges = DebtParticipant.query.filter_by(debt_id=rent.id).all()
+    assert sorted(float(edge.amount) for edge in edges) == [450.25, 500.0]
+    assert {edge.from_user_id for edge in edges} == {friend}
+    # Edges keep the debt's historical date, including the one added in the next batch
+    assert {edge.created_at.year for edge in edges} == {2023}
+
+
+def test_import_reports_physical_line_after_quoted_newline(client):
+    _register_user(client, "owner@example.com")
+    body = CSV_HEADER + "".join(
+        [
+            'r1,Rent,"first line\nsecond line",open,owner@example.com,,,,,,\n',
+            "r2,Bad status,,archived,owner@example.com,,,,,,\n",
+        ]
+    )
+
+    resp = client.post(
+        "/imports/debts",
+        data={"file": (io.BytesIO(body.encode()), "history.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    report = resp.get_json()
+    assert report["debts"] == 1
+    # The quoted description spans lines 2-3, so the bad row sits on line 4
+    assert [error["line"] for error in report["errors"]] == [4]
+
+
+def test_import_requires_file(client):
+    assert client.post("/imports/debts").status_code == 400
+
+
+def test_import_invalid_utf8_returns_400_with_line(client):
+    _register_user(client, "bytes@example.com")
+    good = "r1,Fine,,open,bytes@example.com,,,,,,\n".encode()
+    body = CSV_HEADER.encode() + good + b"r2,Bad \xff title,,open,bytes@example.com,,,,,,\n"
+
+    resp = client.post(
+        "/imports/debts",
+        data={"file": (io.BytesIO(body), "history.csv"), "batch_size": "1"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "line 3 is not valid UTF-8", "line": 3, "debts": 1, "participants": 0}
+    assert [debt.title for debt in Debt.query.all()] == ["Fine"]
@@ -0,0 +1,60 @@
+import re
+
+import pytest
+from sqlalchemy import event, text
+
+from api.models import db
+
+
+def _captured_selects(client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        resp = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+    assert resp.status_code == 200
+    assert statements
+    return statements
+
+
+def _plan(statement, parameters):
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/debts?created_by=u1",
+        "/debts?created_by=u1&status=open&limit=20",
+        "/debt-participants?debt_id=d1",
+        "/debt-participants?from_user_id=u1&status=open&limit=20",
+        "/debt-participants?to_user_id=u1&status=open",
+        "/balances?user_id=u1",
+    ],
+)
+def test_filtered_reads_use_indexes(client, url):
+    for statement, parameters in _captured_selects(client, url):
+        plan = _plan(statement, parameters)
+        scans = [step for step in plan if re.match(r"SCAN (debts|debt_participants)\b", step) and "INDEX" not in step]
+        assert not scans, f"{url} regressed to a table scan: {plan}"
+
+
+def test_model_declares_migration_indexes(app):
+    with db.engine.connect() as conn:
+        names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {
+        "idx_debts_created_by",
+        "idx_debts_status",
+        "idx_debts_created_by_status_created_at",
+        "idx_debt_participants_debt_id",
+        "idx_debt_participants_from_user_status",
+        "idx_debt_participants_to_user_status",
+    } <= names
@@ -0,0 +1,67 @@
+from api.ledger import check, rebuild
+from api.models import UserBalance, db
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _nets(client, user_id):
+    data = client.get(f"/balances?user_id={user_id}").get_json()
+    return {item["user_id"]: item["net"] for item in data["items"]}
+
+
+def test_ledger_follows_every_participant_write(client):
+    a = _register_user(client, "la@example.com")
+    b = _register_user(client, "lb@example.com")
+    c = _register_user(client, "lc@example.com")
+    debt = client.post(
+        "/debts",
+        json={"title": "Ledger", "created_by": a, "participants": [{"from_user_id": b, "to_user_id": a, "amount": 10}]},
+    ).get_json()
+    debt_id = debt["id"]
+    assert _nets(client, a) == {b: 10.0}
+    assert _nets(client, b) == {a: -10.0}
+
+    created = client.post(
+        "/debt-participants", json={"debt_id": debt_id, "from_user_id": c, "to_user_id": a, "amount": "2.50"}
+    ).get_json()
+    client.post(
+        "/debt-participants/bulk",
+        json={"debt_id": debt_id, "participants": [{"from_user_id": a, "to_user_id": b, "amount": 4}]},
+    )
+    assert _nets(client, a) == {b: 6.0, c: 2.5}
+
+    client.put(f"/debt-participants/{created['id']}", json={"amount": 3, "from_user_id": b})
+    assert _nets(client, a) == {b: 9.0}
+    assert _nets(client, c) == {}
+
+    client.put(f"/debt-participants/{created['id']}", json={"status": "settled"})
+    assert _nets(client, a) == {b: 6.0}
+
+    client.delete(f"/debt-participants/{created['id']}")
+    assert _nets(client, a) == {b: 6.0}
+    assert check() == []
+
+    client.delete(f"/debts/{debt_id}")
+    assert _nets(client, a) == {}
+    assert check() == []
+
+
+def test_rebuild_and_check_detect_drift(client):
+    a = _register_user(client, "ra@example.com")
+    b = _register_user(client, "rb@example.com")
+    client.post(
+        "/debts",
+        json={"title": "Drift", "created_by": a, "participants": [{"from_user_id": b, "to_user_id": a, "amount": 7}]},
+    )
+
+    row = UserBalance.query.filter_by(user_id=a, counterparty_id=b).one()
+    row.amount = 1
+    db.session.commit()
+    assert [(m["user_id"], m["expected"], m["stored"]) for m in check()] == [(a, "7.00", "1.00")]
+
+    assert rebuild() == 2
+    assert check() == []
+    assert _nets(client, a) == {b: 7.0}
@@ -0,0 +1,52 @@
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+
+# Same module the app and auth.executor use, so the engine hooks are shared
+import metrics
+
+
+def _instrumented_app():
+    app = Flask(__name__)
+    engine = create_engine("sqlite://")
+    metrics.init_metrics(app, enabled=True)
+
+    @app.route("/things")
+    def things():
+        with engine.connect() as conn:
+            rows = [conn.execute(text("SELECT :n"), {"n": n}).scalar() for n in range(3)]
+        with metrics.timed("hash"):
+            pass
+        return jsonify({"items": rows})
+
+    return app
+
+
+def test_request_metrics_and_prometheus_output():
+    for histogram in metrics.HISTOGRAMS.values():
+        histogram.clear()
+    client = _instrumented_app().test_client()
+
+    resp = client.get("/things")
+    assert resp.get_json() == {"items": [0, 1, 2]}
+    timing = resp.headers["Server-Timing"]
+    assert 'desc="3 queries"' in timing and "serialize;dur=" in timing and "total;dur=" in timing
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_sql_queries_bucket{endpoint="things",method="GET",le="3"} 1' in body
+    assert 'http_request_sql_queries_bucket{endpoint="things",method="GET",le="2"} 0' in body
+    assert 'http_request_duration_seconds_count{endpoint="things",method="GET"} 1' in body
+
+
+def test_slow_sampled_requests_are_profiled(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    monkeypatch.setenv("PROFILE_SLOW_MS", "0")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    _instrumented_app().test_client().get("/things")
+    dumps = list(tmp_path.glob("*-things-*ms.prof"))
+    assert len(dumps) == 1
+
+
+def test_metrics_are_opt_in(client):
+    assert client.get("/metrics").status_code == 404
+    assert "Server-Timing" not in client.get("/health").headers
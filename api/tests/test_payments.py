@@ -0,0 +1,159 @@
+from api.ledger import check
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _participant(client, amount="0.30"):
+    payer = _register_user(client, "payer@example.com")
+    lender = _register_user(client, "lender@example.com")
+    debt = client.post(
+        "/debts",
+        json={
+            "title": "Lunch",
+            "created_by": lender,
+            "participants": [{"from_user_id": payer, "to_user_id": lender, "amount": amount}],
+        },
+    ).get_json()
+    return payer, lender, debt["participants"][0]
+
+
+def test_partial_payments_settle_participant(client):
+    payer, lender, participant = _participant(client)
+    assert participant["remaining_amount"] == 0.3
+
+    first = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": "0.10"})
+    assert first.status_code == 201
+    body = first.get_json()
+    assert body["payment"]["paid_by"] == payer
+    assert body["participant"]["remaining_amount"] == 0.2
+    assert body["participant"]["status"] == "open"
+    nets = client.get(f"/balances?user_id={lender}").get_json()["items"]
+    assert nets == [{"user_id": payer, "net": 0.2}]
+
+    second = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": "0.20"})
+    assert second.status_code == 201
+    assert second.get_json()["participant"]["remaining_amount"] == 0.0
+    assert second.get_json()["participant"]["status"] == "settled"
+    assert check() == []
+
+    late = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": "0.01"})
+    assert late.status_code == 409
+
+
+def test_overpayment_and_unknown_participant(client):
+    _, _, participant = _participant(client, amount=5)
+
+    too_much = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": "5.01"})
+    assert too_much.status_code == 409
+    missing = client.post("/payments", json={"debt_participant_id": "nope", "amount": 1})
+    assert missing.status_code == 404
+    invalid = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": 0})
+    assert invalid.status_code == 400
+    assert client.get(f"/debt-participants/{participant['id']}").get_json()["remaining_amount"] == 5.0
+
+
+def test_batch_is_all_or_nothing(client):
+    _, _, participant = _participant(client, amount=10)
+    payments = [
+        {"debt_participant_id": participant["id"], "amount": 4},
+        {"debt_participant_id": participant["id"], "amount": 7},
+    ]
+
+    failed = client.post("/payments/batch", json={"payments": payments})
+    assert failed.status_code == 409
+    assert failed.get_json()["index"] == 1
+    assert client.get(f"/debt-participants/{participant['id']}").get_json()["remaining_amount"] == 10.0
+
+    payments[1]["amount"] = 6
+    ok = client.post("/payments/batch", json={"payments": payments})
+    assert ok.status_code == 201
+    assert len(ok.get_json()["items"]) == 2
+    assert client.get(f"/debt-participants/{participant['id']}").get_json()["status"] == "settled"
+    assert check() == []
+
+
+def test_payment_history_paginated_by_paid_at(client):
+    _, _, participant = _participant(client, amount=100)
+    for day in (1, 3, 2):
+        client.post(
+            "/payments",
+            json={"debt_participant_id": participant["id"], "amount": day, "paid_at": f"2026-01-0{day}T12:00:00"},
+        )
+
+    first = client.get(f"/debt-participants/{participant['id']}/payments?limit=2").get_json()
+    assert [item["amount"] for item in first["items"]] == [3.0, 2.0]
+    second = client.get(
+        f"/debt-participants/{participant['id']}/payments?limit=2&cursor={first['next_cursor']}"
+    ).get_json()
+    assert [item["amount"] for item in second["items"]] == [1.0]
+    assert second["next_cursor"] is None
+    assert client.get("/debt-participants/nope/payments").status_code == 404
+
+
+def test_non_finite_payment_amounts_are_rejected(client):
+    _, _, participant = _participant(client, amount=5)
+    for amount in ("Infinity", "NaN", "1e300"):
+        resp = client.post("/payments", json={"debt_participant_id": participant["id"], "amount": amount})
+        assert resp.status_code == 400, amount
+
+
+def test_non_string_paid_at_is_rejected(client):
+    _, _, participant = _participant(client, amount=5)
+    for paid_at in (1700000000, True, ["2024-01-01"]):
+        resp = client.post(
+            "/payments", json={"debt_participant_id": participant["id"], "amount": 1, "paid_at": paid_at}
+        )
+        assert resp.status_code == 400
+        assert resp.get_json()["error"] == "invalid paid_at"
+    resp = client.post("/payments", json={"debt_participant_id": 7, "amount": 1})
+    assert resp.status_code == 400
+
+
+def test_payment_during_participant_update_is_not_lost(app, tmp_path, monkeypatch):
+    import threading
+
+    # The app uses the top-level modules
+    import routes.debt_participants as participant_routes
+    from api.database import engine_options
+    from api.models import db
+
+    # Two real connections need a file database
+    url = f"sqlite:///{tmp_path / 'race.db'}"
+    monkeypatch.setitem(app.config, "SQLALCHEMY_DATABASE_URI", url)
+    monkeypatch.setitem(app.config, "SQLALCHEMY_ENGINE_OPTIONS", engine_options(url))
+    db.create_all()
+    client = app.test_client()
+    _, _, participant = _participant(client, amount=10)
+
+    read_done, payment_done = threading.Event(), threading.Event()
+    real_contribution = participant_routes.contribution
+
+    def contribution_then_wait(row):
+        # Hold the PUT between its read and its commit while a payment tries to land
+        if not read_done.is_set():
+            read_done.set()
+            payment_done.wait(1)
+        return real_contribution(row)
+
+    monkeypatch.setattr(participant_routes, "contribution", contribution_then_wait)
+    results = {}
+
+    def pay():
+        read_done.wait(5)
+        results["payment"] = app.test_client().post(
+            "/payments", json={"debt_participant_id": participant["id"], "amount": 4}
+        ).status_code
+        payment_done.set()
+
+    payer = threading.Thread(target=pay)
+    payer.start()
+    results["put"] = client.put(f"/debt-participants/{participant['id']}", json={"amount": 20}).status_code
+    payer.join(10)
+
+    assert results == {"put": 200, "payment": 201}
+    updated = client.get(f"/debt-participants/{participant['id']}").get_json()
+    assert (updated["amount"], updated["remaining_amount"]) == (20.0, 16.0)
+    assert check() == []
@@ -0,0 +1,130 @@
+from sqlalchemy import event
+
+from api.models import db
+
+# The app uses the top-level module; share its cache and counters
+from record_cache import MemoryBackend, RecordCache, RedisBackend, records
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _get(client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        resp = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return resp, len(statements)
+
+
+def test_repeat_reads_are_served_without_queries_until_written(client):
+    a = _register_user(client, "rc-a@example.com")
+    b = _register_user(client, "rc-b@example.com")
+    debt = client.post(
+        "/debts",
+        json={"title": "Cached", "created_by": a, "participants": [{"from_user_id": b, "to_user_id": a, "amount": 9}]},
+    ).get_json()
+    participant_id = debt["participants"][0]["id"]
+    before = records.stats()["debt"]["hits"]
+
+    _, first = _get(client, f"/debts/{debt['id']}")
+    resp, second = _get(client, f"/debts/{debt['id']}")
+    assert first == 1 and second == 0
+    assert resp.get_json()["title"] == "Cached"
+    assert records.stats()["debt"]["hits"] == before + 1
+
+    client.put(f"/debts/{debt['id']}", json={"title": "Renamed"})
+    resp, queries = _get(client, f"/debts/{debt['id']}")
+    assert queries == 1 and resp.get_json()["title"] == "Renamed"
+
+    client.get(f"/debt-participants/{participant_id}")
+    client.post("/payments", json={"debt_participant_id": participant_id, "amount": 4})
+    assert client.get(f"/debt-participants/{participant_id}").get_json()["remaining_amount"] == 5.0
+
+    client.delete(f"/debts/{debt['id']}")
+    assert client.get(f"/debts/{debt['id']}").status_code == 404
+    assert client.get(f"/debt-participants/{participant_id}").status_code == 404
+
+    stats = client.get("/health/cache").get_json()
+    assert stats["backend"] == "MemoryBackend"
+    assert 0 < stats["debt"]["hit_rate"] <= 1
+
+
+def test_miss_racing_an_invalidation_is_not_stored():
+    cache = RecordCache(MemoryBackend(maxsize=10, ttl=60))
+
+    def stale_load():
+        cache.invalidate("debt", "d1")  # a write commits while the old row is being read
+        return {"id": "d1", "title": "old"}
+
+    assert cache.get("debt", "d1", stale_load)["title"] == "old"
+    assert cache.get("debt", "d1", lambda: {"id": "d1", "title": "new"})["title"] == "new"
+    assert cache.get("debt", "d1", lambda: None)["title"] == "new"
+    assert cache.stats()["debt"] == {"hits": 1, "misses": 2, "invalidations": 1, "hit_rate": 0.3333}
+
+
+class _SharedRedis:
+    """Just enough of a Redis client for RedisBackend; one instance plays the shared server."""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, *names):
+        return [self.data.get(name) for name in names]
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value.encode()
+
+    def incr(self, name):
+        self.data[name] = str(int(self.data.get(name, 0)) + 1).encode()
+
+    def expire(self, name, seconds):
+        pass
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+    def pipeline(self):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        for name, args, kwargs in self.calls:
+            getattr(self.client, name)(*args, **kwargs)
+
+
+def test_redis_guard_is_shared_between_workers():
+    server = _SharedRedis()
+    worker_a = RecordCache(RedisBackend("redis://unused", ttl=60, client=server))
+    worker_b = RecordCache(RedisBackend("redis://unused", ttl=60, client=server))
+
+    def stale_load():
+        worker_b.invalidate("debt", "d1")  # worker B commits a write while A reads the old row
+        return {"id": "d1", "title": "old"}
+
+    assert worker_a.get("debt", "d1", stale_load)["title"] == "old"
+    # The late write from A is stored but no worker serves it
+    assert worker_b.get("debt", "d1", lambda: {"id": "d1", "title": "new"})["title"] == "new"
+    assert worker_a.get("debt", "d1", lambda: None)["title"] == "new"
+    assert worker_a.stats()["debt"]["hits"] == 1
+
+    worker_a.get("debt_participant", "p1", lambda: {"id": "p1", "status": "open"})
+    worker_b.invalidate_kind("debt_participant")
+    assert worker_a.get("debt_participant", "p1", lambda: {"id": "p1", "status": "settled"})["status"] == "settled"
@@ -0,0 +1,87 @@
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def _create(client, user_id, title, description=None, status="open"):
+    resp = client.post(
+        "/debts", json={"title": title, "description": description, "created_by": user_id, "status": status}
+    )
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def test_search_ranks_title_matches_first_and_ignores_diacritics(client):
+    user_id = _register_user(client, "search@example.com")
+    in_description = _create(client, user_id, "Weekend", "zakupy na wyjazd")
+    in_title = _create(client, user_id, "Zakupy spożywcze")
+    _create(client, user_id, "Czynsz", "styczeń")
+
+    items = client.get("/debts/search?q=zakup").get_json()["items"]
+    assert [item["id"] for item in items] == [in_title, in_description]
+    assert items[0]["score"] > items[1]["score"]
+
+    items = client.get("/debts/search?q=spozywcze").get_json()["items"]
+    assert [item["id"] for item in items] == [in_title]
+
+    assert client.get("/debts/search?q=%20%22").status_code == 400
+
+
+def test_search_follows_updates_and_deletes(client):
+    user_id = _register_user(client, "sync@example.com")
+    debt_id = _create(client, user_id, "Kino")
+
+    client.put(f"/debts/{debt_id}", json={"title": "Teatr"})
+    assert client.get("/debts/search?q=kino").get_json()["items"] == []
+    assert [item["id"] for item in client.get("/debts/search?q=teatr").get_json()["items"]] == [debt_id]
+
+    client.delete(f"/debts/{debt_id}")
+    assert client.get("/debts/search?q=teatr").get_json()["items"] == []
+
+
+def test_search_filters_and_keyset_pagination(client):
+    user_id = _register_user(client, "pages-search@example.com")
+    other_id = _register_user(client, "other-search@example.com")
+    expected = {_create(client, user_id, f"Obiad {n}") for n in range(5)}
+    _create(client, user_id, "Obiad settled", status="settled")
+    _create(client, other_id, "Obiad other")
+
+    seen, cursor = [], None
+    while True:
+        url = f"/debts/search?q=obiad&status=open&created_by={user_id}&limit=2"
+        body = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 5 and set(seen) == expected
+
+    assert client.get("/debts/search?q=obiad&cursor=bogus").status_code == 400
+    assert client.get("/debts/search?q=obiad&status=unknown").status_code == 400
+
+
+def test_search_folds_polish_letters_including_l_stroke(client):
+    from api.search import rebuild
+
+    user_id = _register_user(client, "fold@example.com")
+    bile = _create(client, user_id, "Żółć")
+    boat = _create(client, user_id, "Wycieczka", "Łódź Kaliska")
+
+    def found(q):
+        return [item["id"] for item in client.get(f"/debts/search?q={q}").get_json()["items"]]
+
+    assert found("zolc") == [bile]
+    assert found("łodz") == found("lodz") == [boat]
+    assert rebuild() == "sqlite"
+    assert found("zolc") == [bile] and found("lodz") == [boat]
+
+
+def test_postgres_search_unaccents_index_and_query():
+    from sqlalchemy.dialects import postgresql
+
+    from api.search import _POSTGRES_DDL, _scored_statement
+
+    assert any("to_tsvector('simple', debts_unaccent(coalesce(title" in statement for statement in _POSTGRES_DDL)
+    sql = str(_scored_statement("postgresql", ["zolc"]).compile(dialect=postgresql.dialect()))
+    assert "to_tsquery(%(to_tsquery_1)s, debts_unaccent(" in sql
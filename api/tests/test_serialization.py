@@ -0,0 +1,47 @@
+# The routes use the top-level `serialization` module; patch that one
+import serialization
+from api.models import DebtParticipant
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _seed(client):
+    a = _register_user(client, "sa@example.com")
+    b = _register_user(client, "sb@example.com")
+    debt = client.post(
+        "/debts",
+        json={
+            "title": "Fast",
+            "created_by": a,
+            "participants": [
+                {"from_user_id": b, "to_user_id": a, "amount": "10.10"},
+                {"from_user_id": b, "to_user_id": a, "amount": "0.30", "description": "tip"},
+            ],
+        },
+    ).get_json()
+    return a, debt
+
+
+def test_fast_lists_match_to_dict(client):
+    a, debt = _seed(client)
+    items = client.get(f"/debt-participants?debt_id={debt['id']}").get_json()["items"]
+    expected = [p.to_dict() for p in DebtParticipant.query.order_by(DebtParticipant.created_at.desc()).all()]
+    assert sorted(items, key=lambda item: item["id"]) == sorted(expected, key=lambda item: item["id"])
+
+    page = client.get(f"/debts?created_by={a}&limit=1").get_json()
+    assert page["items"] == [{key: debt[key] for key in debt if key != "participants"}]
+    assert page["next_cursor"] is None
+
+
+def test_amount_format_string_and_stdlib_fallback(client, monkeypatch):
+    _, debt = _seed(client)
+    url = f"/debt-participants?debt_id={debt['id']}&amount_format=string"
+    with_orjson = client.get(url).get_json()["items"]
+    assert sorted(item["amount"] for item in with_orjson) == ["0.30", "10.10"]
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert client.get(url).get_json()["items"] == with_orjson
+    assert client.get("/debt-participants?amount_format=cents").status_code == 400
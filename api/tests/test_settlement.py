@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+import pytest
+
+from api.settlement import net_balances, plan_settlement
+
+
+def _apply(transfers, balances):
+    remaining = dict(balances)
+    for transfer in transfers:
+        cents = int(transfer.amount * 100)
+        remaining[transfer.from_user_id] += cents
+        remaining[transfer.to_user_id] -= cents
+    return remaining
+
+
+def test_plan_settlement_collapses_cycle_and_chain():
+    edges = [
+        ("a", "b", Decimal("10.00")),
+        ("b", "c", Decimal("10.00")),
+        ("c", "a", Decimal("10.00")),
+        ("d", "e", Decimal("5.50")),
+        ("e", "f", Decimal("5.50")),
+    ]
+    balances = net_balances(edges)
+    transfers = plan_settlement(balances)
+
+    assert [(t.from_user_id, t.to_user_id, t.amount) for t in transfers] == [("d", "f", Decimal("5.50"))]
+    assert all(cents == 0 for cents in _apply(transfers, balances).values())
+
+
+def test_plan_settlement_uses_at_most_n_minus_one_transfers():
+    edges = [(f"u{i}", f"u{(i * 7 + 3) % 20}", Decimal(i + 1)) for i in range(200)]
+    balances = net_balances(edges)
+    transfers = plan_settlement(balances)
+
+    assert len(transfers) <= len([c for c in balances.values() if c]) - 1
+    assert all(cents == 0 for cents in _apply(transfers, balances).values())
+
+
+def test_plan_settlement_rejects_unbalanced_input():
+    with pytest.raises(ValueError):
+        plan_settlement({"a": 100, "b": -50})
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def test_debt_and_group_settlement_endpoints(client):
+    a = _register_user(client, "sa@example.com")
+    b = _register_user(client, "sb@example.com")
+    c = _register_user(client, "sc@example.com")
+    debt_id = client.post("/debts", json={"title": "Dinner", "created_by": a}).get_json()["id"]
+    for from_user, to_user, amount in ((b, a, 30), (c, b, 30)):
+        client.post(
+            "/debt-participants",
+            json={"debt_id": debt_id, "from_user_id": from_user, "to_user_id": to_user, "amount": amount},
+        )
+
+    resp = client.get(f"/debts/{debt_id}/settlement")
+    assert resp.status_code == 200
+    assert resp.get_json()["transfers"] == [{"from_user_id": c, "to_user_id": a, "amount": 30.0}]
+
+    group = client.get(f"/balances/settlement?user_ids={a},{b}")
+    assert group.status_code == 200
+    assert group.get_json()["transfers"] == [{"from_user_id": b, "to_user_id": a, "amount": 30.0}]
+
+    assert client.get("/debts/missing/settlement").status_code == 404
@@ -0,0 +1,123 @@
+from sqlalchemy import event
+
+from api.ledger import check
+from api.models import db
+
+
+def _register_user(client, email):
+    resp = client.post("/auth/register", json={"email": email, "password": "password123"})
+    return resp.get_json()["id"]
+
+
+def _debt_with_edges(client, creditor, debtors, amount=10):
+    participants = [{"from_user_id": debtor, "to_user_id": creditor, "amount": amount} for debtor in debtors]
+    resp = client.post("/debts", json={"title": "Group", "created_by": creditor, "participants": participants})
+    return resp.get_json()
+
+
+def test_settle_debt_updates_all_edges_in_fixed_statements(client):
+    creditor = _register_user(client, "settle-c@example.com")
+    debtors = [_register_user(client, f"settle-{n}@example.com") for n in range(3)]
+    debt = _debt_with_edges(client, creditor, debtors * 100)
+    client.post("/payments", json={"debt_participant_id": debt["participants"][0]["id"], "amount": 10})
+
+    updates = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE debt_participants"):
+            updates.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        resp = client.post(f"/debts/{debt['id']}/settle")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    # One edge was already settled by its payment
+    assert body["updated"] == 299
+    assert body["debt"]["status"] == "settled"
+    assert len(updates) == 1
+    assert client.get("/balances", query_string={"user_id": creditor}).get_json()["items"] == []
+    assert check() == []
+
+    assert client.post(f"/debts/{debt['id']}/settle").get_json()["updated"] == 0
+    assert client.post("/debts/missing/settle").status_code == 404
+
+
+def test_patch_participants_by_ids_and_filter(client):
+    creditor = _register_user(client, "patch-c@example.com")
+    a = _register_user(client, "patch-a@example.com")
+    b = _register_user(client, "patch-b@example.com")
+    debt = _debt_with_edges(client, creditor, [a, b])
+    first, second = (item["id"] for item in debt["participants"])
+
+    resp = client.patch("/debt-participants", json={"status": "settled", "ids": [first]})
+    assert resp.get_json() == {"updated": 1}
+    assert client.get(f"/debt-participants/{first}").get_json()["status"] == "settled"
+    assert check() == []
+
+    resp = client.patch("/debt-participants", json={"status": "open", "filter": {"debt_id": debt["id"]}})
+    assert resp.get_json() == {"updated": 1}
+    balances = client.get("/balances", query_string={"user_id": creditor}).get_json()
+    assert balances["owed_to_user"] == 20.0
+    assert check() == []
+
+    assert client.patch("/debt-participants", json={"status": "cancelled", "ids": [first]}).status_code == 400
+    assert client.patch("/debt-participants", json={"status": "settled"}).status_code == 400
+    assert client.patch("/debt-participants", json={"status": "settled", "filter": {"amount": 1}}).status_code == 400
+
+
+def test_reopen_keeps_fully_paid_participants_settled(client):
+    creditor = _register_user(client, "reopen-c@example.com")
+    a = _register_user(client, "reopen-a@example.com")
+    b = _register_user(client, "reopen-b@example.com")
+    debt = _debt_with_edges(client, creditor, [a, b])
+    paid, unpaid = (item["id"] for item in debt["participants"])
+    client.post("/payments", json={"debt_participant_id": paid, "amount": 10})
+    client.post(f"/debts/{debt['id']}/settle")
+
+    resp = client.patch("/debt-participants", json={"status": "open", "filter": {"debt_id": debt["id"]}})
+    assert resp.get_json() == {"updated": 1}
+    assert client.get(f"/debt-participants/{paid}").get_json()["status"] == "settled"
+    assert client.get(f"/debt-participants/{unpaid}").get_json()["status"] == "open"
+
+    resp = client.put(f"/debt-participants/{paid}", json={"status": "open"})
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "participant is fully paid"}
+    # Raising the amount in the same request leaves something to pay again
+    resp = client.put(f"/debt-participants/{paid}", json={"status": "open", "amount": 15})
+    assert resp.status_code == 200
+    assert resp.get_json()["remaining_amount"] == 5.0
+    assert client.get("/balances", query_string={"user_id": creditor}).get_json()["owed_to_user"] == 15.0
+    assert check() == []
+
+
+def test_patch_filter_must_be_scoped_and_typed(client):
+    creditor = _register_user(client, "scope-c@example.com")
+    a = _register_user(client, "scope-a@example.com")
+    debt = _debt_with_edges(client, creditor, [a])
+
+    for bad in ({"status": "open"}, {"debt_id": 5}, {"from_user_id": ["x"]}, {"debt_id": debt["id"], "status": 1}, "x"):
+        resp = client.patch("/debt-participants", json={"status": "settled", "filter": bad})
+        assert resp.status_code == 400, bad
+    assert client.get(f"/debt-participants/{debt['participants'][0]['id']}").get_json()["status"] == "open"
+
+
+def test_patch_by_filter_moves_ledger_and_drops_cached_records(client):
+    creditor = _register_user(client, "fsum-c@example.com")
+    a = _register_user(client, "fsum-a@example.com")
+    b = _register_user(client, "fsum-b@example.com")
+    first = _debt_with_edges(client, creditor, [a, a, b])
+    second = _debt_with_edges(client, creditor, [a], amount=5)
+    cached = first["participants"][0]["id"]
+    assert client.get(f"/debt-participants/{cached}").get_json()["status"] == "open"
+
+    resp = client.patch("/debt-participants", json={"status": "settled", "filter": {"from_user_id": a}})
+    assert resp.get_json() == {"updated": 3}
+    assert client.get(f"/debt-participants/{cached}").get_json()["status"] == "settled"
+    assert client.get(f"/debt-participants/{second['participants'][0]['id']}").get_json()["status"] == "settled"
+    nets = client.get("/balances", query_string={"user_id": creditor}).get_json()["items"]
+    assert nets == [{"user_id": b, "net": 10.0}]
+    assert check() == []
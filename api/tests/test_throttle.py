@@ -0,0 +1,102 @@
+from api.auth.throttle import MemoryBackend, SlidingWindow
+
+
+def _count_hashing(monkeypatch):
+    # Patch the module the app itself imported (top-level `routes`, not `api.routes`)
+    import routes.auth as auth_routes
+
+    calls = []
+    real_offload = auth_routes.offload
+
+    def counting(fn, *args):
+        calls.append(fn.__name__)
+        return real_offload(fn, *args)
+
+    monkeypatch.setattr(auth_routes, "offload", counting)
+    return calls
+
+
+def _limit(monkeypatch, email="3/300", ip="50/60"):
+    import auth.throttle
+
+    monkeypatch.setenv("LOGIN_THROTTLE_EMAIL", email)
+    monkeypatch.setenv("LOGIN_THROTTLE_IP", ip)
+    auth.throttle.reset_login_throttle()
+
+
+def test_sliding_window_weights_previous_window():
+    window = SlidingWindow("email", limit=4, window=60, backend=MemoryBackend())
+    for _ in range(4):
+        window.hit("a", now=10)
+    assert round(window.retry_after("a", now=20)) == 40
+    # Half-way into the next window half of the old hits still count (2 < 4)
+    assert window.retry_after("a", now=90) == 0
+    window.hit("a", now=90)
+    window.hit("a", now=90)
+    assert window.retry_after("a", now=90) > 0
+    assert window.retry_after("b", now=90) == 0
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.incr(key, 0, 120)
+    assert len(backend) == 2
+    assert backend.counts("a", 0) == (0, 0)
+
+
+def test_failed_logins_get_429_before_hashing(client, monkeypatch):
+    _limit(monkeypatch)
+    client.post("/auth/register", json={"email": "victim@example.com", "password": "rightpassword"})
+    calls = _count_hashing(monkeypatch)
+
+    for _ in range(3):
+        resp = client.post("/auth/login", json={"email": "victim@example.com", "password": "guess"})
+        assert resp.status_code == 401
+    resp = client.post("/auth/login", json={"email": "victim@example.com", "password": "rightpassword"})
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert calls == ["verify_password"] * 3
+    assert client.get("/health/hashing").get_json()["throttle"]["rejected"] == 1
+
+
+def test_unknown_email_pays_dummy_verify_and_counts_per_ip(client, monkeypatch):
+    _limit(monkeypatch, email="10/300", ip="2/60")
+    calls = _count_hashing(monkeypatch)
+
+    for n in range(2):
+        resp = client.post("/auth/login", json={"email": f"nobody{n}@example.com", "password": "guess"})
+        assert resp.status_code == 401
+    resp = client.post("/auth/login", json={"email": "nobody9@example.com", "password": "guess"})
+    assert resp.status_code == 429
+    assert calls == ["verify_dummy"] * 2
+
+
+def test_successful_login_clears_email_failures(client, monkeypatch):
+    _limit(monkeypatch)
+    client.post("/auth/register", json={"email": "forgetful@example.com", "password": "rightpassword"})
+    for _ in range(2):
+        client.post("/auth/login", json={"email": "forgetful@example.com", "password": "guess"})
+    assert client.post("/auth/login", json={"email": "forgetful@example.com", "password": "rightpassword"}).status_code == 200
+    for _ in range(2):
+        assert client.post("/auth/login", json={"email": "forgetful@example.com", "password": "guess"}).status_code == 401
+
+
+def test_ip_limit_uses_forwarded_client_behind_proxy(app, client, monkeypatch):
+    from api.app import trust_proxies
+
+    _limit(monkeypatch, email="10/300", ip="2/60")
+    monkeypatch.setattr(app, "wsgi_app", app.wsgi_app)
+    trust_proxies(app, 1)
+
+    def login(client_ip, n):
+        return client.post(
+            "/auth/login",
+            json={"email": f"nobody{n}@example.com", "password": "guess"},
+            headers={"X-Forwarded-For": client_ip},
+            environ_base={"REMOTE_ADDR": "172.18.0.3"},
+        )
+
+    assert [login("203.0.113.7", n).status_code for n in range(3)] == [401, 401, 429]
+    # Same proxy address, different client: its own bucket
+    assert login("198.51.100.20", 9).status_code == 401
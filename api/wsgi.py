@@ -0,0 +1,7 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+`python app.py` stays the development server (debug, reloader).
+"""
+from app import app  # noqa: F401
@@ -0,0 +1,11 @@
+-- Indeksy złożone pod rzeczywiste zapytania list i sald
+
+-- GET /debts?created_by=...&status=... sortowane po created_at
+create index if not exists idx_debts_created_by_status_created_at
+    on debts(created_by, status, created_at desc);
+
+-- salda i listy pozycji po użytkowniku i statusie
+create index if not exists idx_debt_participants_from_user_status
+    on debt_participants(from_user_id, status);
+create index if not exists idx_debt_participants_to_user_status
+    on debt_participants(to_user_id, status);
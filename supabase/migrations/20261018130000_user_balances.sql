@@ -0,0 +1,22 @@
+-- USER_BALANCES TABLE (saldo netto między parą użytkowników, aktualizowane przy zapisach)
+-- amount: ile counterparty_id jest winien user_id (ujemne: user_id jest winien counterparty_id)
+create table if not exists user_balances (
+    user_id uuid not null references users(id) on delete cascade,
+    counterparty_id uuid not null references users(id) on delete cascade,
+    amount numeric(14,2) not null default 0,
+    updated_at timestamp default now(),
+    primary key (user_id, counterparty_id)
+);
+
+-- Wypełnienie na podstawie otwartych pozycji (to samo co `python ledger.py rebuild`)
+insert into user_balances (user_id, counterparty_id, amount)
+select user_id, counterparty_id, sum(amount)
+from (
+    select to_user_id as user_id, from_user_id as counterparty_id, amount
+    from debt_participants where status = 'open' and from_user_id <> to_user_id
+    union all
+    select from_user_id, to_user_id, -amount
+    from debt_participants where status = 'open' and from_user_id <> to_user_id
+) edges
+group by user_id, counterparty_id
+on conflict (user_id, counterparty_id) do update set amount = excluded.amount;
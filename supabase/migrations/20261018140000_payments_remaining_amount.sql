@@ -0,0 +1,28 @@
+-- DEBT_PARTICIPANTS: kwota pozostała do spłaty (amount minus dotychczasowe wpłaty)
+alter table debt_participants add column if not exists remaining_amount numeric(12,2);
+
+update debt_participants dp
+set remaining_amount = greatest(dp.amount - coalesce(
+    (select sum(p.amount) from payments p where p.debt_participant_id = dp.id), 0), 0)
+where remaining_amount is null;
+
+alter table debt_participants alter column remaining_amount set not null;
+alter table debt_participants add constraint debt_participants_remaining_amount_check
+    check (remaining_amount >= 0 and remaining_amount <= amount);
+
+-- Historia wpłat pozycji stronicowana po (paid_at, id)
+create index if not exists idx_payments_debt_participant_paid_at
+    on payments(debt_participant_id, paid_at desc);
+
+-- Saldo liczone od pozostałych kwot (to samo co `python ledger.py rebuild`)
+delete from user_balances;
+insert into user_balances (user_id, counterparty_id, amount)
+select user_id, counterparty_id, sum(amount)
+from (
+    select to_user_id as user_id, from_user_id as counterparty_id, remaining_amount as amount
+    from debt_participants where status = 'open' and from_user_id <> to_user_id
+    union all
+    select from_user_id, to_user_id, -remaining_amount
+    from debt_participants where status = 'open' and from_user_id <> to_user_id
+) edges
+group by user_id, counterparty_id;
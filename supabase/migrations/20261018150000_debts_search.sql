@@ -0,0 +1,10 @@
+-- Wyszukiwanie pełnotekstowe po tytule (waga A) i opisie (waga B) długów.
+-- Kolumna generowana jest aktualizowana przez bazę przy każdym INSERT/UPDATE.
+alter table debts add column if not exists search_vector tsvector
+    generated always as (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) stored;
+
+-- GET /debts/search?q=... — dopasowanie przez indeks GIN zamiast skanu tabeli
+create index if not exists idx_debts_search_vector on debts using gin (search_vector);
@@ -0,0 +1,18 @@
+-- Wyszukiwanie bez znaków diakrytycznych także w Postgresie: „zolc” znajduje „żółć”.
+create extension if not exists unaccent;
+
+-- unaccent() jest tylko STABLE, a kolumna generowana wymaga wyrażenia IMMUTABLE
+create or replace function debts_unaccent(text) returns text
+    language sql immutable parallel safe strict
+    set search_path = public, extensions, pg_catalog
+    as $$ select unaccent('unaccent', $1) $$;
+
+-- Kolumny generowanej nie da się zmienić w miejscu: usunięcie kolumny usuwa też jej indeks
+alter table debts drop column if exists search_vector;
+alter table debts add column search_vector tsvector
+    generated always as (
+        setweight(to_tsvector('simple', debts_unaccent(coalesce(title, ''))), 'A') ||
+        setweight(to_tsvector('simple', debts_unaccent(coalesce(description, ''))), 'B')
+    ) stored;
+
+create index if not exists idx_debts_search_vector on debts using gin (search_vector);
@@ -1,5 +1,6 @@
 import socketio from "socket.io-client";
 import React from 'react';
+import { getAuthToken } from "../api";
 
 function getBaseUrl() {
     var re = new RegExp(/\/\/(.*?)\//);
@@ -16,5 +17,8 @@ else{
 }
 
 console.log(SOCKET_URL);
-export const socket = socketio(SOCKET_URL);
+// The server puts the connection in the logged-in user's room; the token is re-read on every (re)connect
+export const socket = socketio(SOCKET_URL, {
+    auth: (cb: (data: object) => void) => cb({ token: getAuthToken() }),
+});
 export const SocketContext = React.createContext(socket);
\ No newline at end of file
@@ -18,16 +18,28 @@ type Debt = {
   updated_at?: string | null;
 };
 
-type DebtListResponse = {
-  items: Debt[];
+type Totals = {
+  owed_to_user: number;
+  owed_by_user: number;
+  net: number;
+};
+
+type DashboardResponse = {
+  user: User;
+  status_counts: Record<string, number>;
+  totals: Totals;
+  latest_debts: Debt[];
 };
 
 export default function Dashboard() {
   const history = useHistory();
   const [user, setUser] = useState<User | null>(null);
   const [debts, setDebts] = useState<Debt[]>([]);
+  const [totals, setTotals] = useState<Totals | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [loadError, setLoadError] = useState<string | null>(null);
+  const [attempt, setAttempt] = useState(0);
 
   const [title, setTitle] = useState("");
   const [description, setDescription] = useState("");
@@ -44,32 +56,31 @@ export default function Dashboard() {
     const load = async () => {
       setLoading(true);
       setError(null);
-
-      const meResult = await apiGet<User>("/auth/me", token);
-      if (!meResult.ok) {
-        setAuthToken(null);
-        history.push("/login");
+      setLoadError(null);
+
+      // One request: user, counts, totals and latest debts
+      const result = await apiGet<DashboardResponse>("/dashboard?latest=50", token);
+      if (!result.ok) {
+        // Only a rejected token ends the session; busy or unreachable API can be retried
+        if (result.status === 401) {
+          setAuthToken(null);
+          history.push("/login");
+          return;
+        }
+        setLoadError(result.error);
+        setLoading(false);
         return;
       }
 
-      setUser(meResult.data);
-
-      const debtResult = await apiGet<DebtListResponse>(
-        `/debts?created_by=${meResult.data.id}`,
-        token
-      );
-      if (!debtResult.ok) {
-        setError(debtResult.error);
-        setDebts([]);
-      } else {
-        setDebts(debtResult.data.items || []);
-      }
+      setUser(result.data.user);
+      setTotals(result.data.totals);
+      setDebts(result.data.latest_debts || []);
 
       setLoading(false);
     };
 
     load();
-  }, [history, token]);
+  }, [history, token, attempt]);
 
   const onCreateDebt = async (event: React.FormEvent) => {
     event.preventDefault();
@@ -111,10 +122,26 @@ export default function Dashboard() {
     return <p>Loading...</p>;
   }
 
+  if (loadError) {
+    return (
+      <div>
+        <h1>Dashboard</h1>
+        <p>Error: {loadError}</p>
+        <button onClick={() => setAttempt((prev) => prev + 1)}>Retry</button>
+        <button onClick={onLogout}>Logout</button>
+      </div>
+    );
+  }
+
   return (
     <div>
       <h1>Dashboard</h1>
       <p>Signed in as: {user?.email}</p>
+      {totals && (
+        <p>
+          Owed to you: {totals.owed_to_user.toFixed(2)} / You owe: {totals.owed_by_user.toFixed(2)}
+        </p>
+      )}
       <button onClick={onLogout}>Logout</button>
 
       <h2>Create debt</h2>